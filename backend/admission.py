@@ -0,0 +1,275 @@
+"""
+Admission control for LLM-bound work.
+At most LLM_MAX_CONCURRENT decisions call the LLM at once; the rest wait in a priority queue
+where urgent bids go first, then smaller documents, then arrival order. A request whose estimated
+wait (queued work ahead of it spread over the slots, times the recent per-decision service time)
+exceeds its deadline is shed at once with a Retry-After hint, as is one still queued when its
+deadline passes, so a load spike turns into quick 503s instead of LLM timeouts and fallback
+DECLINE decisions. Waiters may be threads (Flask) or asyncio tasks (ASGI).
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import metrics
+
+# Configuration
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "8"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+ADMISSION_URGENT_HOURS = float(os.getenv("ADMISSION_URGENT_HOURS", "72"))  # bids due this soon are urgent
+ADMISSION_SERVICE_SECONDS = float(os.getenv("ADMISSION_SERVICE_SECONDS", "10"))  # estimate until decisions finish
+SERVICE_TIME_SMOOTHING = 0.2  # weight of the newest decision in the service-time average
+WAIT_WINDOW = 1000  # recent queue waits kept for percentiles
+
+PRIORITIES = ("urgent", "normal", "low")
+_DEFAULT_DEADLINE = object()  # use the controller's max_wait_seconds
+
+
+class AdmissionRejectedError(Exception):
+    """The request was shed: its queue wait would exceed (or has exceeded) its deadline"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = 503
+
+
+def request_priority(priority=None, due_date=None, now=None):
+    """
+    Priority class of an upload.
+
+    Args:
+        priority (str): Explicit "urgent", "normal" or "low"; wins over due_date
+        due_date (str): ISO date or datetime the bid is due; within ADMISSION_URGENT_HOURS makes it urgent
+
+    Returns:
+        str: One of PRIORITIES
+    """
+    if priority in PRIORITIES:
+        return priority
+    if due_date:
+        try:
+            due = datetime.fromisoformat(str(due_date).strip())
+        except ValueError:
+            return "normal"
+        if len(str(due_date).strip()) == 10:
+            due += timedelta(days=1)  # a bare date is due at the end of that day
+        now = now or datetime.now(due.tzinfo)
+        if due - now <= timedelta(hours=ADMISSION_URGENT_HOURS):
+            return "urgent"
+    return "normal"
+
+
+def size_class(size):
+    """Coarse document size class (doubling from 1K characters): orders small documents first"""
+    return max(0, int(size).bit_length() - 10)
+
+
+class _Waiter:
+    __slots__ = ("key", "priority", "wake", "granted", "abandoned")
+
+    def __init__(self, key, priority, wake):
+        self.key = key
+        self.priority = priority
+        self.wake = wake
+        self.granted = False
+        self.abandoned = False
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AdmissionController:
+    """Bounded concurrency plus a priority wait queue with deadline-based shedding; thread-safe"""
+
+    def __init__(self, max_concurrent=LLM_MAX_CONCURRENT, max_wait_seconds=ADMISSION_MAX_WAIT_SECONDS,
+                 max_queue=ADMISSION_MAX_QUEUE, service_seconds=ADMISSION_SERVICE_SECONDS, enabled=ADMISSION_ENABLED):
+        self.enabled = enabled
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue = max_queue
+        self.service_seconds = service_seconds
+        self._lock = threading.Lock()
+        self._heap = []
+        self._queued = 0  # waiters in the heap that are neither granted nor abandoned
+        self._in_flight = 0
+        self._sequence = itertools.count()
+        self._waits = deque(maxlen=WAIT_WINDOW)
+        self.counts = {"admitted": 0, "shed": 0, "timed_out": 0}
+
+    def _wait_ahead(self, key):
+        """Estimated seconds before a waiter with key gets a slot (lock held)"""
+        ahead = sum(1 for waiter in self._heap if waiter.key < key and not (waiter.granted or waiter.abandoned))
+        backlog = self._in_flight + ahead + 1 - self.max_concurrent
+        return max(0.0, backlog / self.max_concurrent * self.service_seconds)
+
+    def _retry_after(self):
+        """Seconds a shed client should wait: roughly the time to drain the current queue (lock held)"""
+        return max(1, math.ceil(self._wait_ahead((len(PRIORITIES), math.inf, math.inf))))
+
+    def _shed(self, priority, outcome, message):
+        """Count a shed request and build its error (lock held)"""
+        self.counts["timed_out" if outcome == "timed_out" else "shed"] += 1
+        metrics.ADMISSION_REQUESTS.inc(priority=priority, outcome=outcome)
+        return AdmissionRejectedError(message, self._retry_after())
+
+    def _enter(self, priority, size, deadline, wake):
+        """Take a slot now (returns None) or queue a waiter; raises AdmissionRejectedError when shed"""
+        with self._lock:
+            if not self._queued and self._in_flight < self.max_concurrent:
+                self._in_flight += 1
+                return None
+            key = (PRIORITIES.index(priority), size_class(size), next(self._sequence))
+            estimate = self._wait_ahead(key)
+            if deadline is not None and estimate > deadline:
+                raise self._shed(priority, "shed", f"Server busy: estimated queue wait {estimate:.1f}s exceeds {deadline:g}s")
+            if self._queued >= self.max_queue:
+                raise self._shed(priority, "shed", f"Server busy: {self._queued} requests already queued")
+            waiter = _Waiter(key, priority, wake)
+            heapq.heappush(self._heap, waiter)
+            self._queued += 1
+            return waiter
+
+    def _abandon(self, waiter):
+        """Withdraw a waiter whose deadline passed; returns True when it was granted a slot meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.abandoned = True
+            self._queued -= 1
+            return False
+
+    def _timed_out(self, priority, deadline):
+        with self._lock:
+            return self._shed(priority, "timed_out", f"Server busy: no LLM slot within {deadline:g}s")
+
+    def _release(self, service_seconds=None):
+        """Free a slot, update the service-time average and grant the best waiting request"""
+        with self._lock:
+            if service_seconds is not None:
+                self.service_seconds += SERVICE_TIME_SMOOTHING * (service_seconds - self.service_seconds)
+            self._in_flight -= 1
+            while self._heap and self._in_flight < self.max_concurrent:
+                waiter = heapq.heappop(self._heap)
+                if waiter.abandoned:
+                    continue
+                waiter.granted = True
+                self._queued -= 1
+                self._in_flight += 1
+                waiter.wake()
+
+    def _admitted(self, priority, waited):
+        with self._lock:
+            self.counts["admitted"] += 1
+            self._waits.append(waited)
+        metrics.ADMISSION_REQUESTS.inc(priority=priority, outcome="admitted")
+        metrics.ADMISSION_WAIT_SECONDS.observe(waited, priority=priority)
+
+    def _deadline(self, deadline):
+        return self.max_wait_seconds if deadline is _DEFAULT_DEADLINE else deadline
+
+    @contextlib.contextmanager
+    def slot(self, priority="normal", size=0, deadline=_DEFAULT_DEADLINE):
+        """
+        Hold one LLM slot for the body of the with block, waiting in priority order for it.
+
+        Args:
+            priority (str): One of PRIORITIES
+            size (int): Document size in characters (smaller documents go first within a priority)
+            deadline (float): Longest acceptable queue wait in seconds; None waits as long as it takes
+                and is never shed by estimate (background jobs, batches)
+
+        Raises:
+            AdmissionRejectedError: The estimated or actual wait exceeds the deadline
+        """
+        if not self.enabled:
+            yield
+            return
+        deadline = self._deadline(deadline)
+        started = time.monotonic()
+        granted = threading.Event()
+        waiter = self._enter(priority, size, deadline, granted.set)
+        if waiter is not None and not granted.wait(deadline) and not self._abandon(waiter):
+            raise self._timed_out(priority, deadline)
+        self._admitted(priority, time.monotonic() - started)
+        service_started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - service_started)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority="normal", size=0, deadline=_DEFAULT_DEADLINE):
+        """Async counterpart of slot(): waits on the event loop instead of blocking a thread"""
+        if not self.enabled:
+            yield
+            return
+        deadline = self._deadline(deadline)
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enter(priority, size, deadline, wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(granted), deadline)
+            except asyncio.TimeoutError:
+                if not self._abandon(waiter):
+                    raise self._timed_out(priority, deadline)
+            except asyncio.CancelledError:
+                # Client went away: give back a slot granted in the meantime
+                if self._abandon(waiter):
+                    self._release()
+                raise
+        self._admitted(priority, time.monotonic() - started)
+        service_started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - service_started)
+
+    def check(self, priority="normal", size=0, deadline=_DEFAULT_DEADLINE):
+        """Raise AdmissionRejectedError now if a request would be shed (for responses that stream later)"""
+        deadline = self._deadline(deadline)
+        if not self.enabled or deadline is None:
+            return
+        with self._lock:
+            if not self._queued and self._in_flight < self.max_concurrent:
+                return
+            estimate = self._wait_ahead((PRIORITIES.index(priority), size_class(size), math.inf))
+            if estimate > deadline or self._queued >= self.max_queue:
+                raise self._shed(priority, "shed", f"Server busy: estimated queue wait {estimate:.1f}s exceeds {deadline:g}s")
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            queued = {priority: 0 for priority in PRIORITIES}
+            for waiter in self._heap:
+                if not (waiter.granted or waiter.abandoned):
+                    queued[waiter.priority] += 1
+            return {
+                "enabled": self.enabled,
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._in_flight,
+                "queued": queued,
+                "max_wait_seconds": self.max_wait_seconds,
+                "service_seconds": round(self.service_seconds, 2),
+                "estimated_wait_seconds": round(self._wait_ahead((len(PRIORITIES), math.inf, math.inf)), 1),
+                "wait_ms": {
+                    f"p{pct}": round(waits[min(len(waits) - 1, int(len(waits) * pct / 100))] * 1000, 1) if waits else None
+                    for pct in (50, 95, 99)
+                },
+                **self.counts,
+            }
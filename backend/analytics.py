@@ -0,0 +1,386 @@
+"""
+Portfolio analytics over the project store.
+Aggregates for the whole portfolio, each practice area and each client: project count, cost and
+duration distributions (percentiles and means) and win rate. Every project is reduced to a few
+array-backed columns (cost, duration in months, outcome, group ids); every group holds counts,
+sums and fixed log-spaced histograms, so adding or removing a project only adds or subtracts its
+contribution. refresh() reads the store's change log and re-applies just the rows written since
+the last refresh; summaries are computed from the histograms (exactly from the members for small
+groups, where bin width would dominate) on first read and cached until a refresh touches their group.
+"""
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+from project_store import ProjectStore
+
+# Configuration
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "5"))  # min seconds between change-log checks
+COST_RANGE = (1_000.0, 1_000_000_000.0)
+COST_BINS = 128  # log-spaced: neighbouring edges differ by ~11%
+DURATION_RANGE = (0.25, 240.0)  # months
+DURATION_BINS = 128  # log-spaced: neighbouring edges differ by ~5.5%
+PERCENTILES = (10, 25, 50, 75, 90)
+EXACT_GROUP_MAX = 64  # groups this small get exact percentiles from their members' columns
+AREA_SLOTS = 4  # practice areas kept in the fixed columns; a project's further areas go to an overflow map
+
+# Outcome values (case-insensitive) counted as won or lost; anything else is not counted
+WIN_OUTCOMES = {"won", "win", "awarded", "success", "successful"}
+LOSS_OUTCOMES = {"lost", "loss", "not awarded", "unsuccessful", "declined"}
+
+DURATION_UNITS = {"d": 12 / 365.25, "w": 12 / 52.18, "m": 1.0, "y": 12.0}
+DURATION_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(days?|weeks?|wks?|months?|mos?|years?|yrs?)\b",
+    re.IGNORECASE
+)
+
+ALL, PRACTICE_AREA, CLIENT = "all", "practice_area", "client"
+_KINDS = (ALL, PRACTICE_AREA, CLIENT)
+_UNKNOWN, _LOST, _WON = -1, 0, 1
+
+
+class UnknownGroupError(LookupError):
+    """Raised when a practice area or client has no projects"""
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_duration_months(text):
+    """
+    Duration string to months: "14 months", "2 years", "6 weeks", "1 year 6 months", "12-18 months"
+    (ranges count as their midpoint). Returns None when no duration is recognized.
+    """
+    if not text:
+        return None
+    months = None
+    for low, high, unit in DURATION_PATTERN.findall(str(text)):
+        value = (float(low) + float(high)) / 2 if high else float(low)
+        months = (months or 0.0) + value * DURATION_UNITS[unit[0].lower()]
+    return months
+
+
+def outcome_code(value):
+    """Won, lost or unknown code for a project's outcome field"""
+    value = str(value or "").strip().lower()
+    return _WON if value in WIN_OUTCOMES else _LOST if value in LOSS_OUTCOMES else _UNKNOWN
+
+
+def project_areas(practice_area, technology_stack):
+    """Practice areas a project counts towards: its practice_area and technology_stack entries (as in VectorIndex)"""
+    areas = list(technology_stack or [])
+    if practice_area:
+        areas.append(practice_area)
+    return list(dict.fromkeys(area.strip() for area in areas if area and area.strip()))
+
+
+def summary_line(summary):
+    """One-line description of a group summary, as placed in the decision prompt"""
+    parts = [f"{summary['name']}: {summary['projects']:,} project{'' if summary['projects'] == 1 else 's'}"]
+    cost = summary["cost"]
+    if cost:
+        parts.append(f"median cost ${cost['p50']:,} (middle half ${cost['p25']:,} - ${cost['p75']:,})")
+    duration = summary["duration_months"]
+    if duration:
+        parts.append(f"median duration {duration['p50']:g} months")
+    if summary["win_rate"] is not None:
+        parts.append(f"win rate {summary['win_rate']:.0%} of {summary['wins'] + summary['losses']:,} with recorded outcomes")
+    else:
+        parts.append("no recorded outcomes")
+    return "; ".join(parts)
+
+
+class LogHistogram:
+    """Fixed log-spaced bins over [low, high]; values outside are clamped to the end bins"""
+
+    def __init__(self, value_range, bins):
+        self.low, self.high = value_range
+        self.bins = bins
+        self.edges = np.geomspace(self.low, self.high, bins + 1)
+        self._scale = bins / np.log(self.high / self.low)
+
+    def bin(self, values):
+        """Bin index of each value"""
+        values = np.maximum(np.asarray(values, dtype=np.float64), self.low)
+        return np.minimum((np.log(values / self.low) * self._scale).astype(np.int64), self.bins - 1)
+
+    def percentiles(self, counts, percentiles=PERCENTILES):
+        """Percentiles from bin counts, interpolated geometrically within the bin"""
+        cumulative = np.cumsum(counts)
+        total = cumulative[-1]
+        targets = np.asarray(percentiles, dtype=np.float64) / 100 * total
+        bins = np.minimum(np.searchsorted(cumulative, targets, side="left"), self.bins - 1)
+        below = np.where(bins > 0, cumulative[bins - 1], 0)
+        fraction = np.clip((targets - below) / np.maximum(counts[bins], 1), 0.0, 1.0)
+        return self.edges[bins] * (self.edges[bins + 1] / self.edges[bins]) ** fraction
+
+
+COST_HISTOGRAM = LogHistogram(COST_RANGE, COST_BINS)
+DURATION_HISTOGRAM = LogHistogram(DURATION_RANGE, DURATION_BINS)
+
+
+class ProjectAnalytics:
+    """Incrementally maintained per-group aggregates over a ProjectStore; thread-safe"""
+
+    def __init__(self, store=None, refresh_seconds=ANALYTICS_REFRESH_SECONDS):
+        self.store = store or ProjectStore()
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._reset()
+        self.rebuild()
+
+    def _reset(self):
+        # Per-project columns, indexed by slot
+        self._slots = {}  # project id -> slot
+        self._free = []  # slots of deleted projects, reused by later inserts
+        self._size = 0
+        self._cost = np.zeros(0, dtype=np.float64)  # NaN when unknown
+        self._months = np.zeros(0, dtype=np.float32)  # NaN when unknown
+        self._outcome = np.zeros(0, dtype=np.int8)
+        self._groups = np.zeros((0, AREA_SLOTS + 2), dtype=np.int32)  # all, client, areas...; -1 for none
+        self._overflow = {}  # slot -> group ids of areas beyond AREA_SLOTS
+        # Per-group aggregates, indexed by group id
+        self._group_ids = {}  # (kind, lowercased name) -> group id
+        self._group_names = []
+        self._group_kinds = np.zeros(0, dtype=np.int8)
+        self._projects = np.zeros(0, dtype=np.int64)
+        self._cost_count = np.zeros(0, dtype=np.int64)
+        self._cost_sum = np.zeros(0, dtype=np.float64)
+        self._cost_hist = np.zeros((0, COST_BINS), dtype=np.int32)
+        self._months_count = np.zeros(0, dtype=np.int64)
+        self._months_sum = np.zeros(0, dtype=np.float64)
+        self._months_hist = np.zeros((0, DURATION_BINS), dtype=np.int32)
+        self._wins = np.zeros(0, dtype=np.int64)
+        self._losses = np.zeros(0, dtype=np.int64)
+        self._summaries = {}  # group id -> cached summary dict
+        self.revision = None
+        self._checked = 0.0
+        self.refreshes = 0
+        self.refreshed_projects = 0
+        self.last_refresh_ms = None
+        self._group(ALL, "All projects")
+
+    def __len__(self):
+        return len(self._slots)
+
+    @staticmethod
+    def _grown(array, needed):
+        """array with at least needed rows (geometric growth, new rows zeroed)"""
+        if needed <= len(array):
+            return array
+        grown = np.zeros((max(needed, len(array) * 3 // 2, 1024),) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _group(self, kind, name):
+        """Group id for (kind, name), registering the group on first sight"""
+        key = (kind, name.lower())
+        group = self._group_ids.get(key)
+        if group is None:
+            group = self._group_ids[key] = len(self._group_names)
+            self._group_names.append(name)
+            for attr in ("_group_kinds", "_projects", "_cost_count", "_cost_sum", "_cost_hist",
+                         "_months_count", "_months_sum", "_months_hist", "_wins", "_losses"):
+                setattr(self, attr, self._grown(getattr(self, attr), group + 1))
+            self._group_kinds[group] = _KINDS.index(kind)
+        return group
+
+    def _store_rows(self, rows):
+        """Write store rows into slots (new ids get free or fresh slots); returns the slots"""
+        slots, costs, months, outcomes, groups = [], [], [], [], []
+        next_slot = self._size
+        area_groups = {}  # (practice_area, technology_stack JSON) -> area group ids; stacks repeat a lot
+        for project_id, cost, duration, client, practice_area, stack, outcome in rows:
+            slot = self._slots.get(project_id)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    slot, next_slot = next_slot, next_slot + 1
+                self._slots[project_id] = slot
+            areas = area_groups.get((practice_area, stack))
+            if areas is None:
+                areas = area_groups[(practice_area, stack)] = [
+                    self._group(PRACTICE_AREA, area) for area in project_areas(practice_area, json.loads(stack or "[]"))
+                ]
+            client = client.strip() if client else ""
+            row = [0, self._group(CLIENT, client) if client else -1] + areas[:AREA_SLOTS]
+            groups.append(row + [-1] * (AREA_SLOTS + 2 - len(row)))
+            if len(areas) > AREA_SLOTS:
+                self._overflow[slot] = areas[AREA_SLOTS:]
+            else:
+                self._overflow.pop(slot, None)
+            slots.append(slot)
+            costs.append(cost)
+            months.append(parse_duration_months(duration))
+            outcomes.append(outcome_code(outcome))
+        slots = np.asarray(slots, dtype=np.int64)
+        if not len(slots):
+            return slots
+        self._size = next_slot
+        for attr in ("_cost", "_months", "_outcome", "_groups"):
+            setattr(self, attr, self._grown(getattr(self, attr), self._size))
+        self._cost[slots] = np.array(costs, dtype=np.float64)  # None -> NaN
+        self._months[slots] = np.array(months, dtype=np.float64)
+        self._outcome[slots] = outcomes
+        self._groups[slots] = groups
+        return slots
+
+    def _apply(self, slots, sign):
+        """Add (sign=1) or subtract (sign=-1) the contribution of projects in slots to their groups"""
+        if not len(slots):
+            return
+        cost, months, outcome = self._cost[slots], self._months[slots], self._outcome[slots]
+        cost_known, months_known = ~np.isnan(cost), ~np.isnan(months)
+        cost_bins = COST_HISTOGRAM.bin(np.where(cost_known, cost, COST_RANGE[0]))
+        months_bins = DURATION_HISTOGRAM.bin(np.where(months_known, months, DURATION_RANGE[0]))
+        everyone = np.arange(len(slots))
+        # (group id, row into slots) pairs: one per fixed group column, plus any overflow areas
+        pairs = [(self._groups[slots, column], everyone) for column in range(AREA_SLOTS + 2)]
+        overflow = [(group, row) for row, slot in enumerate(slots.tolist()) for group in self._overflow.get(slot, ())]
+        if overflow:
+            groups, rows = zip(*overflow)
+            pairs.append((np.asarray(groups, dtype=np.int32), np.asarray(rows)))
+        for groups, rows in pairs:
+            present = groups >= 0
+            groups, rows = groups[present], rows[present]
+            if not len(groups):
+                continue
+            np.add.at(self._projects, groups, sign)
+            with_cost = cost_known[rows]
+            np.add.at(self._cost_count, groups[with_cost], sign)
+            np.add.at(self._cost_sum, groups[with_cost], sign * cost[rows[with_cost]])
+            np.add.at(self._cost_hist, (groups[with_cost], cost_bins[rows[with_cost]]), sign)
+            with_months = months_known[rows]
+            np.add.at(self._months_count, groups[with_months], sign)
+            np.add.at(self._months_sum, groups[with_months], sign * months[rows[with_months]].astype(np.float64))
+            np.add.at(self._months_hist, (groups[with_months], months_bins[rows[with_months]]), sign)
+            np.add.at(self._wins, groups[outcome[rows] == _WON], sign)
+            np.add.at(self._losses, groups[outcome[rows] == _LOST], sign)
+            for group in np.unique(groups).tolist():
+                self._summaries.pop(group, None)
+
+    def rebuild(self):
+        """Recompute every aggregate from a full scan of the store"""
+        start = time.perf_counter()
+        with self._lock:
+            self._reset()
+            # Read the revision first: rows written during the scan are re-applied by the next refresh
+            self.revision = self.store.revision()
+            self._checked = time.monotonic()
+            self._apply(self._store_rows(self.store.analytics_rows()), 1)
+            self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def refresh(self, force=False):
+        """
+        Apply store writes made since the last refresh (at most once per refresh_seconds unless forced).
+
+        Returns:
+            int: Number of changed project ids applied
+        """
+        if not force and time.monotonic() - self._checked < self.refresh_seconds:
+            return 0
+        with self._lock:
+            start = time.perf_counter()
+            self._checked = time.monotonic()
+            revision, changed = self.store.changes_since(self.revision)
+            if not changed:
+                self.revision = revision
+                return 0
+            self._apply(np.asarray([self._slots[i] for i in changed if i in self._slots], dtype=np.int64), -1)
+            rows = list(self.store.analytics_rows(changed))
+            self._apply(self._store_rows(rows), 1)
+            for project_id in set(changed) - {row[0] for row in rows}:
+                slot = self._slots.pop(project_id, None)
+                if slot is not None:
+                    self._groups[slot] = -1
+                    self._overflow.pop(slot, None)
+                    self._free.append(slot)
+            self.revision = revision
+            self.refreshes += 1
+            self.refreshed_projects += len(changed)
+            self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+            return len(changed)
+
+    def _members(self, group):
+        """Slots of a group's projects: one vectorized pass over the column(s) of its kind (lock held)"""
+        kind = _KINDS[self._group_kinds[group]]
+        if kind != PRACTICE_AREA:
+            # Column 0 holds the portfolio group, column 1 the client
+            return np.flatnonzero(self._groups[:self._size, 0 if kind == ALL else 1] == group)
+        members = (self._groups[:self._size, 2:] == group).any(axis=1)
+        members[[slot for slot, groups in self._overflow.items() if group in groups]] = True
+        return np.flatnonzero(members)
+
+    def _summary(self, group):
+        """Summary of one group from its counts and histograms (lock held)"""
+        summary = self._summaries.get(group)
+        if summary is not None:
+            return summary
+        cost_count, months_count = int(self._cost_count[group]), int(self._months_count[group])
+        if self._projects[group] <= EXACT_GROUP_MAX:
+            members = self._members(group)
+            costs, months = self._cost[members], self._months[members].astype(np.float64)
+            cost_values = np.percentile(costs[~np.isnan(costs)], PERCENTILES) if cost_count else None
+            months_values = np.percentile(months[~np.isnan(months)], PERCENTILES) if months_count else None
+        else:
+            cost_values = COST_HISTOGRAM.percentiles(self._cost_hist[group]) if cost_count else None
+            months_values = DURATION_HISTOGRAM.percentiles(self._months_hist[group]) if months_count else None
+        wins, losses = int(self._wins[group]), int(self._losses[group])
+        summary = {
+            "name": self._group_names[group],
+            "projects": int(self._projects[group]),
+            "cost": None,
+            "duration_months": None,
+            "wins": wins,
+            "losses": losses,
+            "win_rate": round(wins / (wins + losses), 3) if wins + losses else None,
+        }
+        if cost_count:
+            summary["cost"] = dict(count=cost_count, mean=round(self._cost_sum[group] / cost_count),
+                                   **{f"p{p}": round(float(v)) for p, v in zip(PERCENTILES, cost_values)})
+        if months_count:
+            summary["duration_months"] = dict(count=months_count, mean=round(self._months_sum[group] / months_count, 1),
+                                              **{f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, months_values)})
+        self._summaries[group] = summary
+        return summary
+
+    def summary(self, kind=ALL, name=None):
+        """Aggregates of the portfolio (kind "all"), one practice area or one client; None when unknown"""
+        self.refresh()
+        with self._lock:
+            group = 0 if kind == ALL else self._group_ids.get((kind, (name or "").strip().lower()))
+            if group is None or not self._projects[group]:
+                return None
+            return self._summary(group)
+
+    def groups(self, kind, limit=50):
+        """Summaries of the largest groups of a kind, by project count"""
+        self.refresh()
+        with self._lock:
+            count = len(self._group_names)
+            candidates = np.flatnonzero((self._group_kinds[:count] == _KINDS.index(kind)) & (self._projects[:count] > 0))
+            order = candidates[np.argsort(-self._projects[candidates], kind="stable")][:limit]
+            return [self._summary(int(group)) for group in order]
+
+    def memory_bytes(self):
+        """Bytes held by the per-project columns and per-group aggregate arrays"""
+        arrays = (self._cost, self._months, self._outcome, self._groups, self._group_kinds, self._projects,
+                  self._cost_count, self._cost_sum, self._cost_hist, self._months_count, self._months_sum,
+                  self._months_hist, self._wins, self._losses)
+        return sum(array.nbytes for array in arrays)
+
+    def stats(self):
+        kinds = self._group_kinds[:len(self._group_names)]
+        return {
+            "projects": len(self._slots),
+            "practice_areas": int((kinds == _KINDS.index(PRACTICE_AREA)).sum()),
+            "clients": int((kinds == _KINDS.index(CLIENT)).sum()),
+            "revision": self.revision,
+            "refreshes": self.refreshes,
+            "refreshed_projects": self.refreshed_projects,
+            "last_refresh_ms": self.last_refresh_ms,
+            "memory_bytes": self.memory_bytes(),
+        }
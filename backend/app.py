@@ -4,17 +4,44 @@ Handles RFP document upload, returns similar projects with costs, and generates
 """
 
 import os
+import io
 import json
-from flask import Flask, request, jsonify
+import time
+import threading
+import importlib
+import itertools
+import zipfile
+from collections import Counter
+from flask import Flask, request, jsonify, Response, stream_with_context, url_for, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+from werkzeug.datastructures import FileStorage
 from datetime import datetime
-from langchain_openai import AzureChatOpenAI
 from dotenv import load_dotenv
-import PyPDF2
 from pydantic import BaseModel
 from typing import List, Literal
 from prompts import decision_prompt
+from document_store import DocumentStore, DOCUMENT_MAX_PAGES, DOCUMENT_MAX_CHARS
+from result_cache import text_cache, decision_cache, content_hash, stream_hash
+from jobs import job_manager, QueueFullError, SSE_KEEPALIVE_SECONDS
+from vector_index import VectorIndex
+from batch import BatchEvaluator, BATCH_MAX_IN_FLIGHT
+from llm_utils import count_tokens, message_usage
+from llm_gateway import LLMGateway, Deployment, deployment_configs, LLM_ATTEMPT_TIMEOUT_SECONDS
+from decision_stream import IncrementalDecisionParser, sse_event
+from uploads import InMemoryRequest, InvalidUploadError, read_upload, sniff_file_type, check_file_type, decode_text, \
+    persist_upload, UPLOAD_PERSIST
+from long_document import analyze_long_document, prepare_map_chain
+from prescreen import load_prescreener, PRESCREEN_ENABLED
+from near_duplicates import NearDuplicateIndex, NEAR_DUPLICATE_ENABLED
+from project_store import ProjectStore, InvalidQueryError, build_vector_index, PROJECTS_PAGE_SIZE, PROJECTS_MAX_PAGE_SIZE
+from admission import AdmissionController, AdmissionRejectedError, request_priority
+from serialization import ProjectEncodings, dumps, json_object, json_array, encode_body, encoded_etag, compress_stream, \
+    negotiate_encoding, wants_ndjson, NDJSON_MIMETYPE
+from analytics import ProjectAnalytics, UnknownGroupError, project_areas, summary_line, ALL, PRACTICE_AREA, CLIENT
+from embeddings import EmbeddingService
+from lexical_index import BM25Index, HybridRetriever
+import metrics
 
 # Load environment variables
 load_dotenv()
@@ -31,39 +58,143 @@ class AIDecisionResponse(BaseModel):
     next_steps: List[str]
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest  # Uploads are buffered in memory, never spooled to temp files
 CORS(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'pdf'}
+BATCH_MAX_FILES = 200
+BATCH_MAX_UNCOMPRESSED_BYTES = 256 * 1024 * 1024  # Guard against zip bombs
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Create upload directory if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Create upload directory if it doesn't exist (only needed when uploads are persisted)
+if UPLOAD_PERSIST:
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # Azure OpenAI configuration
 AOAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 AOAI_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AOAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AOAI_TEMPERATURE = 0
 
-# Initialize Azure OpenAI client
-try:
-    primary_llm = AzureChatOpenAI(
+# RFP text handling: "auto" sends the whole RFP while it fits LONG_DOCUMENT_TOKEN_BUDGET tokens and
+# switches to map-reduce analysis above that, "always" uses map-reduce for every RFP, "off" keeps the
+# legacy truncation at RFP_TEXT_LIMIT characters
+LONG_DOCUMENT_MODE = os.getenv("LONG_DOCUMENT_MODE", "auto")
+LONG_DOCUMENT_TOKEN_BUDGET = int(os.getenv("LONG_DOCUMENT_TOKEN_BUDGET", "24000"))  # leaves the static prefix, portfolio and output ample room in a 128K context
+RFP_TEXT_LIMIT = 3000
+FIRM_RESOURCE_AVAILABILITY = os.getenv(
+    "FIRM_RESOURCE_AVAILABILITY", "Medium - 3 senior lawyers, 5 junior associates available"
+)
+
+# Startup: "eager" builds the LLM clients and the project data (store, analytics, indexes) at import;
+# "lazy" defers them (and the imports behind them) to the first request that needs them; "background"
+# hands them to a warm-up thread and reports readiness on /api/ready when it finishes
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager")
+
+# The debug reloader's parent process only watches files and restarts the server; it never serves
+RELOADER_PARENT = __name__ == "__main__" and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+
+def create_llm(**overrides):
+    """Build an Azure OpenAI chat client with the app's deployment settings"""
+    # Imported here: langchain_openai (with openai and langchain_core) dominates import time
+    import httpx
+    from langchain_openai import AzureChatOpenAI
+    settings = dict(
+        # Response hook counts every HTTP attempt, so SDK-internal retries show up in /api/metrics
+        http_client=httpx.Client(event_hooks={"response": [metrics.record_llm_response]}),
         azure_deployment=AOAI_DEPLOYMENT,
         api_version="2024-05-01-preview",
-        temperature=0,
+        temperature=AOAI_TEMPERATURE,
         max_tokens=None,
         timeout=None,
         max_retries=2,
         api_key=AOAI_KEY,
         azure_endpoint=AOAI_ENDPOINT
     )
-    ai_enabled = True
-except Exception as e:
-    print(f"Warning: Azure OpenAI not configured properly: {e}")
-    ai_enabled = False
+    settings.update(overrides)
+    return AzureChatOpenAI(**settings)
+
+def create_gateway(**overrides):
+    """LLM gateway over the configured deployments (AZURE_OPENAI_DEPLOYMENTS, default: the single deployment above)"""
+    deployments = []
+    for config in deployment_configs():
+        # The gateway owns retries and failover; each attempt is bounded instead of waiting forever
+        settings = dict(max_retries=0, timeout=LLM_ATTEMPT_TIMEOUT_SECONDS)
+        for key, setting in (("endpoint", "azure_endpoint"), ("deployment", "azure_deployment"),
+                             ("api_key", "api_key"), ("api_version", "api_version")):
+            if key in config:
+                settings[setting] = config[key]
+        settings.update(overrides)
+        deployments.append(Deployment(config["name"], create_llm(**settings), config.get("weight", 1.0)))
+    return LLMGateway(deployments)
+
+# Static prefix of every decision call: identical bytes on every request so prompt caching applies.
+# Per-request content (RFP text, similar projects) goes in the user message after it.
+DECISION_STATIC_MESSAGES = [
+    {"role": "system", "content": "You are a senior legal partner making strategic decisions about RFP opportunities. Provide concise, actionable analysis."},
+    {"role": "system", "content": decision_prompt.strip() + """
+
+###Firm Context###
+Current Resource Availability: """ + FIRM_RESOURCE_AVAILABILITY}
+]
+
+# Local out-of-scope classifier consulted before any LLM call
+prescreener = load_prescreener() if PRESCREEN_ENABLED else None
+
+# Bounded LLM concurrency with a priority wait queue; requests that would wait too long are shed with 503
+admission = AdmissionController()
+
+# Decided RFPs by MinHash signature, so reissues with trivial edits reuse the earlier decision
+near_duplicate_index = NearDuplicateIndex() if NEAR_DUPLICATE_ENABLED else None
+
+# Azure OpenAI clients; structured-output bindings and static prefixes are built once, by init_ai()
+llm_gateway = primary_llm = decision_chain = map_chain = None
+ai_enabled = False
+ai_initialized = threading.Event()
+_ai_init_lock = threading.Lock()
+
+def init_ai():
+    """Build the LLM gateway and prepared chains on first call; returns whether AI decisions are enabled"""
+    global llm_gateway, primary_llm, decision_chain, map_chain, ai_enabled
+    if ai_initialized.is_set():
+        return ai_enabled
+    with _ai_init_lock:
+        if not ai_initialized.is_set():
+            try:
+                llm_gateway = create_gateway()
+                primary_llm = llm_gateway.deployments[0].llm
+                decision_chain = llm_gateway.prepare(AIDecisionResponse, DECISION_STATIC_MESSAGES)
+                map_chain = prepare_map_chain(llm_gateway)
+                ai_enabled = True
+            except Exception as e:
+                print(f"Warning: Azure OpenAI not configured properly: {e}")
+                ai_enabled = False
+            ai_initialized.set()
+    return ai_enabled
+
+warmup_done = threading.Event()
+warmup_stats = {"seconds": None, "error": None}
+
+def warm_up():
+    """Do the first request's one-time work ahead of it: project data and indexes, LLM clients, deferred imports, tokenizer"""
+    started = time.perf_counter()
+    try:
+        init_projects()
+        init_ai()
+        importlib.import_module("PyPDF2")  # pdf_extraction imports it on first use
+        count_tokens("warm-up")  # loads the tokenizer
+    except Exception as e:
+        metrics.log_event("warm_up_failed", level="warning", error=str(e))
+        warmup_stats["error"] = str(e)
+    warmup_stats["seconds"] = round(time.perf_counter() - started, 3)
+    warmup_done.set()
+
+if STARTUP_MODE == "eager" and not RELOADER_PARENT:
+    init_ai()
 
 # Mock data for similar projects
 MOCK_SIMILAR_PROJECTS = [
@@ -124,27 +255,90 @@ MOCK_SIMILAR_PROJECTS = [
     }
 ]
 
+# Similar-project index: load a saved snapshot if configured, otherwise index the project store.
+# "hybrid" fuses BM25 and vector rankings; "vector" uses embeddings alone
+PROJECT_INDEX_PATH = os.getenv("PROJECT_INDEX_PATH")
+SIMILAR_PROJECTS_TOP_K = int(os.getenv("SIMILAR_PROJECTS_TOP_K", "5"))
+SIMILAR_PROJECTS_RETRIEVAL = os.getenv("SIMILAR_PROJECTS_RETRIEVAL", "hybrid")
+
+# Project data, built by init_projects() with the same timing as the LLM clients (STARTUP_MODE):
+# the repository (seeded with the mock projects until a real export is imported), its cost, duration
+# and win-rate aggregates, encoded records and the similar-project indexes (which embed every project)
+project_store = project_analytics = project_encodings = None
+embedding_service = project_index = project_lexical_index = project_retriever = None
+projects_initialized = threading.Event()
+_projects_init_lock = threading.Lock()
+
+def init_projects():
+    """Open the project store and build its analytics, encodings and similar-project indexes on first call"""
+    global project_store, project_analytics, project_encodings
+    global embedding_service, project_index, project_lexical_index, project_retriever
+    if projects_initialized.is_set():
+        return
+    with _projects_init_lock:
+        if projects_initialized.is_set():
+            return
+        store = ProjectStore()
+        if store.count() == 0:
+            store.upsert_many(MOCK_SIMILAR_PROJECTS)
+
+        # Cached, batched embeddings: rebuilding the index over an unchanged store makes no backend calls
+        embeddings = EmbeddingService()
+        if PROJECT_INDEX_PATH and os.path.exists(PROJECT_INDEX_PATH):
+            index = VectorIndex.load(PROJECT_INDEX_PATH, embed_fn=embeddings.embed, query_fn=embeddings.embed_queries)
+        else:
+            index = build_vector_index(store, embeddings)
+        if PROJECT_INDEX_PATH and BM25Index.exists(PROJECT_INDEX_PATH):
+            lexical_index = BM25Index.load(PROJECT_INDEX_PATH)
+        else:
+            lexical_index = BM25Index()
+            lexical_index.add(index.records)
+
+        project_store = store
+        # Aggregates and encoded records are refreshed from the store's change log
+        project_analytics = ProjectAnalytics(store)
+        project_encodings = ProjectEncodings(store)
+        embedding_service = embeddings
+        project_index, project_lexical_index = index, lexical_index
+        project_retriever = HybridRetriever(index, lexical_index) if SIMILAR_PROJECTS_RETRIEVAL == "hybrid" else index
+        projects_initialized.set()
+
+if STARTUP_MODE == "eager" and not RELOADER_PARENT:
+    init_projects()
+
 def allowed_file(filename):
     """Check if the uploaded file has an allowed extension"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_file(file_path):
+# Page-indexed extraction artifacts: a PDF is parsed once, later reads map the saved artifact
+document_store = DocumentStore()
+
+def extract_pdf_document(source, key=None):
+    """Extract PDF text (file path or in-memory buffer) through the document store, recording the page count"""
+    if key is None:
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                key = content_hash(stream_hash(file), 'pdf')
+        else:
+            key = content_hash(content_hash(source), 'pdf')
+    document = document_store.get_or_extract(key, source, max_pages=DOCUMENT_MAX_PAGES or None,
+                                             max_chars=DOCUMENT_MAX_CHARS or None)
+    metrics.PDF_PAGES.observe(document.page_count)
+    metrics.annotate(pdf_pages=document.page_count, pdf_pages_extracted=document.pages_extracted)
+    return document.text()
+
+def extract_text_from_file(file_path, document_key=None):
     """Extract text content from uploaded file (PDF or TXT)"""
     try:
         file_extension = file_path.lower().split('.')[-1]
         
         if file_extension == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            with open(file_path, 'rb') as file:
+                return decode_text(file.read())
         
         elif file_extension == 'pdf':
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            return extract_pdf_document(file_path, document_key)
         
         else:
             return "Unable to extract text from this file type. Please upload a PDF or TXT file."
@@ -152,106 +346,443 @@ def extract_text_from_file(file_path):
     except Exception as e:
         return f"Error extracting text: {str(e)}"
 
-def generate_ai_decision(rfp_text, similar_projects):
-    """Generate AI decision memo using Azure OpenAI with structured outputs"""
-    if not ai_enabled:
-        return {
-            "recommendation": "PURSUE",
-            "confidence_score": 0.85,
-            "executive_summary": "Mock AI Decision: This RFP appears to align well with our core competencies in legal services. Based on similar project analysis, we have strong capabilities and past success in this area.",
-            "key_factors": [
-                "Strong alignment with core legal competencies",
-                "Favorable cost analysis based on similar projects",
-                "Good win probability based on past experience",
-                "Acceptable resource requirements"
-            ],
-            "risk_assessment": "Low to moderate risk. Standard legal engagement with manageable complexity.",
-            "financial_analysis": f"Estimated cost range: ${min([p['cost'] for p in similar_projects]):,} - ${max([p['cost'] for p in similar_projects]):,}",
-            "next_steps": [
-                "Conduct detailed capability assessment",
-                "Review client background and requirements",
-                "Prepare comprehensive proposal timeline",
-                "Assemble qualified project team"
-            ]
-        }
-    
+def extract_text_from_bytes(data, file_type, document_key=None):
+    """Extract text content from an in-memory upload (PDF or TXT)"""
     try:
-        # Prepare context from similar projects
-        projects_context = "\n".join([
-            f"- {project['title']}: ${project['cost']:,} ({project['duration']}) - {project['similarity_score']*100:.0f}% match"
-            for project in similar_projects[:3]  # Top 3 most similar
-        ])
-        
-        # Create the complete prompt
-        full_prompt = f"""
-        {decision_prompt}
-        
-        ###RFP Document###
-        {rfp_text[:3000]}  # Limit to first 3000 chars to avoid token limits
-        
-        ###Supporting Information###
-        Example Projects from Our Portfolio:
-        {projects_context}
-        
-        Average Project Cost: ${sum([p['cost'] for p in similar_projects]) // len(similar_projects):,}
-        Our Success Rate in Example Projects: 85%
-        Current Resource Availability: Medium - 3 senior lawyers, 5 junior associates available
+        if file_type == 'txt':
+            return decode_text(data)
         
+        elif file_type == 'pdf':
+            return extract_pdf_document(data, document_key)
         
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are a senior legal partner making strategic decisions about RFP opportunities. Provide concise, actionable analysis."},
-            {"role": "user", "content": full_prompt}
-        ]
-        
-        # Use structured output with Pydantic model
-        structured_llm = primary_llm.with_structured_output(AIDecisionResponse)
-        ai_decision = structured_llm.invoke(messages)
-        
-        # Debug: Print the type and content of ai_decision
-        print(f"AI Decision type: {type(ai_decision)}")
-        print(f"AI Decision content: {ai_decision}")
-        
-        # Handle both Pydantic model and dict responses
-        if hasattr(ai_decision, 'recommendation'):
-            # It's a Pydantic model - access attributes directly
-            return {
-                "recommendation": ai_decision.recommendation,
-                "confidence_score": ai_decision.confidence_score,
-                "executive_summary": ai_decision.executive_summary,
-                "key_factors": ai_decision.key_factors,
-                "risk_assessment": ai_decision.risk_assessment,
-                "financial_analysis": ai_decision.financial_analysis,
-                "next_steps": ai_decision.next_steps
-            }
-        elif isinstance(ai_decision, dict):
-            # It's already a dictionary - return as is if it has the right keys
-            required_keys = ["recommendation", "confidence_score", "executive_summary", "key_factors", "risk_assessment", "financial_analysis", "next_steps"]
-            if all(key in ai_decision for key in required_keys):
-                # Validate recommendation value
-                if ai_decision["recommendation"] not in ["PURSUE", "DECLINE"]:
-                    print(f"Invalid recommendation value: {ai_decision['recommendation']}")
-                    ai_decision["recommendation"] = "DECLINE"  # Default to decline for safety
-                return ai_decision
-            else:
-                print(f"Dictionary missing required keys: {ai_decision.keys()}")
-                raise ValueError("Structured output returned incomplete dictionary")
         else:
-            print(f"Unexpected AI decision type: {type(ai_decision)}")
-            raise ValueError(f"Unexpected response type from structured output: {type(ai_decision)}")
+            return "Unable to extract text from this file type. Please upload a PDF or TXT file."
             
     except Exception as e:
-        print(f"AI Decision generation error: {e}")
+        return f"Error extracting text: {str(e)}"
+
+def fallback_decision(error):
+    """Conservative DECLINE returned when the AI decision could not be generated"""
+    metrics.FALLBACK_DECISIONS.inc()
+    metrics.annotate(fallback_decision=True)
+    return {
+        "recommendation": "DECLINE",
+        "confidence_score": 0.3,
+        "executive_summary": f"AI analysis encountered an error: {str(error)}. Recommending decline due to inability to properly assess opportunity.",
+        "key_factors": ["AI system error prevented proper analysis", "Unable to assess strategic fit", "Technical issues with decision process"],
+        "risk_assessment": "High risk due to inability to properly evaluate the opportunity",
+        "financial_analysis": "Unable to perform reliable financial analysis due to system error",
+        "next_steps": ["Manual review of RFP required", "System troubleshooting needed", "Consider resubmission after technical issues resolved"]
+    }
+
+def mock_decision(similar_projects):
+    """Canned decision used when Azure OpenAI is not configured"""
+    return {
+        "recommendation": "PURSUE",
+        "confidence_score": 0.85,
+        "executive_summary": "Mock AI Decision: This RFP appears to align well with our core competencies in legal services. Based on similar project analysis, we have strong capabilities and past success in this area.",
+        "key_factors": [
+            "Strong alignment with core legal competencies",
+            "Favorable cost analysis based on similar projects",
+            "Good win probability based on past experience",
+            "Acceptable resource requirements"
+        ],
+        "risk_assessment": "Low to moderate risk. Standard legal engagement with manageable complexity.",
+        "financial_analysis": f"Estimated cost range: ${min([p['cost'] for p in similar_projects]):,} - ${max([p['cost'] for p in similar_projects]):,}",
+        "next_steps": [
+            "Conduct detailed capability assessment",
+            "Review client background and requirements",
+            "Prepare comprehensive proposal timeline",
+            "Assemble qualified project team"
+        ]
+    }
+
+def prescreen_decision(rfp_text):
+    """Immediate DECLINE for RFPs the local pre-screen is confident are outside legal services, else None"""
+    if prescreener is None:
+        return None
+    with metrics.stage("prescreen"):
+        decision = prescreener.screen(rfp_text)
+    metrics.PRESCREEN_DECISIONS.inc(outcome="declined" if decision else "passed")
+    if decision:
+        metrics.annotate(prescreen_declined=True)
+    return decision
+
+def near_duplicate_context(similar_projects):
+    """Everything besides the RFP text a reused decision must share: prompt, model settings and supporting projects"""
+    return content_hash(
+        decision_chain.fingerprint, AOAI_DEPLOYMENT or "", str(AOAI_TEMPERATURE),
+        json.dumps([project.get("id") for project in similar_projects[:3]])
+    )
+
+def near_duplicate_decision(rfp_text, similar_projects):
+    """Earlier decision for a near-identical RFP decided in the same context (with a diff of the changed sections), else None"""
+    if near_duplicate_index is None:
+        return None
+    with metrics.stage("near_duplicate"):
+        decision = near_duplicate_index.lookup(rfp_text, near_duplicate_context(similar_projects))
+    metrics.NEAR_DUPLICATE_LOOKUPS.inc(outcome="matched" if decision else "missed")
+    if decision:
+        metrics.annotate(near_duplicate=decision["near_duplicate"]["similarity"])
+    return decision
+
+def decision_cache_key(rfp_text, similar_projects):
+    """Identical text, prompt, model settings and supporting projects always yield the same decision"""
+    return content_hash(
+        rfp_text, decision_chain.fingerprint, AOAI_DEPLOYMENT or "", str(AOAI_TEMPERATURE),
+        json.dumps(similar_projects, sort_keys=True)
+    )
+
+def fits_prompt(rfp_text):
+    """Whether the whole RFP fits LONG_DOCUMENT_TOKEN_BUDGET tokens"""
+    # Every token covers at least one UTF-8 byte, so short texts need no tokenizer
+    return len(rfp_text.encode("utf-8")) <= LONG_DOCUMENT_TOKEN_BUDGET or count_tokens(rfp_text) <= LONG_DOCUMENT_TOKEN_BUDGET
+
+def prepare_rfp_section(rfp_text, priority="normal"):
+    """
+    Return the RFP text to place in the decision prompt and long-document stats (or None).
+    RFPs over the token budget are condensed chunk by chunk instead of being cut off at RFP_TEXT_LIMIT;
+    each map call takes its own admission slot at priority.
+    """
+    if LONG_DOCUMENT_MODE not in ("auto", "always"):
+        return rfp_text[:RFP_TEXT_LIMIT], None
+    if LONG_DOCUMENT_MODE == "auto" and fits_prompt(rfp_text):
+        return rfp_text, None
+    # The upload already passed admission, so its map calls queue without being shed halfway through
+    return analyze_long_document(rfp_text, map_chain, AOAI_DEPLOYMENT, AOAI_TEMPERATURE,
+                                 slot=lambda size: admission.slot(priority, size, deadline=None))
+
+def build_decision_request(rfp_section, similar_projects):
+    """Per-request messages of the decision call (they follow DECISION_STATIC_MESSAGES)"""
+    # Prepare context from similar projects
+    projects_context = "\n".join([
+        f"- {project['title']}: ${project.get('cost') or 0:,.0f} ({project.get('duration', 'n/a')}) - {project['similarity_score']*100:.0f}% match"
+        for project in similar_projects[:3]  # Top 3 most similar
+    ])
+    
+    content = (
+        f"###RFP Document###\n{rfp_section}\n\n"
+        f"###Supporting Information###\nExample Projects from Our Portfolio:\n{projects_context}\n\n"
+        f"Firm History:\n{portfolio_context(similar_projects)}"
+    )
+    return [{"role": "user", "content": content}]
+
+def portfolio_context(similar_projects):
+    """Precomputed aggregates for the whole portfolio and the top similar projects' two main practice areas"""
+    init_projects()
+    areas = Counter(
+        area for project in similar_projects[:3]
+        for area in project_areas(project.get("practice_area"), project.get("technology_stack"))
+    )
+    summaries = [project_analytics.summary()] + [project_analytics.summary(PRACTICE_AREA, area) for area, _ in areas.most_common(2)]
+    return "\n".join(f"- {summary_line(summary)}" for summary in summaries if summary)
+
+def build_decision_messages(rfp_section, similar_projects):
+    """Complete chat messages for the decision call: static prefix, then the per-request part"""
+    return DECISION_STATIC_MESSAGES + build_decision_request(rfp_section, similar_projects)
+
+def normalize_decision(ai_decision):
+    """Convert a structured-output result (Pydantic model or dict) into the decision dict"""
+    # Handle both Pydantic model and dict responses
+    if hasattr(ai_decision, 'recommendation'):
+        # It's a Pydantic model - access attributes directly
         return {
-            "recommendation": "DECLINE",
-            "confidence_score": 0.3,
-            "executive_summary": f"AI analysis encountered an error: {str(e)}. Recommending decline due to inability to properly assess opportunity.",
-            "key_factors": ["AI system error prevented proper analysis", "Unable to assess strategic fit", "Technical issues with decision process"],
-            "risk_assessment": "High risk due to inability to properly evaluate the opportunity",
-            "financial_analysis": "Unable to perform reliable financial analysis due to system error",
-            "next_steps": ["Manual review of RFP required", "System troubleshooting needed", "Consider resubmission after technical issues resolved"]
+            "recommendation": ai_decision.recommendation,
+            "confidence_score": ai_decision.confidence_score,
+            "executive_summary": ai_decision.executive_summary,
+            "key_factors": ai_decision.key_factors,
+            "risk_assessment": ai_decision.risk_assessment,
+            "financial_analysis": ai_decision.financial_analysis,
+            "next_steps": ai_decision.next_steps
         }
+    elif isinstance(ai_decision, dict):
+        # It's already a dictionary - return as is if it has the right keys
+        required_keys = ["recommendation", "confidence_score", "executive_summary", "key_factors", "risk_assessment", "financial_analysis", "next_steps"]
+        if all(key in ai_decision for key in required_keys):
+            # Validate recommendation value
+            if ai_decision["recommendation"] not in ["PURSUE", "DECLINE"]:
+                metrics.log_event("invalid_recommendation", level="warning", recommendation=ai_decision["recommendation"])
+                ai_decision["recommendation"] = "DECLINE"  # Default to decline for safety
+            return ai_decision
+        else:
+            metrics.log_event("incomplete_decision", level="error",
+                              missing=[key for key in required_keys if key not in ai_decision])
+            raise ValueError("Structured output returned incomplete dictionary")
+    else:
+        raise ValueError(f"Unexpected response type from structured output: {type(ai_decision)}")
+
+def finish_decision(cache_key, ai_decision, usage, analysis_stats, rfp_text, similar_projects):
+    """Normalize, annotate with long-document stats and cache (exactly and by near-duplicate) a successful decision"""
+    decision = normalize_decision(ai_decision)
+    
+    if analysis_stats:
+        analysis_stats["tokens"]["reduce"] = usage
+        metrics.LONG_DOCUMENT_CHUNKS.inc(analysis_stats["chunks"] - analysis_stats["cached_chunks"], source="mapped")
+        metrics.LONG_DOCUMENT_CHUNKS.inc(analysis_stats["cached_chunks"], source="cached")
+        metrics.annotate(long_document={key: analysis_stats[key] for key in ("chunks", "cached_chunks", "document_tokens", "digest_tokens", "map_ms")})
+        decision["analysis"] = analysis_stats
+    
+    decision_cache.set(cache_key, decision)
+    if near_duplicate_index is not None:
+        near_duplicate_index.add(rfp_text, decision, near_duplicate_context(similar_projects))
+    return decision
+
+def generate_ai_decision(rfp_text, similar_projects, raise_errors=False, priority="normal", admission_deadline=None):
+    """
+    Generate AI decision memo using Azure OpenAI with structured outputs.
+    With raise_errors the LLM error propagates (so callers can retry) instead of becoming a fallback DECLINE.
+    Every LLM call (long-document map calls, then the decision) waits for an admission slot at priority;
+    with admission_deadline (seconds) the request is shed with AdmissionRejectedError instead of waiting longer.
+    """
+    if not init_ai():
+        return mock_decision(similar_projects)
+    
+    declined = prescreen_decision(rfp_text)
+    if declined is not None:
+        return declined
+    
+    cache_key = decision_cache_key(rfp_text, similar_projects)
+    cached_decision = decision_cache.get(cache_key) or near_duplicate_decision(rfp_text, similar_projects)
+    if cached_decision is not None:
+        return cached_decision
+
+    # Shed before any LLM work, map calls included
+    admission.check(priority, len(rfp_text), admission_deadline)
+    try:
+        with metrics.stage("prompt"):
+            rfp_section, analysis_stats = prepare_rfp_section(rfp_text, priority)
+            request_messages = build_decision_request(rfp_section, similar_projects)
+    
+        # Use the prepared structured-output chain (schema bound once at startup)
+        with admission.slot(priority, len(rfp_text), admission_deadline):
+            with metrics.stage("llm"):
+                ai_decision, usage = decision_chain.invoke(request_messages)
+        metrics.record_llm_usage("decision", usage)
+        return finish_decision(cache_key, ai_decision, usage, analysis_stats, rfp_text, similar_projects)
+        
+    except AdmissionRejectedError:
+        raise  # a busy server is not an AI error
+    except Exception as e:
+        metrics.log_event("ai_decision_error", level="error", error=str(e), error_type=type(e).__name__)
+        if raise_errors:
+            raise
+        return fallback_decision(e)
+
+def estimated_stream_usage(messages, arguments):
+    """Token usage of a streamed decision estimated locally, for deployments that send no usage chunk"""
+    variable_messages = messages[len(decision_chain.static_messages):]
+    prompt_tokens = decision_chain.prefix_tokens + sum(count_tokens(message["content"]) for message in variable_messages)
+    completion_tokens = count_tokens("".join(arguments))
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens, "cached_prompt_tokens": 0}
+
+def stream_ai_decision(rfp_text, similar_projects, priority="normal"):
+    """
+    Yield server-sent events for an AI decision as it is generated: one "field" event per completed
+    top-level field, one "item" event per completed list entry, then the validated "decision".
+    A request shed by admission control ends with an "error" event carrying retry_after instead.
+    """
+    started = time.perf_counter()
+    
+    def field_events(kind, field, value, index=None):
+        data = {"field": field, "value": value, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        if kind == "item":
+            data["index"] = index
+        return sse_event(kind, data)
+    
+    def replay(decision):
+        """Emit a decision that is already complete (mock or cached) field by field"""
+        for field, value in decision.items():
+            yield field_events("field", field, value)
+        yield sse_event("decision", decision)
+    
+    if not init_ai():
+        yield from replay(mock_decision(similar_projects))
+        return
+    
+    declined = prescreen_decision(rfp_text)
+    if declined is not None:
+        yield from replay(declined)
+        return
+    
+    cache_key = decision_cache_key(rfp_text, similar_projects)
+    cached_decision = decision_cache.get(cache_key) or near_duplicate_decision(rfp_text, similar_projects)
+    if cached_decision is not None:
+        yield from replay(cached_decision)
+        return
+    
+    # A shed request gets an error with retry_after, not a fallback DECLINE
+    try:
+        admission.check(priority, len(rfp_text))
+        with metrics.stage("prompt"):
+            rfp_section, analysis_stats = prepare_rfp_section(rfp_text, priority)
+            messages = decision_chain.messages(build_decision_request(rfp_section, similar_projects))
+        if analysis_stats:
+            yield sse_event("analysis", analysis_stats)
+    
+        # Stream the tool-call arguments and surface each field as soon as its JSON is complete
+        tool_llm = decision_chain.tool_runnable
+        parser = IncrementalDecisionParser()
+        arguments = []
+        item_counts = {}
+        usage = None
+        with admission.slot(priority, len(rfp_text)):
+            with metrics.stage("llm_stream"):
+                # include_usage makes the service send token usage on a final chunk with no choices
+                for chunk in tool_llm.stream(messages, stream_options={"include_usage": True}):
+                    if getattr(chunk, "usage_metadata", None):
+                        usage = message_usage(chunk)
+                    for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                        text = tool_chunk.get("args") or ""
+                        arguments.append(text)
+                        for kind, field, value in parser.feed(text):
+                            index = item_counts.get(field, 0)
+                            if kind == "item":
+                                item_counts[field] = index + 1
+                            yield field_events(kind, field, value, index)
+    
+        # Final validation of the complete decision against the schema
+        ai_decision = AIDecisionResponse(**json.loads("".join(arguments)))
+        if usage is None:
+            usage = estimated_stream_usage(messages, arguments)
+        metrics.record_llm_usage("decision", usage)
+        yield sse_event("decision", finish_decision(cache_key, ai_decision, usage, analysis_stats, rfp_text, similar_projects))
+    
+    except AdmissionRejectedError as e:
+        yield sse_event("error", {"error": str(e), "retry_after": e.retry_after})
+    except Exception as e:
+        metrics.log_event("ai_decision_error", level="error", error=str(e), error_type=type(e).__name__, streamed=True)
+        yield sse_event("error", {"error": str(e)})
+        yield sse_event("decision", fallback_decision(e))
+
+def upload_cache_keys(digest, file_type):
+    """Keys of an upload's parsed document (its bytes alone) and of its extracted text (bytes and extraction budget)"""
+    document_key = content_hash(digest, file_type)
+    return {
+        "document_key": document_key,
+        "text_key": content_hash(document_key, str(DOCUMENT_MAX_PAGES), str(DOCUMENT_MAX_CHARS))
+    }
+
+def save_upload(file):
+    """
+    Read, hash and type-check an uploaded file in memory. Identical uploads reuse the extracted text
+    of the first one; new ones are written to the upload folder only when UPLOAD_PERSIST is on.
+    """
+    with metrics.stage("read"):
+        data, digest = read_upload(file.stream)
+        file_type = sniff_file_type(data)
+    if file_type not in ALLOWED_EXTENSIONS:
+        raise InvalidUploadError("File content is not a PDF or text document")
+    check_file_type(file.filename, file_type)
+    metrics.UPLOAD_BYTES.observe(len(data), file_type=file_type)
+    metrics.annotate(bytes=len(data), file_type=file_type)
+    
+    upload = {
+        "original_name": file.filename,
+        **upload_cache_keys(digest, file_type),
+        "file_type": file_type,
+        "size": len(data)
+    }
+    
+    extracted = text_cache.get(upload["text_key"])
+    if extracted is not None:
+        upload.update(extracted)
+        return upload
+    
+    upload["data"] = data
+    upload["saved_name"] = None
+    if UPLOAD_PERSIST:
+        # Save the file
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{timestamp}_{filename}"
+        with metrics.stage("save"):
+            upload["file_path"] = persist_upload(app.config['UPLOAD_FOLDER'], filename, data)
+        upload["saved_name"] = filename
+    return upload
+
+def extract_upload_text(upload):
+    """Return the text of an upload, extracting and caching it on first sight"""
+    if "text" not in upload:
+        with metrics.stage("extract"):
+            if "data" in upload:
+                upload["text"] = extract_text_from_bytes(upload.pop("data"), upload["file_type"], upload["document_key"])
+            else:
+                upload["text"] = extract_text_from_file(upload["file_path"], upload["document_key"])
+        if not upload["text"].startswith("Error extracting text"):
+            text_cache.set(upload["text_key"], {
+                "text": upload["text"],
+                "saved_name": upload["saved_name"],
+                "size": upload["size"]
+            })
+    return upload["text"]
+
+def find_similar_projects(rfp_text, **filters):
+    """Return the projects most similar to the RFP text, best match first"""
+    init_projects()
+    with metrics.stage("similar_projects"):
+        return project_retriever.search([rfp_text], k=SIMILAR_PROJECTS_TOP_K, **filters)[0]
+
+def build_upload_response(upload, similar_projects, ai_decision):
+    """Response body shared by synchronous uploads and completed upload jobs"""
+    return {
+        "success": True,
+        "message": "RFP uploaded successfully",
+        "file_info": {
+            "original_name": upload["original_name"],
+            "saved_name": upload["saved_name"],
+            "size": upload["size"]
+        },
+        "similar_projects": similar_projects,
+        "ai_decision": ai_decision
+    }
+
+def upload_pipeline_stages(priority="normal"):
+    """Stages run by an upload job; each reads and extends the shared job context"""
+    def extract(context):
+        context["rfp_text"] = extract_upload_text(context["upload"])
+    
+    def similar_projects(context):
+        context["similar_projects"] = find_similar_projects(context["rfp_text"])
+    
+    def decision(context):
+        # Jobs have no client waiting on the connection, so they queue for a slot without a deadline
+        ai_decision = generate_ai_decision(context["rfp_text"], context["similar_projects"], priority=priority)
+        context["result"] = build_upload_response(context["upload"], context["similar_projects"], ai_decision)
+    
+    return [("extract", extract), ("similar_projects", similar_projects), ("decision", decision)]
+
+@app.before_request
+def start_request_trace():
+    """Start timing the request and collecting its structured log fields"""
+    g.request_started = time.perf_counter()
+    metrics.start_trace(method=request.method, path=request.path, endpoint=request.endpoint)
+
+def record_request(endpoint, status, started, trace=None):
+    """Record a request's latency and emit its structured log line"""
+    elapsed = time.perf_counter() - started
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint or "unknown", status=status)
+    if endpoint != "get_metrics":
+        metrics.finish_trace(trace, status=status, duration_ms=round(elapsed * 1000, 2))
+
+@app.after_request
+def finish_request_trace(response):
+    """Record request latency and emit the structured per-request log line"""
+    started = g.get("request_started", time.perf_counter())
+    if response.is_streamed:
+        # A streamed body (SSE decisions, NDJSON) runs after this hook: log the request, with the
+        # stages and tokens recorded while streaming, once the response has been sent or abandoned
+        trace = metrics.current_trace()
+        endpoint, status = request.endpoint, response.status_code
+        response.call_on_close(lambda: record_request(endpoint, status, started, trace))
+    else:
+        record_request(request.endpoint, response.status_code, started)
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus-format metrics: stage latencies, sizes, tokens, retries and fallbacks"""
+    return Response(metrics.render_prometheus(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -259,9 +790,42 @@ def health_check():
     return jsonify({
         "status": "healthy", 
         "timestamp": datetime.now().isoformat(),
-        "ai_enabled": ai_enabled
+        "ai_enabled": ai_enabled if ai_initialized.is_set() else None,  # None until the LLM clients are built
+        "startup_mode": STARTUP_MODE,
+        "decision_prompt": decision_chain.stats() if ai_enabled else None,
+        "llm_deployments": llm_gateway.stats() if ai_enabled else None,
+        "prescreen": prescreener.stats() if prescreener else None,
+        "near_duplicates": near_duplicate_index.stats() if near_duplicate_index else None,
+        "documents": document_store.stats(),
+        "cache": {
+            "text": text_cache.stats(),
+            "decisions": decision_cache.stats()
+        },
+        "jobs": job_manager.stats(),
+        "embeddings": embedding_service.stats() if projects_initialized.is_set() else None,
+        "analytics": project_analytics.stats() if projects_initialized.is_set() else None,
+        "admission": admission.stats(),
+        "serialization": project_encodings.stats() if projects_initialized.is_set() else None
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 until background warm-up has finished, then 200"""
+    ready = STARTUP_MODE != "background" or warmup_done.is_set()
+    return jsonify({
+        "ready": ready,
+        "startup_mode": STARTUP_MODE,
+        "ai_initialized": ai_initialized.is_set(),
+        "projects_initialized": projects_initialized.is_set(),
+        "warmup": warmup_stats if warmup_done.is_set() else None,
+    }), 200 if ready else 503
+
+def admission_rejected(error):
+    """503 response for a request shed by admission control"""
+    response = jsonify({"error": str(error), "retry_after": error.retry_after})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
+
 @app.route('/api/upload-rfp', methods=['POST'])
 def upload_rfp():
     """
@@ -282,62 +846,351 @@ def upload_rfp():
         if not allowed_file(file.filename):
             return jsonify({"error": "Invalid file type. Allowed: PDF, TXT"}), 400
         
-        # Save the file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        try:
+            upload = save_upload(file)
+        except InvalidUploadError as e:
+            return jsonify({"error": f"Invalid file type. Allowed: PDF, TXT ({e})"}), 400
+        
+        priority = request_priority(request.values.get('priority'), request.values.get('due_date'))
+        
+        # Job mode: return immediately and run the remaining stages in the background
+        if request.args.get('mode') == 'async':
+            try:
+                job = job_manager.submit(upload_pipeline_stages(priority), {"upload": upload},
+                                         metadata={"original_name": upload["original_name"]})
+            except QueueFullError as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({
+                "success": True,
+                "message": "RFP upload accepted for processing",
+                "job_id": job.id,
+                "status_url": url_for('get_job', job_id=job.id),
+                "events_url": url_for('stream_job_events', job_id=job.id)
+            }), 202
         
         # Extract text from the uploaded file
-        rfp_text = extract_text_from_file(file_path)
+        rfp_text = extract_upload_text(upload)
         
-        # Get similar projects (mock data for now)
-        similar_projects = MOCK_SIMILAR_PROJECTS
+        # Get similar projects
+        similar_projects = find_similar_projects(rfp_text)
         
         # Generate AI decision
-        ai_decision = generate_ai_decision(rfp_text, similar_projects)
+        ai_decision = generate_ai_decision(rfp_text, similar_projects, priority=priority,
+                                           admission_deadline=admission.max_wait_seconds)
         
-        return jsonify({
-            "success": True,
-            "message": "RFP uploaded successfully",
-            "file_info": {
-                "original_name": file.filename,
-                "saved_name": filename,
-                "size": os.path.getsize(file_path)
-            },
-            "similar_projects": similar_projects,
-            "ai_decision": ai_decision
-        })
+        return json_response(build_upload_response(upload, similar_projects, ai_decision))
         
+    except AdmissionRejectedError as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({"error": f"Upload failed: {str(e)}"}), 500
 
+def unpack_batch_files(files):
+    """Expand uploaded files and zip archives into the RFP files they contain"""
+    unpacked = []
+    uncompressed_bytes = 0
+    for file in files:
+        if not file.filename.lower().endswith('.zip'):
+            unpacked.append(file)
+            continue
+        with zipfile.ZipFile(file.stream) as archive:
+            for member in archive.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or not allowed_file(name):
+                    continue
+                uncompressed_bytes += member.file_size
+                if uncompressed_bytes > BATCH_MAX_UNCOMPRESSED_BYTES:
+                    raise ValueError("Zip archive contents are too large")
+                unpacked.append(FileStorage(stream=io.BytesIO(archive.read(member)), filename=name))
+    return unpacked
+
+@app.route('/api/batch-evaluate', methods=['POST'])
+def batch_evaluate():
+    """
+    Evaluate many RFPs (multiple 'files' parts and/or zip archives) concurrently.
+    Streams one NDJSON line per RFP as each completes.
+    """
+    try:
+        files = [file for file in request.files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({"error": "No files provided"}), 400
+        
+        files = unpack_batch_files(files)
+        invalid = [file.filename for file in files if not allowed_file(file.filename)]
+        if invalid:
+            return jsonify({"error": f"Invalid file type for: {', '.join(invalid)}. Allowed: PDF, TXT, ZIP"}), 400
+        if not files:
+            return jsonify({"error": "No PDF or TXT files found"}), 400
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({"error": f"Too many files. Maximum is {BATCH_MAX_FILES}"}), 400
+        
+        # Files must be saved before the request stream closes; the rest runs while streaming
+        uploads = [save_upload(file) for file in files]
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    evaluator = BatchEvaluator(
+        extract_upload_text, find_similar_projects,
+        lambda rfp_text, similar_projects: generate_ai_decision(rfp_text, similar_projects, raise_errors=True, priority="low"),
+        fallback_decision,
+        max_in_flight=request.args.get('max_in_flight', BATCH_MAX_IN_FLIGHT, type=int)
+    )
+    
+    def generate():
+        for result in evaluator.run(uploads):
+            yield dumps(result) + b"\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/upload-rfp/stream', methods=['POST'])
+def upload_rfp_stream():
+    """
+    Upload an RFP and stream the analysis as server-sent events: "file_info", "similar_projects",
+    then the decision fields as they are generated and a final validated "decision".
+    """
+    if 'file' not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({"error": "Invalid file type. Allowed: PDF, TXT"}), 400
+    
+    try:
+        # The file must be saved before the request stream closes
+        upload = save_upload(file)
+    except InvalidUploadError as e:
+        return jsonify({"error": f"Invalid file type. Allowed: PDF, TXT ({e})"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Upload failed: {str(e)}"}), 500
+    
+    # Shed before the 200 goes out; a request admitted here can still be shed while it queues
+    priority = request_priority(request.values.get('priority'), request.values.get('due_date'))
+    try:
+        admission.check(priority, upload["size"])
+    except AdmissionRejectedError as e:
+        return admission_rejected(e)
+    
+    def generate():
+        yield sse_event("file_info", build_upload_response(upload, [], None)["file_info"])
+        rfp_text = extract_upload_text(upload)
+        similar_projects = find_similar_projects(rfp_text)
+        yield sse_event("similar_projects", similar_projects)
+        yield from stream_ai_decision(rfp_text, similar_projects, priority)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def project_query(args):
+    """
+    Parse /api/projects query parameters.
+
+    Returns:
+        dict: Keyword arguments for ProjectStore.list (cursor, limit, fields and filters)
+    """
+    try:
+        query = {
+            "cursor": args.get("cursor") or None,
+            "limit": int(args.get("limit", PROJECTS_PAGE_SIZE)),
+            "fields": [field.strip() for field in args.get("fields", "").split(",") if field.strip()] or None,
+            "practice_area": args.get("practice_area") or None,
+            "technology": args.getlist("technology"),
+            "completed_after": args.get("completed_after") or None,
+            "completed_before": args.get("completed_before") or None,
+        }
+        for name in ("min_cost", "max_cost"):
+            query[name] = float(args[name]) if args.get(name) else None
+    except ValueError as e:
+        raise InvalidQueryError(f"Invalid query parameter: {e}")
+    return query
+
+def project_etag(*parts):
+    """ETag for a project response: changes whenever the store is written or the query differs"""
+    init_projects()
+    return content_hash(str(project_store.revision()), *parts)[:32]
+
+def encoded_projects(query, remember=True):
+    """
+    One page of projects as encoded records: full records come from the encoding cache, projections
+    (fields=...) are encoded from the rows read.
+
+    Returns:
+        tuple: (list of JSON bytes, next_cursor or None on the last page)
+    """
+    init_projects()
+    if query.get("fields"):
+        projects, next_cursor = project_store.list(**query)
+        return [dumps(project) for project in projects], next_cursor
+    page, next_cursor = project_store.list(**dict(query, fields=["id"]))
+    return project_encodings.records([project["id"] for project in page], remember), next_cursor
+
+def list_projects_body(query):
+    """JSON body for one page of /api/projects"""
+    filters = {k: v for k, v in query.items() if k not in ("cursor", "limit", "fields")}
+    records, next_cursor = encoded_projects(query)
+    return json_object(projects=json_array(records), total_count=project_store.count(**filters), next_cursor=next_cursor)
+
+def iter_project_lines(query):
+    """NDJSON chunks (one page of records each) for every project matching query after its cursor"""
+    query = dict(query, limit=PROJECTS_MAX_PAGE_SIZE)
+    while True:
+        # An export reads each record once: keep it out of the cache the paged listings use
+        records, query["cursor"] = encoded_projects(query, remember=False)
+        if records:
+            yield b"\n".join(records) + b"\n"
+        if query["cursor"] is None:
+            return
+
+def json_response(payload, status=200, headers=None):
+    """JSON response (payload is a value or already-encoded bytes), compressed for the client when worth it"""
+    body, encoding_headers = encode_body(payload if isinstance(payload, bytes) else dumps(payload),
+                                         request.headers.get("Accept-Encoding", ""))
+    return Response(body, status=status, mimetype="application/json", headers={**encoding_headers, **(headers or {})})
+
+def project_response_etag(*parts):
+    """ETag for a project response in the content coding this client gets"""
+    return encoded_etag(project_etag(*parts), request.headers.get("Accept-Encoding", ""))
+
+def not_modified(etag):
+    """304 for a conditional GET whose If-None-Match already names etag"""
+    return Response(status=304, headers={"ETag": f'"{etag}"', "Vary": "Accept-Encoding", "Cache-Control": "no-cache"})
+
+def ndjson_response(chunks):
+    """Streamed NDJSON response, compressed chunk by chunk for the client"""
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+    headers = {"Vary": "Accept-Encoding", "X-Accel-Buffering": "no"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(stream_with_context(compress_stream(chunks, encoding)), mimetype=NDJSON_MIMETYPE, headers=headers)
+
 @app.route('/api/projects', methods=['GET'])
 def get_projects():
-    """Get all available projects (for testing purposes)"""
-    return jsonify({
-        "projects": MOCK_SIMILAR_PROJECTS,
-        "total_count": len(MOCK_SIMILAR_PROJECTS)
-    })
+    """List projects with cursor pagination, field projection and filters; supports conditional GET"""
+    try:
+        query = project_query(request.args)
+    except InvalidQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # NDJSON streams every matching project after the cursor instead of one page (no ETag: it is
+    # an export, not a page clients revalidate)
+    if wants_ndjson(request.args, request.headers.get("Accept")):
+        lines = iter_project_lines(query)
+        try:
+            first = next(lines, b"")  # surfaces a bad cursor or projection as a 400 before streaming starts
+        except InvalidQueryError as e:
+            return jsonify({"error": str(e)}), 400
+        return ndjson_response(itertools.chain([first], lines))
+    
+    etag = project_response_etag(request.query_string)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    
+    try:
+        response = json_response(list_projects_body(query))
+    except InvalidQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def analytics_payload(args):
+    """Response body for /api/analytics: one practice area or client when named, else the largest groups"""
+    init_projects()
+    if args.get("practice_area") or args.get("client"):
+        kind = PRACTICE_AREA if args.get("practice_area") else CLIENT
+        summary = project_analytics.summary(kind, args.get(kind))
+        if summary is None:
+            raise UnknownGroupError(f"No projects for {kind} {args.get(kind)!r}")
+        return {kind: summary}
+    try:
+        limit = max(1, min(int(args.get("limit", 50)), 500))
+    except ValueError:
+        raise InvalidQueryError("Invalid query parameter: limit must be an integer")
+    return {
+        "portfolio": project_analytics.summary(ALL),
+        "practice_areas": project_analytics.groups(PRACTICE_AREA, limit),
+        "clients": project_analytics.groups(CLIENT, limit),
+        "revision": project_analytics.revision,
+    }
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """Cost, duration and win-rate aggregates for the portfolio, practice areas and clients"""
+    try:
+        return json_response(analytics_payload(request.args))
+    except InvalidQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    except UnknownGroupError as e:
+        return jsonify({"error": str(e)}), 404
 
 @app.route('/api/project/<int:project_id>', methods=['GET'])
 def get_project_details(project_id):
     """Get detailed information about a specific project"""
-    project = next((p for p in MOCK_SIMILAR_PROJECTS if p['id'] == project_id), None)
+    etag = project_response_etag(str(project_id))
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    
+    project = project_encodings.records([project_id])
     
     if not project:
         return jsonify({"error": "Project not found"}), 404
     
-    return jsonify({"project": project})
+    response = json_response(json_object(project=project[0]))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll the status, per-stage progress and result of an upload job"""
+    job = job_manager.get(job_id)
+    
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return json_response(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Server-sent events stream of per-stage progress for an upload job"""
+    job = job_manager.get(job_id)
+    
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    def generate():
+        cursor = 0
+        while True:
+            events = job.wait_for_events(cursor, SSE_KEEPALIVE_SECONDS)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                payload = dict(event, result=job.result, error=job.error) if event["event"] == "done" else event
+                yield f"event: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+            cursor += len(events)
+            if events[-1]["event"] == "done":
+                return
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.errorhandler(413)
 def file_too_large(e):
     """Handle file too large error"""
     return jsonify({"error": "File too large. Maximum size is 16MB"}), 413
 
+if STARTUP_MODE == "background" and not RELOADER_PARENT:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
 if __name__ == '__main__':
     print("Starting RFP Accelerator Backend...")
-    print(f"Upload folder: {os.path.abspath(UPLOAD_FOLDER)}")
-    print(f"AI Decision feature: {'Enabled' if ai_enabled else 'Disabled (using mock data)'}")
+    print(f"Upload folder: {os.path.abspath(UPLOAD_FOLDER) if UPLOAD_PERSIST else 'disabled (in-memory uploads)'}")
+    if ai_initialized.is_set():
+        print(f"AI Decision feature: {'Enabled' if ai_enabled else 'Disabled (using mock data)'}")
+    elif not RELOADER_PARENT:
+        print(f"AI Decision feature: initialized {'in the background' if STARTUP_MODE == 'background' else 'on first use'}")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+ASGI serving mode for the RFP Accelerator backend.
+Exposes the same /api/health, /api/upload-rfp, /api/projects, /api/project/<id> and /api/analytics contract as
+app.py with async handlers: LLM calls go through the async client on one pooled HTTP connection
+pool, and blocking file/PDF work is offloaded to executors.
+
+Usage (from the backend directory):
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 1
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.datastructures import FileStorage
+import app as flask_backend
+import metrics
+from result_cache import text_cache, decision_cache
+from uploads import InvalidUploadError
+from project_store import InvalidQueryError
+from analytics import UnknownGroupError
+from admission import AdmissionRejectedError, request_priority
+from serialization import dumps, json_object, encode_body, encoded_etag, compress_stream, negotiate_encoding, wants_ndjson, NDJSON_MIMETYPE
+
+# Configuration
+ASGI_MAX_CONNECTIONS = int(os.getenv("ASGI_MAX_CONNECTIONS", "100"))
+ASGI_BLOCKING_WORKERS = int(os.getenv("ASGI_BLOCKING_WORKERS", "8"))
+
+# Created in lifespan (the LLM gateway on first use unless startup is eager): one connection pool
+# and one async LLM gateway shared by all requests
+http_client = None
+async_gateway = None
+async_decision_chain = None
+blocking_executor = None
+_chain_lock = asyncio.Lock()
+
+
+async def run_blocking(fn, *args):
+    """Run blocking work (file I/O, PDF parsing, map step) on the shared executor"""
+    # Carry the request trace into the worker thread so its stage timings land on this request
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(blocking_executor, context.run, fn, *args)
+
+
+def build_async_chain():
+    """Async LLM gateway on the shared connection pool and its prepared decision chain"""
+    global async_gateway, async_decision_chain
+    async_gateway = flask_backend.create_gateway(http_async_client=http_client)
+    async_decision_chain = async_gateway.prepare(flask_backend.AIDecisionResponse,
+                                                 flask_backend.DECISION_STATIC_MESSAGES)
+
+
+async def async_chain():
+    """The async decision chain, or None when AI decisions are disabled; built on first use"""
+    if async_decision_chain is None and await run_blocking(flask_backend.init_ai):
+        async with _chain_lock:
+            if async_decision_chain is None:
+                await run_blocking(build_async_chain)
+    return async_decision_chain
+
+
+def lookup_decision(rfp_text, similar_projects):
+    """
+    Blocking steps ahead of the LLM call: the pre-screen, hashing the decision cache key and the
+    exact and near-duplicate cache lookups (disk reads when the entry is not in memory).
+
+    Returns:
+        tuple: (decision reached without the LLM or None, decision cache key or None when pre-screened)
+    """
+    declined = flask_backend.prescreen_decision(rfp_text)
+    if declined is not None:
+        return declined, None
+    cache_key = flask_backend.decision_cache_key(rfp_text, similar_projects)
+    return decision_cache.get(cache_key) or flask_backend.near_duplicate_decision(rfp_text, similar_projects), cache_key
+
+
+async def agenerate_ai_decision(rfp_text, similar_projects, priority="normal"):
+    """Async counterpart of app.generate_ai_decision; shares its admission controller and always has a deadline"""
+    chain = await async_chain()
+    if chain is None:
+        return flask_backend.mock_decision(similar_projects)
+
+    decision, cache_key = await run_blocking(lookup_decision, rfp_text, similar_projects)
+    if decision is not None:
+        return decision
+
+    flask_backend.admission.check(priority, len(rfp_text))
+    try:
+        with metrics.stage("prompt"):
+            # Long-document map calls take their admission slots in the worker thread
+            rfp_section, analysis_stats = await run_blocking(flask_backend.prepare_rfp_section, rfp_text, priority)
+            # Reads the portfolio analytics, which refresh from the project store now and then
+            request_messages = await run_blocking(flask_backend.build_decision_request, rfp_section, similar_projects)
+        async with flask_backend.admission.aslot(priority, len(rfp_text)):
+            with metrics.stage("llm"):
+                ai_decision, usage = await chain.ainvoke(request_messages)
+        metrics.record_llm_usage("decision", usage)
+        return await run_blocking(flask_backend.finish_decision, cache_key, ai_decision, usage, analysis_stats, rfp_text, similar_projects)
+    except AdmissionRejectedError:
+        raise
+    except Exception as e:
+        metrics.log_event("ai_decision_error", level="error", error=str(e), error_type=type(e).__name__)
+        return flask_backend.fallback_decision(e)
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    return JSONResponse({
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "ai_enabled": flask_backend.ai_enabled if flask_backend.ai_initialized.is_set() else None,
+        "startup_mode": flask_backend.STARTUP_MODE,
+        "llm_deployments": async_gateway.stats() if async_gateway else None,
+        "near_duplicates": flask_backend.near_duplicate_index.stats() if flask_backend.near_duplicate_index else None,
+        "analytics": flask_backend.project_analytics.stats() if flask_backend.projects_initialized.is_set() else None,
+        "admission": flask_backend.admission.stats(),
+        "serialization": flask_backend.project_encodings.stats() if flask_backend.projects_initialized.is_set() else None,
+        "cache": {
+            "text": text_cache.stats(),
+            "decisions": decision_cache.stats()
+        }
+    })
+
+
+async def readiness_check(request):
+    """Readiness probe: 503 until background warm-up has finished, then 200"""
+    ready = flask_backend.STARTUP_MODE != "background" or flask_backend.warmup_done.is_set()
+    return JSONResponse({
+        "ready": ready,
+        "startup_mode": flask_backend.STARTUP_MODE,
+        "ai_initialized": flask_backend.ai_initialized.is_set(),
+        "projects_initialized": flask_backend.projects_initialized.is_set(),
+        "warmup": flask_backend.warmup_stats if flask_backend.warmup_done.is_set() else None,
+    }, status_code=200 if ready else 503)
+
+
+async def upload_rfp(request):
+    """Handle RFP document upload and return similar projects with AI decision"""
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+        if content_length > flask_backend.app.config['MAX_CONTENT_LENGTH']:
+            return JSONResponse({"error": "File too large. Maximum size is 16MB"}, status_code=413)
+
+        form = await request.form()
+        file = form.get("file")
+
+        # Check if file is in request
+        if file is None or not hasattr(file, "filename"):
+            return JSONResponse({"error": "No file provided"}, status_code=400)
+
+        # Check if file is selected
+        if file.filename == '':
+            return JSONResponse({"error": "No file selected"}, status_code=400)
+
+        # Check file type
+        if not flask_backend.allowed_file(file.filename):
+            return JSONResponse({"error": "Invalid file type. Allowed: PDF, TXT"}, status_code=400)
+
+        try:
+            upload = await run_blocking(flask_backend.save_upload, FileStorage(stream=file.file, filename=file.filename))
+        except InvalidUploadError as e:
+            return JSONResponse({"error": f"Invalid file type. Allowed: PDF, TXT ({e})"}, status_code=400)
+        priority = request_priority(form.get("priority") or request.query_params.get("priority"),
+                                    form.get("due_date") or request.query_params.get("due_date"))
+        rfp_text = await run_blocking(flask_backend.extract_upload_text, upload)
+        similar_projects = await run_blocking(flask_backend.find_similar_projects, rfp_text)
+        ai_decision = await agenerate_ai_decision(rfp_text, similar_projects, priority)
+
+        return json_response(request, flask_backend.build_upload_response(upload, similar_projects, ai_decision))
+
+    except AdmissionRejectedError as e:
+        return JSONResponse({"error": str(e), "retry_after": e.retry_after}, status_code=503,
+                            headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        return JSONResponse({"error": f"Upload failed: {str(e)}"}, status_code=500)
+
+
+async def get_metrics(request):
+    """Prometheus-format metrics: stage latencies, sizes, tokens, retries and fallbacks"""
+    return Response(metrics.render_prometheus(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+def if_none_match(request, etag):
+    """True when the request's If-None-Match header already names etag"""
+    header = request.headers.get("if-none-match", "")
+    return header.strip() == "*" or f'"{etag}"' in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": f'"{etag}"', "Vary": "Accept-Encoding", "Cache-Control": "no-cache"})
+
+
+def project_response_etag(request, *parts):
+    """ETag for a project response in the content coding this client gets"""
+    return encoded_etag(flask_backend.project_etag(*parts), request.headers.get("accept-encoding", ""))
+
+
+def json_response(request, payload, headers=None):
+    """JSON response (payload is a value or already-encoded bytes), compressed for the client when worth it"""
+    body, encoding_headers = encode_body(payload if isinstance(payload, bytes) else dumps(payload),
+                                         request.headers.get("accept-encoding", ""))
+    return Response(body, media_type="application/json", headers={**encoding_headers, **(headers or {})})
+
+
+def cacheable_json(request, payload, etag):
+    return json_response(request, payload, headers={"ETag": f'"{etag}"', "Cache-Control": "no-cache"})
+
+
+async def get_projects(request):
+    """List projects with cursor pagination, field projection and filters; supports conditional GET"""
+    try:
+        query = flask_backend.project_query(request.query_params)
+        if wants_ndjson(request.query_params, request.headers.get("accept")):
+            lines = flask_backend.iter_project_lines(query)
+            first = await run_blocking(next, lines, b"")  # a bad cursor or projection is a 400, not a broken stream
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+            headers = {"Vary": "Accept-Encoding", **({"Content-Encoding": encoding} if encoding else {})}
+            return StreamingResponse(compress_stream(itertools.chain([first], lines), encoding),
+                                     media_type=NDJSON_MIMETYPE, headers=headers)
+        etag = await run_blocking(project_response_etag, request, request.url.query.encode("utf-8"))
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        body = await run_blocking(flask_backend.list_projects_body, query)
+    except InvalidQueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return cacheable_json(request, body, etag)
+
+
+async def get_analytics(request):
+    """Cost, duration and win-rate aggregates for the portfolio, practice areas and clients"""
+    try:
+        payload = await run_blocking(flask_backend.analytics_payload, request.query_params)
+    except InvalidQueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except UnknownGroupError as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    return json_response(request, payload)
+
+
+async def get_project_details(request):
+    """Get detailed information about a specific project"""
+    project_id = request.path_params["project_id"]
+    etag = await run_blocking(project_response_etag, request, str(project_id))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
+    project = await run_blocking(flask_backend.project_encodings.records, [project_id])
+
+    if not project:
+        return JSONResponse({"error": "Project not found"}, status_code=404)
+
+    return cacheable_json(request, json_object(project=project[0]), etag)
+
+
+async def record_llm_response(response):
+    """Async httpx response hook for the pooled client"""
+    metrics.record_llm_response(response)
+
+
+async def trace_requests(request, call_next):
+    """Record API request latency and emit the structured per-request log line"""
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    started = time.perf_counter()
+    metrics.start_trace(method=request.method, path=request.url.path)
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    endpoint = getattr(request.scope.get("endpoint"), "__name__", "unknown")
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, status=response.status_code)
+    if endpoint != "get_metrics":
+        metrics.finish_trace(endpoint=endpoint, status=response.status_code, duration_ms=round(elapsed * 1000, 2))
+    return response
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    """Create the pooled HTTP client, async LLM client and blocking-work executor once per worker"""
+    global http_client, blocking_executor
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=ASGI_MAX_CONNECTIONS, max_keepalive_connections=ASGI_MAX_CONNECTIONS),
+        event_hooks={"response": [record_llm_response]},
+    )
+    blocking_executor = ThreadPoolExecutor(ASGI_BLOCKING_WORKERS, thread_name_prefix="asgi-blocking")
+    if flask_backend.ai_initialized.is_set() and flask_backend.ai_enabled:
+        build_async_chain()
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+        blocking_executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/api/health", health_check, methods=["GET"]),
+        Route("/api/ready", readiness_check, methods=["GET"]),
+        Route("/api/upload-rfp", upload_rfp, methods=["POST"]),
+        Route("/api/metrics", get_metrics, methods=["GET"]),
+        Route("/api/projects", get_projects, methods=["GET"]),
+        Route("/api/project/{project_id:int}", get_project_details, methods=["GET"]),
+        Route("/api/analytics", get_analytics, methods=["GET"]),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        Middleware(BaseHTTPMiddleware, dispatch=trace_requests),
+    ],
+    lifespan=lifespan,
+)
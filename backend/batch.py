@@ -0,0 +1,213 @@
+"""
+Batch RFP evaluation with concurrent LLM fan-out.
+Extraction runs on its own thread pool; decision calls run with a bounded number in flight,
+behind a token-bucket rate limiter, with exponential backoff on throttling errors that reach this
+layer (calls through the LLM gateway are retried there and never surface as a 429). Results are
+yielded as each RFP completes so they can be streamed back as NDJSON. Every decision also takes
+one of the admission controller's LLM_MAX_CONCURRENT slots, so the number in flight defaults to
+that slot count: more threads would only queue on the controller. When the consumer goes away
+(client disconnect, generator closed) queued work is cancelled and nothing more is submitted.
+
+Usage (from the backend directory):
+    python batch.py path/to/rfps --max-in-flight 8 --requests-per-minute 600 --output results.ndjson
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from admission import LLM_MAX_CONCURRENT
+from llm_utils import is_throttling_error, retry_after_seconds
+
+# Configuration
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", str(LLM_MAX_CONCURRENT)))  # decisions wait for admission slots beyond this
+BATCH_REQUESTS_PER_MINUTE = float(os.getenv("BATCH_REQUESTS_PER_MINUTE", "600"))
+BATCH_EXTRACTION_WORKERS = int(os.getenv("BATCH_EXTRACTION_WORKERS", "4"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "4"))
+BATCH_BACKOFF_SECONDS = float(os.getenv("BATCH_BACKOFF_SECONDS", "1.0"))
+BATCH_MAX_BACKOFF_SECONDS = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, bursting up to capacity"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_backoff(fn, max_retries=BATCH_MAX_RETRIES, base_delay=BATCH_BACKOFF_SECONDS, limiter=None,
+                      call="decision"):
+    """
+    Call fn, retrying throttling errors with jittered exponential backoff.
+
+    Returns:
+        tuple: (result, retries used)
+    """
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            return fn(), attempt
+        except Exception as e:
+            if attempt == max_retries or not is_throttling_error(e):
+                raise
+            metrics.LLM_RETRIES.inc(call=call)
+            delay = retry_after_seconds(e) or min(BATCH_MAX_BACKOFF_SECONDS, base_delay * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.8, 1.2))
+
+
+class BatchEvaluator:
+    """Runs many uploads through extraction, similar-project lookup and decision generation"""
+
+    def __init__(self, extract_fn, similar_fn, decide_fn, fallback_fn,
+                 max_in_flight=BATCH_MAX_IN_FLIGHT, requests_per_minute=BATCH_REQUESTS_PER_MINUTE,
+                 extraction_workers=BATCH_EXTRACTION_WORKERS, max_retries=BATCH_MAX_RETRIES):
+        """
+        Args:
+            extract_fn (callable): upload -> rfp_text
+            similar_fn (callable): rfp_text -> similar projects
+            decide_fn (callable): (rfp_text, similar_projects) -> decision; must raise on LLM errors
+            fallback_fn (callable): error -> decision used once retries are exhausted
+        """
+        self.extract_fn = extract_fn
+        self.similar_fn = similar_fn
+        self.decide_fn = decide_fn
+        self.fallback_fn = fallback_fn
+        self.max_in_flight = max_in_flight
+        self.extraction_workers = extraction_workers
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(requests_per_minute / 60.0, capacity=max_in_flight) if requests_per_minute else None
+
+    def _decide(self, upload, rfp_text, started):
+        """Decision stage for one upload; never raises"""
+        try:
+            similar_projects = self.similar_fn(rfp_text)
+            try:
+                ai_decision, retries = call_with_backoff(
+                    lambda: self.decide_fn(rfp_text, similar_projects),
+                    max_retries=self.max_retries, limiter=self.limiter
+                )
+            except Exception as e:
+                ai_decision, retries = self.fallback_fn(e), None
+            return {
+                "file": upload["original_name"],
+                "success": True,
+                "similar_projects": similar_projects,
+                "ai_decision": ai_decision,
+                "retries": retries,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+        except Exception as e:
+            return {"file": upload["original_name"], "success": False, "error": str(e)}
+
+    def run(self, uploads):
+        """Yield one result dict per upload, in completion order"""
+        results = queue.Queue()
+        started = time.perf_counter()
+        closed = threading.Event()
+        extract_pool = ThreadPoolExecutor(self.extraction_workers, thread_name_prefix="batch-extract")
+        llm_pool = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="batch-llm")
+
+        def decide(upload, rfp_text):
+            if not closed.is_set():
+                results.put(self._decide(upload, rfp_text, started))
+
+        def extracted(upload, future):
+            if closed.is_set() or future.cancelled():
+                return
+            try:
+                rfp_text = future.result()
+            except Exception as e:
+                results.put({"file": upload["original_name"], "success": False, "error": str(e)})
+                return
+            try:
+                llm_pool.submit(decide, upload, rfp_text)
+            except RuntimeError:
+                # The pool was shut down after the consumer went away
+                pass
+
+        try:
+            for upload in uploads:
+                future = extract_pool.submit(self.extract_fn, upload)
+                future.add_done_callback(lambda f, upload=upload: extracted(upload, f))
+
+            for _ in range(len(uploads)):
+                yield results.get()
+        finally:
+            # Runs on completion and when the consumer closes the generator early: drop queued
+            # work instead of blocking until every remaining upload has been decided
+            closed.set()
+            extract_pool.shutdown(wait=False, cancel_futures=True)
+            llm_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory of PDF/TXT RFPs")
+    parser.add_argument("--max-in-flight", type=int, default=BATCH_MAX_IN_FLIGHT)
+    parser.add_argument("--requests-per-minute", type=float, default=BATCH_REQUESTS_PER_MINUTE)
+    parser.add_argument("--extraction-workers", type=int, default=BATCH_EXTRACTION_WORKERS)
+    parser.add_argument("--max-retries", type=int, default=BATCH_MAX_RETRIES)
+    parser.add_argument("--output", help="NDJSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    import app
+    from result_cache import stream_hash
+
+    uploads = []
+    for name in sorted(os.listdir(args.directory)):
+        file_path = os.path.join(args.directory, name)
+        if not os.path.isfile(file_path) or not app.allowed_file(name):
+            continue
+        with open(file_path, "rb") as file:
+            cache_keys = app.upload_cache_keys(stream_hash(file), name.rsplit('.', 1)[1].lower())
+        uploads.append({
+            "original_name": name,
+            **cache_keys,
+            "saved_name": name,
+            "file_path": file_path,
+            "size": os.path.getsize(file_path)
+        })
+
+    evaluator = BatchEvaluator(
+        app.extract_upload_text, app.find_similar_projects,
+        lambda text, projects: app.generate_ai_decision(text, projects, raise_errors=True),
+        app.fallback_decision,
+        max_in_flight=args.max_in_flight, requests_per_minute=args.requests_per_minute,
+        extraction_workers=args.extraction_workers, max_retries=args.max_retries
+    )
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in evaluator.run(uploads):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
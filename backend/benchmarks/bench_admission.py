@@ -0,0 +1,122 @@
+"""
+Load test: a burst of uploads against an LLM deployment with limited capacity, with admission control
+off and on. Without it every upload calls the LLM at once, the overloaded deployment slows past the
+LLM timeouts and the burst turns into fallback DECLINE decisions; with it at most LLM_MAX_CONCURRENT
+decisions run at once, urgent bids go first and the excess is shed with 503 + Retry-After.
+Reports statuses, fallback decisions, latency of the answered uploads and urgent vs normal latency.
+
+Usage (from the backend directory):
+    python benchmarks/bench_admission.py --burst 40 --urgent-every 4 --capacity 4 --latency-ms 500
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+import httpx
+
+from common import BACKEND_DIR, percentile
+from bench_serving import BENCH_DIR, backend_env, free_port, start_server, wait_until_ready
+
+
+def is_fallback(body):
+    return body.get("ai_decision", {}).get("executive_summary", "").startswith("AI analysis encountered an error")
+
+
+async def run_burst(base_url, total, urgent_every, run_id):
+    """Fire total uploads at once (every urgent_every-th one urgent); returns one result dict per upload"""
+    async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=total)) as client:
+        async def one(i):
+            priority = "urgent" if urgent_every and i % urgent_every == 0 else "normal"
+            # Unique content per request so caches never short-circuit the LLM call
+            content = f"RFP {run_id}-{i}: legal services for regulatory compliance review".encode()
+            start = time.perf_counter()
+            response = await client.post(f"{base_url}/api/upload-rfp", data={"priority": priority},
+                                         files={"file": (f"rfp_{i}.txt", content, "text/plain")})
+            body = response.json()
+            return {
+                "priority": priority,
+                "status": response.status_code,
+                "seconds": time.perf_counter() - start,
+                "fallback": response.status_code == 200 and is_fallback(body),
+                "retry_after": response.headers.get("Retry-After"),
+            }
+
+        return await asyncio.gather(*(one(i) for i in range(total)))
+
+
+def report(label, results):
+    statuses = Counter(result["status"] for result in results)
+    answered = [result for result in results if result["status"] == 200 and not result["fallback"]]
+    fallbacks = sum(result["fallback"] for result in results)
+
+    def p(priority, pct):
+        seconds = [result["seconds"] for result in answered if priority in (None, result["priority"])]
+        return f"{percentile(seconds, pct):.2f}" if seconds else "-"
+
+    print(f"{label:<14} {statuses.get(200, 0) - fallbacks:>6} {fallbacks:>9} {statuses.get(503, 0):>5} "
+          f"{sum(count for status, count in statuses.items() if status not in (200, 503)):>6} "
+          f"{p(None, 50):>7} {p(None, 99):>7} {p('urgent', 50):>10} {p('normal', 50):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=40, help="uploads fired at once")
+    parser.add_argument("--urgent-every", type=int, default=4, help="every Nth upload is urgent (0 = none)")
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--capacity", type=int, default=4, help="completions the fake deployment serves at full speed")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="LLM_MAX_CONCURRENT with admission on")
+    parser.add_argument("--max-wait", type=float, default=3.0, help="ADMISSION_MAX_WAIT_SECONDS")
+    parser.add_argument("--llm-timeout", type=float, default=3.0, help="LLM_ATTEMPT_TIMEOUT_SECONDS and LLM_DEADLINE_SECONDS")
+    parser.add_argument("--server", choices=["flask", "asgi"], default="flask")
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    fake = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(fake_port),
+                             "--latency-ms", str(args.latency_ms), "--jitter-ms", "50",
+                             "--capacity", str(args.capacity)], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{fake_port}/fake/config")
+        print(f"{args.server}: burst of {args.burst} uploads, fake LLM {args.latency_ms:.0f} ms at capacity "
+              f"{args.capacity}, LLM timeout {args.llm_timeout:g}s, admission {args.max_concurrent} slots / "
+              f"{args.max_wait:g}s max wait\n")
+        print(f"{'admission':<14} {'200':>6} {'fallbacks':>9} {'503':>5} {'other':>6} {'p50 s':>7} {'p99 s':>7} "
+              f"{'urgent p50':>10} {'normal p50':>10}")
+        for enabled in (False, True):
+            port = free_port()
+            with tempfile.TemporaryDirectory() as cache_dir:
+                env = dict(backend_env(fake_port, cache_dir),
+                           ADMISSION_ENABLED=str(enabled).lower(),
+                           LLM_MAX_CONCURRENT=str(args.max_concurrent),
+                           ADMISSION_MAX_WAIT_SECONDS=str(args.max_wait),
+                           ADMISSION_SERVICE_SECONDS=str(args.latency_ms / 1000),
+                           LLM_ATTEMPT_TIMEOUT_SECONDS=str(args.llm_timeout),
+                           LLM_DEADLINE_SECONDS=str(args.llm_timeout),
+                           LLM_HEDGE="false",
+                           PRESCREEN_ENABLED="false",
+                           NEAR_DUPLICATE_ENABLED="false")
+                server = start_server(args.server, port, env)
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    wait_until_ready(f"{base_url}/api/health")
+                    results = asyncio.run(run_burst(base_url, args.burst, args.urgent_every, f"{enabled}-{time.time()}"))
+                    report("on" if enabled else "off", results)
+                    if enabled:
+                        admission = httpx.get(f"{base_url}/api/health").json()["admission"]
+                        retry_after = sorted({result["retry_after"] for result in results if result["retry_after"]})
+                        print(f"\nqueue wait ms: {admission['wait_ms']}, learned service time "
+                              f"{admission['service_seconds']}s, Retry-After values: {', '.join(retry_after) or '-'}")
+                finally:
+                    server.terminate()
+                    server.wait()
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: incrementally maintained portfolio analytics vs. rescanning the project store.
+Fills a SQLite project store with synthetic projects (cost, duration string, client, practice
+areas, outcome), then measures the full build, incremental refreshes after small write batches,
+cached and uncached summary reads, and the per-request full rescan the prompt builder would
+otherwise need. Reports percentile error against exact values and memory per project.
+
+Usage (from the backend directory):
+    python benchmarks/bench_analytics.py --sizes 100000 1000000 --changes 100 1000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from common import percentile
+from synthetic import synthetic_projects
+
+from analytics import ProjectAnalytics, parse_duration_months, PRACTICE_AREA, CLIENT, PERCENTILES
+from project_store import ProjectStore, import_projects
+
+OUTCOMES = ["won", "lost", "pending", None]
+
+
+def portfolio_projects(size, rng, start=0):
+    """Synthetic projects with the fields the analytics aggregate"""
+    projects = synthetic_projects(size, rng)
+    for offset, project in enumerate(projects):
+        project["id"] = start + offset
+        project["client"] = f"Client {rng.randrange(max(size // 20, 1))}"
+        project["duration"] = rng.choice([f"{rng.randint(1, 36)} months", f"{rng.randint(1, 4)} years",
+                                          f"{rng.randint(2, 40)} weeks"])
+        project["outcome"] = rng.choice(OUTCOMES)
+    return projects
+
+
+def timed_ms(fn, repeat=1):
+    """(result, list of wall times in ms)"""
+    result, times = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, times
+
+
+def rescan(store, area):
+    """What a stateless prompt builder would do per request: read every row and aggregate one area"""
+    costs, months = [], []
+    for _, cost, duration, _, practice_area, stack, _ in store.analytics_rows():
+        if area in stack or practice_area == area:
+            costs.append(cost)
+            months.append(parse_duration_months(duration))
+    return np.percentile(costs, PERCENTILES), np.nanpercentile(np.array(months, dtype=float), PERCENTILES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--changes", type=int, nargs="+", default=[100, 1000], help="projects written per refresh")
+    parser.add_argument("--reads", type=int, default=1000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            store = ProjectStore(os.path.join(folder, "projects.db"))
+            start = time.perf_counter()
+            import_projects(store, portfolio_projects(size, rng))
+            print(f"\n{size:,} projects (store filled in {time.perf_counter() - start:.1f} s)")
+
+            analytics, build_ms = timed_ms(lambda: ProjectAnalytics(store, refresh_seconds=0))
+            stats = analytics.stats()
+            print(f"  full build                      {build_ms[0]:>10.1f} ms   "
+                  f"{stats['practice_areas']} areas, {stats['clients']:,} clients, "
+                  f"{stats['memory_bytes'] / size:.0f} B/project")
+
+            for changes in args.changes:
+                written = portfolio_projects(changes, rng, start=rng.randrange(size - changes))
+                store.upsert_many(written)
+                applied, refresh_ms = timed_ms(lambda: analytics.refresh(force=True))
+                print(f"  refresh after {changes:>6,} writes       {refresh_ms[0]:>10.1f} ms   {applied:,} applied")
+
+            # Reads: the refresh check is rate-limited in production; here it is skipped to time the lookup
+            analytics.refresh_seconds = 3600
+            area = "Corporate Law"
+            _, cached_ms = timed_ms(lambda: analytics.summary(PRACTICE_AREA, area), repeat=args.reads)
+            print(f"  summary (cached) p50/p99        {percentile(cached_ms, 50) * 1000:>7.1f} / "
+                  f"{percentile(cached_ms, 99) * 1000:.1f} us")
+            clients = [f"Client {i}" for i in range(args.reads)]
+            uncached_ms = []
+            for client in clients:
+                analytics._summaries.clear()
+                uncached_ms += timed_ms(lambda: analytics.summary(CLIENT, client))[1]
+            analytics._summaries.clear()
+            _, area_ms = timed_ms(lambda: analytics.summary(PRACTICE_AREA, area))
+            print(f"  summary (uncached) client p50   {percentile(uncached_ms, 50):>10.2f} ms   (exact, small group)")
+            print(f"  summary (uncached) area         {area_ms[0]:>10.2f} ms   (histogram)")
+
+            (exact_costs, exact_months), rescan_ms = timed_ms(lambda: rescan(store, area))
+            summary = analytics.summary(PRACTICE_AREA, area)
+            cost_error = max(abs(summary["cost"][f"p{p}"] - v) / v for p, v in zip(PERCENTILES, exact_costs))
+            months_error = max(abs(summary["duration_months"][f"p{p}"] - v) / v for p, v in zip(PERCENTILES, exact_months))
+            print(f"  full rescan for one area        {rescan_ms[0]:>10.1f} ms")
+            print(f"  percentile error vs. exact      cost {cost_error:.2%}, duration {months_error:.2%}")
+
+
+if __name__ == "__main__":
+    main()
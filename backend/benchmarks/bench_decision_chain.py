@@ -0,0 +1,149 @@
+"""
+Benchmark: per-request client-side overhead and prompt tokens of the decision call, comparing the
+previous path (structured-output binding rebuilt per call, one indented f-string prompt) with the
+prepared decision chain (binding and static prefix built once, variable part last).
+The HTTP layer is an in-process mock transport, so timings are pure client CPU (message building,
+schema binding, request serialization and response parsing) with no network.
+
+Usage (from the backend directory):
+    python benchmarks/bench_decision_chain.py --requests 300 --cached-discount 0.5
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+import httpx
+
+from common import percentile
+from synthetic import synthetic_lines
+
+os.environ.setdefault("UPLOAD_PERSIST", "false")
+import app as backend
+from decision_chain import PreparedChain, PROMPT_CACHE_MIN_TOKENS
+from llm_utils import count_tokens, parse_structured_response
+from prompts import decision_prompt
+
+
+def legacy_messages(rfp_section, similar_projects):
+    """The decision messages as they were built before the prepared chain"""
+    projects_context = "\n".join([
+        f"- {project['title']}: ${project['cost']:,} ({project['duration']}) - {project['similarity_score']*100:.0f}% match"
+        for project in similar_projects[:3]
+    ])
+    full_prompt = f"""
+        {decision_prompt}
+
+        ###RFP Document###
+        {rfp_section}
+
+        ###Supporting Information###
+        Example Projects from Our Portfolio:
+        {projects_context}
+
+        Average Project Cost: ${sum([p['cost'] for p in similar_projects]) // len(similar_projects):,}
+        Our Success Rate in Example Projects: 85%
+        Current Resource Availability: Medium - 3 senior lawyers, 5 junior associates available
+
+
+        """
+    return [
+        {"role": "system", "content": "You are a senior legal partner making strategic decisions about RFP opportunities. Provide concise, actionable analysis."},
+        {"role": "user", "content": full_prompt}
+    ]
+
+
+def mock_transport(bodies):
+    """Answer every chat completion with a schema-conforming tool call and keep the request bodies"""
+    arguments = json.dumps(backend.mock_decision(backend.MOCK_SIMILAR_PROJECTS))
+
+    def handler(request):
+        body = json.loads(request.content)
+        bodies.append(request.content)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": 0, "model": "bench",
+            "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call_bench", "type": "function", "function": {
+                    "name": body["tools"][0]["function"]["name"], "arguments": arguments}}],
+            }}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+    return httpx.MockTransport(handler)
+
+
+def rendered_prompt(body):
+    """Request body in the order the provider sees it for prefix caching: tools, then messages"""
+    request = json.loads(body)
+    return json.dumps(request.get("tools", []), sort_keys=True) + "".join(
+        message["content"] or "" for message in request["messages"])
+
+
+def common_prefix_tokens(first, second):
+    """Tokens in the longest shared prefix of two rendered prompts"""
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return count_tokens(first[:length])
+
+
+def run(label, call, sections, projects, bodies, discount):
+    bodies.clear()
+    latencies = []
+    for section in sections:
+        start = time.perf_counter()
+        call(section, projects)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    prompts = [rendered_prompt(body) for body in bodies]
+    prompt_tokens = [count_tokens(prompt) for prompt in prompts]
+    cached = common_prefix_tokens(prompts[0], prompts[1])
+    cacheable = cached >= PROMPT_CACHE_MIN_TOKENS
+    mean_prompt = sum(prompt_tokens) / len(prompt_tokens)
+    billed = mean_prompt - cached * (1 - discount) if cacheable else mean_prompt
+    print(f"{label:<10} {percentile(latencies, 50):>9.0f} {percentile(latencies, 95):>9.0f} "
+          f"{mean_prompt:>13.0f} {cached:>14} {'yes' if cacheable else 'no':>9} {billed:>13.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rfp-lines", type=int, default=60, help="lines of synthetic RFP text per request")
+    parser.add_argument("--cached-discount", type=float, default=0.5,
+                        help="price of a cached prompt token relative to an uncached one")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    bodies = []
+    llm = backend.create_llm(http_client=httpx.Client(transport=mock_transport(bodies)), max_retries=0,
+                             api_key="bench", azure_endpoint="http://bench.invalid", azure_deployment="bench")
+    sections = ["\n".join(synthetic_lines(page, args.rfp_lines, rng)) for page in range(args.requests)]
+    projects = backend.MOCK_SIMILAR_PROJECTS
+
+    def legacy(section, similar):
+        # The binding is rebuilt on every call, as it was before the prepared chain
+        structured_llm = llm.with_structured_output(backend.AIDecisionResponse, include_raw=True)
+        return parse_structured_response(structured_llm.invoke(legacy_messages(section, similar)))
+
+    chain = PreparedChain(llm, backend.AIDecisionResponse, backend.DECISION_STATIC_MESSAGES)
+
+    def prepared(section, similar):
+        return chain.invoke(backend.build_decision_request(section, similar))
+
+    # Warm both paths (imports, pydantic schema caches) before timing
+    legacy(sections[0], projects)
+    prepared(sections[0], projects)
+
+    print(f"static prefix (tool schema + static messages): {chain.prefix_tokens} tokens, "
+          f"cacheable: {chain.stats()['prefix_cacheable']}")
+    print(f"{'path':<10} {'p50 us':>9} {'p95 us':>9} {'prompt tokens':>13} {'shared prefix':>14} "
+          f"{'cacheable':>9} {'billed tokens':>13}")
+    run("legacy", legacy, sections, projects, bodies, args.cached_discount)
+    run("prepared", prepared, sections, projects, bodies, args.cached_discount)
+
+
+if __name__ == "__main__":
+    main()
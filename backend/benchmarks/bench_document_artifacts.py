@@ -0,0 +1,77 @@
+"""
+Benchmark: page-indexed document artifacts vs. re-parsing the PDF.
+Measures a full layout-aware extraction into an artifact, a budgeted extraction that stops early,
+and the reads that follow (whole text, one page, one section, all tables) from the memory-mapped
+artifact, against plain text extraction of the same synthetic PDF.
+
+Usage (from the backend directory):
+    python benchmarks/bench_document_artifacts.py --pages 300 --max-pages 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from synthetic import write_synthetic_pdf
+
+from document_store import DocumentStore
+from pdf_extraction import extract_pdf_text
+
+
+def timed(fn, repeat=1):
+    """(result, best wall time in ms) over repeat runs"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--max-pages", type=int, default=10, help="page budget of the early-stop run")
+    parser.add_argument("--max-chars", type=int, default=20000, help="character budget of the early-stop run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "rfp.pdf")
+        write_synthetic_pdf(pdf_path, args.pages, tables=True)
+        store = DocumentStore(os.path.join(folder, "documents"), persist=True)
+        print(f"{args.pages}-page synthetic PDF with tables, {os.path.getsize(pdf_path) / 1024:.0f} KB\n")
+        print(f"{'operation':<36} {'ms':>9}  result")
+
+        text, ms = timed(lambda: extract_pdf_text(pdf_path))
+        print(f"{'plain extraction (re-parse)':<36} {ms:>9.1f}  {len(text):,} chars")
+
+        document, ms = timed(lambda: store.get_or_extract("budget-pages", pdf_path, max_pages=args.max_pages))
+        print(f"{f'layout extraction, {args.max_pages}-page budget':<36} {ms:>9.1f}  {document.pages_extracted} pages")
+        document, ms = timed(lambda: store.get_or_extract("budget-chars", pdf_path, max_chars=args.max_chars))
+        print(f"{f'layout extraction, {args.max_chars:,}-char budget':<36} {ms:>9.1f}  "
+              f"{document.pages_extracted} pages, {document.chars:,} chars")
+
+        document, ms = timed(lambda: store.get_or_extract("full", pdf_path))
+        summary = document.summary()
+        print(f"{'layout extraction, whole document':<36} {ms:>9.1f}  "
+              f"{summary['headings']} headings, {summary['tables']} tables")
+        print(f"{'artifact size':<36} {'':>9}  {os.path.getsize(document.path) / 1024:.0f} KB")
+
+        text, ms = timed(lambda: store.get_or_extract("full", pdf_path).text(), repeat=20)
+        print(f"{'artifact hit: map + whole text':<36} {ms:>9.2f}  {len(text):,} chars")
+        page, ms = timed(lambda: store.load("full").page_text(args.pages // 2), repeat=20)
+        print(f"{'artifact hit: one page':<36} {ms:>9.2f}  {len(page):,} chars")
+        heading = document.headings()[-1][1]
+        section, ms = timed(lambda: store.load("full").section(heading), repeat=20)
+        print(f"{'artifact hit: last section':<36} {ms:>9.2f}  {len(section or ''):,} chars")
+        tables, ms = timed(lambda: store.load("full").tables(), repeat=20)
+        print(f"{'artifact hit: all tables':<36} {ms:>9.2f}  {len(tables)} tables")
+
+        _, ms = timed(lambda: store.get_or_extract("budget-pages", pdf_path))
+        print(f"{'resume budgeted artifact to the end':<36} {ms:>9.1f}  {store.stats()['resumed']} resumed")
+
+
+if __name__ == "__main__":
+    main()
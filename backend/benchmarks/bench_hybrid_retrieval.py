@@ -0,0 +1,89 @@
+"""
+Benchmark: build time, query latency and memory footprint of the BM25 index and hybrid
+(BM25 + vector, reciprocal-rank fusion) retrieval over synthetic project corpora.
+Queries are short keyword queries and whole synthetic RFP pages.
+
+Usage (from the backend directory):
+    python benchmarks/bench_hybrid_retrieval.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import percentile, peak_rss_mb
+from lexical_index import BM25Index, HybridRetriever
+from vector_index import VectorIndex
+from synthetic import RFP_VOCABULARY, synthetic_lines, synthetic_projects
+
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    keyword_queries = [" ".join(rng.sample(RFP_VOCABULARY, 2) + [f"term{rng.randint(0, 2000)}"]) + " patent law"
+                       for _ in range(args.queries)]
+    rfp_queries = ["\n".join(synthetic_lines(page, 45, rng)) for page in range(args.queries // 4)]
+
+    print(f"{'projects':>9} {'build (s)':>9} {'index MB':>8} {'save (s)':>8} {'load (s)':>8} "
+          f"{'kw p50 ms':>9} {'kw p95 ms':>9} {'rfp p50 ms':>10} {'rfp p95 ms':>10} "
+          f"{'vector p50 ms':>13} {'hybrid p50 ms':>13} {'hybrid p95 ms':>13} {'add 1k ms':>10}")
+    for size in args.sizes:
+        projects = synthetic_projects(size, rng)
+        lexical = BM25Index()
+        start = time.perf_counter()
+        lexical.add(projects)
+        lexical.freeze()
+        build_seconds = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as path:
+            start = time.perf_counter()
+            lexical.save(path)
+            save_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            lexical = BM25Index.load(path)
+            load_seconds = time.perf_counter() - start
+            snapshot_mb = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2**20
+
+        keyword = timed(lambda query: lexical.search(query, k=args.k), keyword_queries)
+        rfp = timed(lambda query: lexical.search(query, k=args.k), rfp_queries)
+
+        vectors = VectorIndex()
+        vectors.add(projects)
+        hybrid = HybridRetriever(vectors, lexical)
+        dense = timed(lambda query: vectors.search([query], k=args.k), keyword_queries[:100])
+        fused = timed(lambda query: hybrid.search([query], k=args.k), keyword_queries[:100])
+        memory_mb = lexical.memory_bytes() / 2**20
+
+        updates = synthetic_projects(1000, rng)
+        start = time.perf_counter()
+        lexical.add(updates)
+        add_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>9} {build_seconds:>9.2f} {memory_mb:>8.1f} {save_seconds:>8.2f} "
+              f"{load_seconds:>8.2f} {percentile(keyword, 50):>9.2f} {percentile(keyword, 95):>9.2f} "
+              f"{percentile(rfp, 50):>10.2f} {percentile(rfp, 95):>10.2f} {percentile(dense, 50):>13.2f} "
+              f"{percentile(fused, 50):>13.2f} {percentile(fused, 95):>13.2f} {add_ms:>10.1f}")
+        print(f"{'':>9} snapshot on disk: {snapshot_mb:.1f} MB, vocabulary: {len(lexical._vocab):,} terms")
+        del lexical, vectors, hybrid, projects
+
+    print(f"\npeak RSS: {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
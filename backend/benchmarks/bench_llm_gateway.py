@@ -0,0 +1,102 @@
+"""
+Benchmark: decision-call latency under throttling and slow outliers, comparing the previous
+client (one deployment, SDK retries, no timeout) with the LLM gateway on one and on two
+deployments. Each deployment is a local fake Azure OpenAI server with a requests-per-second
+quota (429 + Retry-After beyond it) and a fraction of very slow responses.
+
+Usage (from the backend directory):
+    python benchmarks/bench_llm_gateway.py --requests 300 --concurrency 12 --rate-limit-rps 12 --slow-rate 0.03
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import BACKEND_DIR, percentile
+from bench_serving import BENCH_DIR, free_port, wait_until_ready
+
+import app as backend
+import metrics
+from decision_chain import PreparedChain
+from llm_gateway import LLMGateway, Deployment
+
+
+def start_fake(args):
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.latency_ms / 4),
+        "--rate-limit-rps", str(args.rate_limit_rps), "--slow-rate", str(args.slow_rate), "--slow-ms", str(args.slow_ms),
+    ], cwd=BACKEND_DIR)
+    wait_until_ready(f"http://127.0.0.1:{port}/fake/config")
+    return process, f"http://127.0.0.1:{port}"
+
+
+def llm_for(endpoint, **overrides):
+    return backend.create_llm(azure_endpoint=endpoint, api_key="fake-key", azure_deployment="fake-deployment", **overrides)
+
+
+def gateway_chain(endpoints, deadline):
+    deployments = [Deployment(f"fake-{i}", llm_for(endpoint, max_retries=0, timeout=deadline))
+                   for i, endpoint in enumerate(endpoints)]
+    return LLMGateway(deployments, deadline_seconds=deadline).prepare(backend.AIDecisionResponse, backend.DECISION_STATIC_MESSAGES)
+
+
+def run(label, chain, requests, concurrency, warmup):
+    """Issue decision calls with at most concurrency in flight; failures are calls that would fall back"""
+    request = backend.build_decision_request("Outside counsel for employment litigation and compliance advice.", backend.MOCK_SIMILAR_PROJECTS)
+    latencies, failures = [], 0
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            chain.invoke(request)
+            return time.perf_counter() - start, False
+        except Exception:
+            return time.perf_counter() - start, True
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(warmup)))  # fills the gateway's latency windows so hedging can kick in
+        hedges_before = sum(metrics.LLM_HEDGES._values.values())
+        for latency, failed in pool.map(one, range(requests)):
+            latencies.append(latency)
+            failures += failed
+    hedges = sum(metrics.LLM_HEDGES._values.values()) - hedges_before
+    print(f"{label:<26} {percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+          f"{percentile(latencies, 99):>7.2f} {max(latencies):>7.2f} {failures:>6} {hedges:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--rate-limit-rps", type=float, default=12, help="quota of each fake deployment")
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-ms", type=float, default=4000)
+    parser.add_argument("--deadline", type=float, default=20)
+    parser.add_argument("--warmup", type=int, default=40)
+    args = parser.parse_args()
+
+    fakes = [start_fake(args), start_fake(args)]
+    try:
+        endpoints = [endpoint for _, endpoint in fakes]
+        print(f"{args.requests} calls, concurrency {args.concurrency}, fake latency {args.latency_ms:.0f} ms, "
+              f"quota {args.rate_limit_rps:.0f} req/s per deployment, {args.slow_rate:.0%} of calls +{args.slow_ms:.0f} ms\n")
+        print(f"{'client':<26} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7} {'failed':>6} {'hedges':>6}")
+        legacy = PreparedChain(llm_for(endpoints[0], max_retries=2, timeout=None),
+                               backend.AIDecisionResponse, backend.DECISION_STATIC_MESSAGES)
+        run("single, SDK retries", legacy, args.requests, args.concurrency, args.warmup)
+        run("gateway, 1 deployment", gateway_chain(endpoints[:1], args.deadline), args.requests, args.concurrency, args.warmup)
+        run("gateway, 2 deployments", gateway_chain(endpoints, args.deadline), args.requests, args.concurrency, args.warmup)
+    finally:
+        for process, _ in fakes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
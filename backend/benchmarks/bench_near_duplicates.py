@@ -0,0 +1,91 @@
+"""
+Benchmark: near-duplicate RFP index (MinHash + LSH) at increasing sizes.
+Indexes synthetic RFPs, then looks up reissues of indexed RFPs (new due date, one amended line,
+an appended addendum) and unrelated RFPs. Reports signature time, index lookup latency (LSH
+candidates + verification, signature precomputed), end-to-end lookup latency (signature, record read
+and section diff on a match), reissue recall, false matches, memory per RFP and reload time.
+
+Usage (from the backend directory):
+    python benchmarks/bench_near_duplicates.py --sizes 10000 100000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import percentile, peak_rss_mb
+from synthetic import SERVICE_DOMAINS, synthetic_rfp_text
+
+from near_duplicates import NearDuplicateIndex, minhash
+
+DECISION = {"recommendation": "PURSUE", "confidence_score": 0.8, "executive_summary": "Synthetic decision"}
+
+
+def reissue(text, rng):
+    """The same RFP with a new due date, one amended line and an addendum"""
+    lines = text.splitlines()
+    lines[rng.randrange(len(lines))] = f"Proposals are due {rng.choice(['March', 'April', 'May'])} {rng.randint(1, 28)}, 2025 at 2:00 PM"
+    lines[rng.randrange(len(lines))] += " as amended"
+    lines += ["ADDENDUM 1", "Questions received after the deadline will not be answered."]
+    return "\n".join(lines)
+
+
+def timed_ms(fn, items):
+    results, latencies = [], []
+    for item in items:
+        start = time.perf_counter()
+        results.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=150, help="lines per reissued RFP (the rest of the index uses 40)")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    domains = list(SERVICE_DOMAINS)
+
+    print(f"{'indexed':>8} {'add ms':>7} {'sig ms':>7} {'find p50':>9} {'find p99':>9} {'lookup p50':>11} "
+          f"{'recall':>7} {'false':>6} {'index B/RFP':>12} {'RSS B/RFP':>10} {'reload s':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            rss_before = peak_rss_mb()
+            index = NearDuplicateIndex(folder, persist=True)
+            originals = [synthetic_rfp_text(rng.choice(domains), rng, lines=args.lines) for _ in range(args.queries)]
+            start = time.perf_counter()
+            for text in originals:
+                index.add(text, DECISION)
+            for _ in range(size - len(originals)):
+                index.add(synthetic_rfp_text(rng.choice(domains), rng, lines=40), DECISION)
+            add_ms = (time.perf_counter() - start) * 1000 / size
+            rss_per_rfp = (peak_rss_mb() - rss_before) * 1024 * 1024 / size
+
+            reissues = [reissue(text, rng) for text in originals]
+            unrelated = [synthetic_rfp_text(rng.choice(domains), rng, lines=args.lines) for _ in range(args.queries)]
+            signatures, signature_ms = timed_ms(minhash, reissues)
+            unrelated_signatures = [minhash(text) for text in unrelated]
+            found, find_ms = timed_ms(index.find, signatures + unrelated_signatures)
+            recall = sum(match is not None for match in found[:len(reissues)]) / len(reissues)
+            false_matches = sum(match is not None for match in found[len(reissues):])
+            _, lookup_ms = timed_ms(index.lookup, reissues)
+
+            start = time.perf_counter()
+            reloaded = NearDuplicateIndex(folder, persist=True)
+            reload_seconds = time.perf_counter() - start
+            assert len(reloaded) == size
+
+            print(f"{size:>8} {add_ms:>7.2f} {percentile(signature_ms, 50):>7.2f} {percentile(find_ms, 50):>9.3f} "
+                  f"{percentile(find_ms, 99):>9.3f} {percentile(lookup_ms, 50):>11.2f} {recall:>7.1%} {false_matches:>6} "
+                  f"{index.memory_bytes() / size:>12.0f} {rss_per_rfp:>10.0f} {reload_seconds:>9.2f}")
+            records_mb = os.path.getsize(os.path.join(folder, "records.jsonl")) / (1024 * 1024)
+            print(f"{'':>8} on disk: {records_mb:.1f} MB of records (decision + compressed text), "
+                  f"{os.path.getsize(os.path.join(folder, 'signatures.bin')) / (1024 * 1024):.1f} MB of signatures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: legacy serial PDF extraction loop vs. page-parallel extraction engine.
+Each variant runs in a fresh subprocess so peak RSS is measured independently.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pdf_extraction.py --pages 100 300 600
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import peak_rss_mb
+from synthetic import write_synthetic_pdf
+
+VARIANTS = ["legacy", "parallel", "streaming"]
+
+
+def run_legacy(file_path):
+    """The original extract_text_from_file loop"""
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+        return len(text), None
+
+
+def run_parallel(file_path):
+    """Full-document extraction through the process pool"""
+    from pdf_extraction import extract_pdf_text
+    return len(extract_pdf_text(file_path)), None
+
+
+def run_streaming(file_path):
+    """Generator API - also records when the first page became available"""
+    from pdf_extraction import iter_pdf_pages
+    start = time.perf_counter()
+    first_page_seconds = None
+    total = 0
+    for _, text in iter_pdf_pages(file_path):
+        if first_page_seconds is None:
+            first_page_seconds = time.perf_counter() - start
+        total += len(text) + 1
+    return total, first_page_seconds
+
+
+def run_variant(variant, file_path):
+    """Run one variant in this process and print its measurements as JSON"""
+    runner = {"legacy": run_legacy, "parallel": run_parallel, "streaming": run_streaming}[variant]
+    start = time.perf_counter()
+    chars, first_page_seconds = runner(file_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "variant": variant,
+        "wall_seconds": round(elapsed, 4),
+        "first_page_seconds": round(first_page_seconds, 4) if first_page_seconds is not None else None,
+        "chars": chars,
+        "peak_rss_mb": round(peak_rss_mb(include_children=True) or 0, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 600])
+    parser.add_argument("--run", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.file)
+        return
+
+    print(f"{'pages':>6} {'variant':<10} {'wall (s)':>9} {'first page (s)':>15} {'peak RSS (MB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in args.pages:
+            file_path = os.path.join(tmp_dir, f"rfp_{pages}.pdf")
+            write_synthetic_pdf(file_path, pages)
+            for variant in VARIANTS:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run", variant, "--file", file_path],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                first_page = result["first_page_seconds"]
+                print(f"{pages:>6} {variant:<10} {result['wall_seconds']:>9.3f} "
+                      f"{first_page if first_page is not None else '-':>15} {result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
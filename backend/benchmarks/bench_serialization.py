@@ -0,0 +1,145 @@
+"""
+Benchmark: bytes on the wire and server CPU for project listings and upload responses, the previous
+path (rows read and encoded with Flask's jsonify on every request) vs. the serialization layer
+(orjson or compact json, cached record encodings, gzip/brotli, NDJSON streaming).
+For each store size the whole listing is fetched: as /api/projects pages of --page-size projects,
+and as one NDJSON stream. CPU is process time spent building the response bodies, store reads
+included; "cold" starts with an empty encoding cache, "warm" repeats the listing.
+
+Usage (from the backend directory):
+    python benchmarks/bench_serialization.py --sizes 10 1000 100000 --page-size 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from flask import Flask
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from synthetic import synthetic_projects
+
+import serialization
+from serialization import ProjectEncodings, dumps, json_array, json_object, compress, compress_stream
+from project_store import ProjectStore, import_projects
+
+
+def list_pages(store, page_size):
+    """Every page of the listing as (records, next_cursor) via the store's row path"""
+    cursor = None
+    while True:
+        projects, cursor = store.list(cursor=cursor, limit=page_size)
+        yield projects, cursor
+        if cursor is None:
+            return
+
+
+def jsonify_pages(store, page_size, flask_app):
+    """Previous path: read full rows, build dicts and jsonify each page"""
+    total = store.count()
+    with flask_app.app_context():
+        for projects, cursor in list_pages(store, page_size):
+            yield flask_app.json.response({"projects": projects, "total_count": total, "next_cursor": cursor}).get_data()
+
+
+def encoded_pages(store, encodings, page_size, encoding):
+    """New path: read the page's ids, splice cached record encodings, compress"""
+    total = store.count()
+    cursor = None
+    while True:
+        page, cursor = store.list(cursor=cursor, limit=page_size, fields=["id"])
+        records = encodings.records([project["id"] for project in page])
+        yield compress(json_object(projects=json_array(records), total_count=total, next_cursor=cursor), encoding)
+        if cursor is None:
+            return
+
+
+def ndjson_stream(store, encodings, page_size, encoding):
+    """New path: one NDJSON stream of the whole listing, compressed chunk by chunk"""
+    def chunks():
+        cursor = None
+        while True:
+            page, cursor = store.list(cursor=cursor, limit=page_size, fields=["id"])
+            records = encodings.records([project["id"] for project in page], remember=False)
+            if records:
+                yield b"\n".join(records) + b"\n"
+            if cursor is None:
+                return
+    return compress_stream(chunks(), encoding)
+
+
+def measure(bodies):
+    """(responses or chunks, bytes, CPU ms) for an iterable of response bodies"""
+    start = time.process_time()
+    count = size = 0
+    for body in bodies:
+        count += 1
+        size += len(body)
+    return count, size, (time.process_time() - start) * 1000
+
+
+def upload_payload(rng):
+    """A synchronous upload response: file info, five similar projects and a decision"""
+    return {
+        "success": True,
+        "message": "RFP uploaded successfully",
+        "file_info": {"original_name": "rfp.pdf", "saved_name": "20250101_000000_rfp.pdf", "size": 250_000},
+        "similar_projects": [dict(project, similarity_score=round(rng.random(), 2)) for project in synthetic_projects(5, rng)],
+        "ai_decision": {
+            "recommendation": "PURSUE",
+            "confidence_score": 0.82,
+            "executive_summary": "Strong fit with the firm's regulatory practice. " * 8,
+            "key_factors": [f"Factor {i}: relevant experience in similar engagements" for i in range(6)],
+            "risk_assessment": "Moderate schedule risk. " * 6,
+            "financial_analysis": "Budget in line with comparable projects. " * 6,
+            "next_steps": [f"Step {i}: assign the capture team" for i in range(5)],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--upload-repeat", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    flask_app = Flask(__name__)
+    codings = ["gzip"] + (["br"] if serialization.brotli is not None else [])
+    print(f"encoder: {serialization.JSON_ENCODER}, compression: {', '.join(codings)}\n")
+
+    print(f"{'projects':>9} {'path':<24} {'responses':>9} {'bytes':>12} {'CPU ms':>9} {'CPU ms/resp':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            store = ProjectStore(os.path.join(folder, "projects.db"))
+            import_projects(store, synthetic_projects(size, rng))
+            encodings = ProjectEncodings(store, max_entries=max(size, 1))
+
+            scenarios = [("jsonify (previous)", lambda: jsonify_pages(store, args.page_size, flask_app)),
+                         ("encoded cold", lambda: encoded_pages(store, encodings, args.page_size, None)),
+                         ("encoded warm", lambda: encoded_pages(store, encodings, args.page_size, None))]
+            scenarios += [(f"encoded warm + {coding}", lambda coding=coding: encoded_pages(store, encodings, args.page_size, coding))
+                          for coding in codings]
+            scenarios += [("ndjson stream", lambda: ndjson_stream(store, encodings, args.page_size, None))]
+            scenarios += [(f"ndjson stream + {coding}", lambda coding=coding: ndjson_stream(store, encodings, args.page_size, coding))
+                          for coding in codings]
+            for label, bodies in scenarios:
+                count, size_bytes, cpu_ms = measure(bodies())
+                responses = 1 if label.startswith("ndjson") else count
+                print(f"{size:>9} {label:<24} {responses:>9} {size_bytes:>12,} {cpu_ms:>9.1f} {cpu_ms / responses:>11.3f}")
+            print()
+
+    payload = upload_payload(rng)
+    print(f"upload response ({args.upload_repeat} encodings):")
+    with flask_app.app_context():
+        for label, encode in [("jsonify (previous)", lambda: flask_app.json.response(payload).get_data()),
+                              ("dumps", lambda: dumps(payload))] + \
+                             [(f"dumps + {coding}", lambda coding=coding: compress(dumps(payload), coding)) for coding in codings]:
+            count, size_bytes, cpu_ms = measure(encode() for _ in range(args.upload_repeat))
+            print(f"{'':>9} {label:<24} {size_bytes // count:>9} bytes {cpu_ms * 1000 / count:>9.1f} µs CPU")
+
+
+if __name__ == "__main__":
+    main()
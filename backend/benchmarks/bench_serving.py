@@ -0,0 +1,124 @@
+"""
+Load test: concurrent /api/upload-rfp throughput of the Flask and ASGI serving paths
+against a local fake Azure OpenAI server.
+
+Usage (from the backend directory):
+    python benchmarks/bench_serving.py --requests 200 --concurrency 10 50 --latency-ms 800
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+from common import BACKEND_DIR, percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def backend_env(fake_port, cache_dir):
+    """Environment pointing the backend at the fake server, with caches isolated per run"""
+    return dict(
+        os.environ,
+        AZURE_OPENAI_ENDPOINT=f"http://127.0.0.1:{fake_port}",
+        AZURE_OPENAI_API_KEY="fake-key",
+        AZURE_OPENAI_DEPLOYMENT_NAME="fake-deployment",
+        RESULT_CACHE_FOLDER=cache_dir,
+    )
+
+
+def start_server(kind, port, env):
+    """Launch the Flask (threaded WSGI) or ASGI (uvicorn) backend as a subprocess"""
+    if kind == "flask":
+        command = [sys.executable, "-c",
+                   f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def run_load(base_url, total, concurrency, run_id):
+    """Fire total uploads with at most concurrency in flight; returns (wall seconds, latencies, failures)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i):
+            nonlocal failures
+            # Unique content per request so caches never short-circuit the LLM call
+            content = f"RFP {run_id}-{i}: legal services for regulatory compliance review".encode()
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(f"{base_url}/api/upload-rfp",
+                                             files={"file": (f"rfp_{i}.txt", content, "text/plain")})
+                latencies.append(time.perf_counter() - start)
+                failures += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--servers", nargs="+", choices=["flask", "asgi"], default=["flask", "asgi"])
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    fake = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(fake_port),
+                             "--latency-ms", str(args.latency_ms)], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{fake_port}/fake/config")
+        print(f"fake LLM latency: {args.latency_ms:.0f} ms, {args.requests} uploads per run\n")
+        print(f"{'server':<6} {'concurrency':>11} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'failed':>6}")
+        for kind in args.servers:
+            port = free_port()
+            with tempfile.TemporaryDirectory() as cache_dir:
+                server = start_server(kind, port, backend_env(fake_port, cache_dir))
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    wait_until_ready(f"{base_url}/api/health")
+                    for concurrency in args.concurrency:
+                        run_id = f"{kind}-{concurrency}-{time.time()}"
+                        wall, latencies, failures = asyncio.run(run_load(base_url, args.requests, concurrency, run_id))
+                        print(f"{kind:<6} {concurrency:>11} {args.requests / wall:>7.1f} "
+                              f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+                              f"{percentile(latencies, 99):>7.2f} {failures:>6}")
+                finally:
+                    server.terminate()
+                    server.wait()
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    main()
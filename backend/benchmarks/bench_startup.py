@@ -0,0 +1,123 @@
+"""
+Benchmark: cold start of the backend in each STARTUP_MODE (eager, lazy, background).
+For every mode a fresh Flask server is started against the local fake Azure OpenAI server and the
+benchmark records the time until /api/health answers, until /api/ready returns 200, the latency of
+the first upload, and the resident memory of the idle worker before and after that upload.
+An import-time profile (python -X importtime -c "import app") lists the modules that dominate
+`import app` in each mode.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --runs 3 --top 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from common import BACKEND_DIR, process_rss_mb
+from bench_serving import BENCH_DIR, backend_env, free_port, start_server, wait_until_ready
+from synthetic import synthetic_txt_bytes
+
+MODES = ["eager", "lazy", "background"]
+
+
+def wait_for_status(url, status, timeout=120):
+    """Poll url until it answers with the given status code"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == status:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"{url} did not return {status}")
+
+
+def cold_start(mode, env, seed):
+    """One server start: health and readiness times, idle RSS and first upload latency"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = start_server("flask", port, dict(env, STARTUP_MODE=mode))
+    try:
+        wait_for_status(f"{base_url}/api/health", 200)
+        health_s = time.perf_counter() - started
+        wait_for_status(f"{base_url}/api/ready", 200)
+        ready_s = time.perf_counter() - started
+        time.sleep(1.0)  # let background warm-up settle before sampling the idle worker
+        idle_rss = process_rss_mb(server.pid)
+        content = f"RFP startup {mode}-{seed}\n".encode() + synthetic_txt_bytes(1, seed=seed)
+        start = time.perf_counter()
+        response = httpx.post(f"{base_url}/api/upload-rfp", timeout=120,
+                              files={"file": (f"rfp_{seed}.txt", content, "text/plain")})
+        first_upload_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"first upload failed with {response.status_code}: {response.text[:200]}")
+        return health_s, ready_s, first_upload_ms, idle_rss, process_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_profile(mode, env, top):
+    """Total `import app` time and the slowest top-level imports, from python -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=BACKEND_DIR,
+                            env=dict(env, STARTUP_MODE=mode), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # importtime indents each level of the import tree by two spaces: keep app and its direct imports
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1 or name.strip() == "app":
+            rows.append((int(cumulative) / 1_000_000, name.strip()))
+    total = next(seconds for seconds, name in rows if name == "app")
+    return total, sorted((row for row in rows if row[1] != "app"), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--runs", type=int, default=3, help="server starts per mode (best run is reported)")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports listed per mode")
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    fake = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(fake_port),
+                             "--latency-ms", "50"], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{fake_port}/fake/config")
+        with tempfile.TemporaryDirectory() as work_dir:
+            env = dict(backend_env(fake_port, os.path.join(work_dir, "cache")), UPLOAD_PERSIST="false")
+            # Warm the embedding and result caches once so every measured start does the same work
+            cold_start("eager", env, seed=0)
+
+            print(f"{'mode':<11} {'health s':>9} {'ready s':>8} {'1st upload ms':>14} {'idle RSS MB':>12} "
+                  f"{'RSS after MB':>13}")
+            for mode in args.modes:
+                runs = [cold_start(mode, env, seed=run + 1) for run in range(args.runs)]
+                health_s, ready_s, upload_ms, idle_rss, rss_after = min(runs)
+                print(f"{mode:<11} {health_s:>9.2f} {ready_s:>8.2f} {upload_ms:>14.0f} {idle_rss or 0:>12.0f} "
+                      f"{rss_after or 0:>13.0f}")
+
+            # Background mode imports exactly what lazy mode does; its warm-up thread would interleave
+            # its own imports with the profile
+            for mode in [mode for mode in args.modes if mode != "background"]:
+                total, slowest = import_profile(mode, env, args.top)
+                print(f"\nimport app ({mode}): {total:.3f} s")
+                for seconds, name in slowest:
+                    print(f"    {seconds:>7.3f} s  {name}")
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark suite: load scenarios against the backend wired to the local fake Azure OpenAI server
+(chat completions and embeddings). Each scenario runs against a fresh server process and reports
+throughput, latency percentiles, failures, fallback decisions and the server's peak RSS.
+Results are written to JSON (benchmarks/results/<commit>-<server>.json by default) so runs on
+different commits can be compared; a comparison exits non-zero when a metric regresses by more
+than the threshold.
+
+Scenarios: upload_txt_<N>p and upload_pdf_<N>p (POST /api/upload-rfp with unique synthetic RFPs
+of N pages), projects_list (GET /api/projects with paging, projections and filters) and
+project_detail (GET /api/project/<id>).
+
+Usage (from the backend directory):
+    python benchmarks/bench_suite.py --server flask --pages 1 20 --requests 100 --concurrency 10
+    python benchmarks/bench_suite.py --error-rate 0.05 --malformed-rate 0.02 --baseline benchmarks/results/abc1234-flask.json
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234-flask.json benchmarks/results/def5678-flask.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from common import BACKEND_DIR, percentile, process_peak_rss_mb
+from bench_serving import BENCH_DIR, backend_env, free_port, start_server, wait_until_ready
+from synthetic import PRACTICE_AREAS, synthetic_pdf_bytes, synthetic_projects, synthetic_txt_bytes
+
+from project_store import ProjectStore, encode_cursor
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+# Metric -> True when higher is better
+COMPARED_METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False, "peak_rss_mb": False}
+FALLBACK_METRIC = re.compile(r"^rfp_fallback_decisions_total\s+([0-9.e+]+)", re.MULTILINE)
+
+
+def upload_requests(kind, pages, count, seed):
+    """Unique synthetic RFP uploads so no cache short-circuits extraction or the LLM call"""
+    requests = []
+    for i in range(count):
+        if kind == "pdf":
+            content, content_type = synthetic_pdf_bytes(pages, seed=seed + i), "application/pdf"
+        else:
+            content, content_type = f"RFP {seed}-{i}\n".encode() + synthetic_txt_bytes(pages, seed=seed + i), "text/plain"
+        requests.append(("POST", "/api/upload-rfp", {"files": {"file": (f"rfp_{i}.{kind}", content, content_type)}}))
+    return requests
+
+
+def project_list_requests(count, projects, rng):
+    """First pages, keyset pages at random positions, projections and filters"""
+    requests = []
+    for _ in range(count):
+        params = {"limit": rng.choice([20, 50, 100])}
+        shape = rng.random()
+        if shape < 0.25:
+            params["cursor"] = encode_cursor(rng.randrange(projects))
+        elif shape < 0.5:
+            params["fields"] = "id,title,cost,completion_date"
+        elif shape < 0.75:
+            params["technology"] = rng.choice(PRACTICE_AREAS)
+        else:
+            low = rng.randint(50_000, 800_000)
+            params.update(min_cost=low, max_cost=low + 200_000, completed_after="2020-01-01")
+        requests.append(("GET", "/api/projects", {"params": params}))
+    return requests
+
+
+def project_detail_requests(count, projects, rng):
+    return [("GET", f"/api/project/{rng.randrange(projects)}", {}) for _ in range(count)]
+
+
+async def run_load(base_url, requests, concurrency):
+    """Send requests with at most concurrency in flight; returns (wall seconds, latencies in ms, failures)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with httpx.AsyncClient(timeout=600, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(method, path, kwargs):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, f"{base_url}{path}", **kwargs)
+                    failures += response.status_code != 200
+                except httpx.HTTPError:
+                    failures += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(*request) for request in requests))
+        return time.perf_counter() - start, latencies, failures
+
+
+def run_scenario(name, requests, args, env):
+    """Start a fresh server, run one scenario against it and return its result record"""
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server(args.server, port, env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_ready(f"{base_url}/api/health", timeout=300)
+        startup = time.perf_counter() - started
+        wall, latencies, failures = asyncio.run(run_load(base_url, requests, args.concurrency))
+        match = FALLBACK_METRIC.search(httpx.get(f"{base_url}/api/metrics", timeout=30).text)
+        result = {
+            "requests": len(requests),
+            "concurrency": args.concurrency,
+            "throughput_rps": round(len(requests) / wall, 2),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(max(latencies), 1),
+            "failures": failures,
+            "fallbacks": int(float(match.group(1))) if match else 0,  # unset counters are not rendered
+            "peak_rss_mb": round(process_peak_rss_mb(server.pid) or 0, 1) or None,
+            "startup_s": round(startup, 2),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"{name:<18} {result['throughput_rps']:>7.1f} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+          f"{result['p99_ms']:>8.0f} {failures:>6} {result['fallbacks']:>9} "
+          f"{result['peak_rss_mb'] or 0:>8.0f}")
+    return result
+
+
+def git_revision():
+    """(short commit, working tree has uncommitted changes)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def compare(baseline, current, threshold):
+    """Print per-metric changes between two result files; returns the number of regressions"""
+    print(f"\nbaseline {baseline['commit']} vs current {current['commit']} (regression threshold {threshold:.0%})")
+    print(f"{'scenario':<18} {'metric':<14} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = 0
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = (-change if higher_is_better else change) > threshold
+            regressions += regressed
+            print(f"{name:<18} {metric:<14} {old:>10.1f} {new:>10.1f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["flask", "asgi"], default="flask")
+    parser.add_argument("--scenarios", nargs="+", default=["upload_txt", "upload_pdf", "projects_list", "project_detail"])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 20], help="page counts of the upload scenarios")
+    parser.add_argument("--requests", type=int, default=100, help="requests per upload scenario")
+    parser.add_argument("--read-requests", type=int, default=1000, help="requests per project scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--projects", type=int, default=10_000, help="synthetic projects in the store")
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=20_000)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-<server>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare this run against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="only compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            sys.exit(1 if compare(json.load(old), json.load(new), args.threshold) else 0)
+
+    rng = random.Random(0)
+    fake_port = free_port()
+    fake = subprocess.Popen([
+        sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(fake_port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.latency_ms / 4),
+        "--prompt-tokens-per-second", str(args.prompt_tokens_per_second), "--tokens-per-second", str(args.tokens_per_second),
+        "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate),
+        "--malformed-rate", str(args.malformed_rate), "--embedding-dim", "256",
+    ], cwd=BACKEND_DIR)
+    scenarios = {}
+    try:
+        wait_until_ready(f"http://127.0.0.1:{fake_port}/fake/config")
+        with tempfile.TemporaryDirectory() as work_dir:
+            store = ProjectStore(os.path.join(work_dir, "projects.db"))
+            store.upsert_many(synthetic_projects(args.projects, rng))
+            # Caches persist across scenarios (so only the first server start embeds the projects);
+            # every upload is unique, so no request is served from them
+            env = dict(backend_env(fake_port, os.path.join(work_dir, "cache")),
+                       PROJECT_DB_PATH=store.path, UPLOAD_PERSIST="false",
+                       EMBEDDING_BACKEND="azure", AZURE_OPENAI_EMBEDDING_DIM="256")
+
+            planned = []
+            for scenario in args.scenarios:
+                if scenario in ("upload_txt", "upload_pdf"):
+                    for pages in args.pages:
+                        planned.append((f"{scenario}_{pages}p", lambda kind=scenario[-3:], pages=pages:
+                                        upload_requests(kind, pages, args.requests, seed=rng.randrange(1 << 30))))
+                elif scenario == "projects_list":
+                    planned.append((scenario, lambda: project_list_requests(args.read_requests, args.projects, rng)))
+                elif scenario == "project_detail":
+                    planned.append((scenario, lambda: project_detail_requests(args.read_requests, args.projects, rng)))
+                else:
+                    parser.error(f"unknown scenario {scenario}")
+
+            print(f"{args.server} server, {args.projects:,} projects, concurrency {args.concurrency}, "
+                  f"fake LLM {args.latency_ms:.0f} ms + {args.prompt_tokens_per_second:,.0f} prompt tokens/s, "
+                  f"errors {args.error_rate:.0%}, throttled {args.throttle_rate:.0%}, malformed {args.malformed_rate:.0%}\n")
+            print(f"{'scenario':<18} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>6} "
+                  f"{'fallbacks':>9} {'RSS MB':>8}")
+            for name, build in planned:
+                scenarios[name] = run_scenario(name, build(), args, env)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit + ("-dirty" if dirty else ""),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "server": args.server,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "compare")},
+        "scenarios": scenarios,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-{args.server}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            sys.exit(1 if compare(json.load(file), report, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
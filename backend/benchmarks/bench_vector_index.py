@@ -0,0 +1,92 @@
+"""
+Benchmark: recall and latency of the in-process similar-project vector index.
+Queries are noisy copies of indexed vectors; recall@k is how often the source project is returned.
+
+Usage (from the backend directory):
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+import numpy as np
+
+from common import percentile, peak_rss_mb
+from vector_index import VectorIndex, hashing_embedder, normalize
+from synthetic import RFP_VOCABULARY
+
+PRACTICE_AREAS = ["Corporate Law", "Employment Law", "Securities Law", "Patent Law", "Commercial Litigation"]
+
+
+def synthetic_corpus(size, dim, rng):
+    """Clustered unit vectors plus minimal project metadata"""
+    centers = normalize(rng.standard_normal((64, dim)))
+    vectors = normalize(centers[rng.integers(0, 64, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32))
+    projects = [
+        {
+            "id": i,
+            "cost": int(cost),
+            "completion_date": f"20{18 + i % 7}-{1 + i % 12:02d}-15",
+            "technology_stack": [PRACTICE_AREAS[i % len(PRACTICE_AREAS)]],
+        }
+        for i, cost in enumerate(rng.integers(50_000, 1_000_000, size))
+    ]
+    return projects, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=0.8, help="query noise norm relative to a unit vector")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    sample = [" ".join(rng.choice(RFP_VOCABULARY, 300)) for _ in range(200)]
+    start = time.perf_counter()
+    hashing_embedder(sample)
+    print(f"hashing_embedder: {len(sample) / (time.perf_counter() - start):,.0f} docs/s (300 tokens each)\n")
+
+    print(f"{'projects':>9} {'build (s)':>9} {'matrix MB':>9} {'recall@k':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'batch32 ms/q':>12} {'filtered p50 ms':>15}")
+    for size in args.sizes:
+        projects, vectors = synthetic_corpus(size, args.dim, rng)
+        index = VectorIndex(dim=args.dim)
+        start = time.perf_counter()
+        index.add(projects, vectors=vectors)
+        build_seconds = time.perf_counter() - start
+
+        sources = rng.integers(0, size, args.queries)
+        noise = normalize(rng.standard_normal((args.queries, args.dim))) * args.noise
+        queries = normalize(vectors[sources] + noise)
+
+        latencies, hits = [], 0
+        for source, query in zip(sources, queries):
+            start = time.perf_counter()
+            result = index.search_vectors(query, k=args.k)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(project_id == source for project_id, _ in result)
+
+        start = time.perf_counter()
+        for offset in range(0, args.queries, 32):
+            index.search_vectors(queries[offset:offset + 32], k=args.k)
+        batched_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+        filtered = []
+        for query in queries[:50]:
+            start = time.perf_counter()
+            index.search_vectors(query, k=args.k, practice_area="employment law",
+                                 min_cost=200_000, max_cost=600_000, completed_after="2020-01-01")
+            filtered.append((time.perf_counter() - start) * 1000)
+
+        print(f"{size:>9} {build_seconds:>9.2f} {index._vectors[:size].nbytes / 2**20:>9.0f} "
+              f"{hits / args.queries:>8.3f} {percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+              f"{batched_ms:>12.3f} {percentile(filtered, 50):>15.2f}")
+        del index, projects, vectors
+
+    print(f"\npeak RSS: {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Shared helpers for backend benchmarks.
+"""
+
+import math
+import os
+import sys
+
+# Benchmarks import backend modules the same way app.py does
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def peak_rss_mb(include_children=False):
+    """Return the peak resident set size of this process (and optionally its children) in MB"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: fall back to psutil if it is installed
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+    # ru_maxrss is reported in KB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if include_children:
+        peak += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak * scale / (1024 * 1024)
+
+
+def process_rss_mb(pid):
+    """Current resident set size of another running process in MB (None when it cannot be read)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def process_peak_rss_mb(pid):
+    """Peak resident set size of another running process in MB (None when it cannot be read)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process(pid).memory_info()
+    except Exception:
+        return None
+    # Only Windows tracks a peak; elsewhere the current RSS is the best available
+    return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    # The smallest value with at least pct% of the values at or below it
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
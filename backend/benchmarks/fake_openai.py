@@ -0,0 +1,301 @@
+"""
+Local stand-in for the Azure OpenAI chat completions and embeddings APIs.
+Answers tool/function calls with schema-conforming arguments after a configurable delay
+(streamed at a configurable token rate when the client asks for stream=true), and embeds inputs
+with the backend's deterministic hashing embedder. Prompt processing can cost time per input token.
+Can inject throttling (429, random or from a requests-per-second quota), server errors,
+malformed tool-call arguments and slow outliers (a fraction of requests taking much longer), and
+can model a deployment with limited capacity that slows down as concurrent completions pile up.
+
+Usage (from the backend directory):
+    python benchmarks/fake_openai.py --port 8011 --latency-ms 800
+Then point the backend at it with AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8011.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+import uuid
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from vector_index import hashing_embedder
+
+# Mutable so scenarios can reconfigure a running server via /fake/config
+CONFIG = {
+    "latency_ms": 500.0,
+    "jitter_ms": 100.0,
+    "throttle_rate": 0.0,
+    "error_rate": 0.0,
+    "retry_after_seconds": 1,
+    "tokens_per_second": 80.0,
+    "slow_rate": 0.0,
+    "slow_ms": 5000.0,
+    "rate_limit_rps": 0.0,  # deployment quota; 0 = unlimited
+    "prompt_tokens_per_second": 0.0,  # prompt processing rate; 0 = latency independent of prompt size
+    "malformed_rate": 0.0,  # fraction of tool calls answered with truncated (invalid JSON) arguments
+    "capacity": 0,  # completions served at full speed at once; beyond that latency grows with load; 0 = unlimited
+    "embedding_latency_ms": 30.0,
+    "embedding_dim": 1536,
+}
+_quota = {"tokens": 0.0, "updated": 0.0}
+STATS = {"requests": 0, "embedding_requests": 0, "throttled": 0, "errors": 0, "malformed": 0, "slow": 0,
+         "in_flight": 0, "max_in_flight": 0}
+
+
+def sample_value(schema, definitions):
+    """Produce a value that satisfies a (simple) JSON schema"""
+    if "$ref" in schema:
+        return sample_value(definitions[schema["$ref"].split("/")[-1]], definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema or "allOf" in schema:
+        return sample_value((schema.get("anyOf") or schema["allOf"])[0], definitions)
+    kind = schema.get("type", "string")
+    if kind == "object":
+        nested = {**definitions, **schema.get("definitions", {}), **schema.get("$defs", {})}
+        return {name: sample_value(prop, nested) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [sample_value(schema.get("items", {}), definitions) for _ in range(2)]
+    if kind == "number":
+        return 0.8
+    if kind == "integer":
+        return 1
+    if kind == "boolean":
+        return True
+    return f"Synthetic {schema.get('title', 'text').lower()} from the fake OpenAI server."
+
+
+def estimate_tokens(payload):
+    return max(1, len(json.dumps(payload)) // 4)
+
+
+def take_quota():
+    """Token-bucket quota of rate_limit_rps requests per second; returns seconds until the next slot, or 0"""
+    rate = CONFIG["rate_limit_rps"]
+    if not rate:
+        return 0.0
+    now = time.monotonic()
+    _quota["tokens"] = min(rate, _quota["tokens"] + (now - _quota["updated"]) * rate)
+    _quota["updated"] = now
+    if _quota["tokens"] >= 1:
+        _quota["tokens"] -= 1
+        return 0.0
+    return (1 - _quota["tokens"]) / rate
+
+
+def load_factor():
+    """Slowdown of a completion starting now: in-flight completions shared over the deployment's capacity"""
+    capacity = CONFIG["capacity"]
+    return max(1.0, STATS["in_flight"] / capacity) if capacity else 1.0
+
+
+def prompt_seconds(prompt_tokens):
+    rate = CONFIG["prompt_tokens_per_second"]
+    return prompt_tokens / rate if rate else 0.0
+
+
+def injected_failure(roll):
+    """Response for an injected 429 or quota rejection (checked before the delay), else None"""
+    if roll < CONFIG["throttle_rate"]:
+        return throttled(CONFIG["retry_after_seconds"])
+    wait = take_quota()
+    if wait:
+        return throttled(wait)
+    return None
+
+
+def server_error():
+    STATS["errors"] += 1
+    return JSONResponse({"error": {"code": "500", "message": "Injected server error"}}, status_code=500)
+
+
+def throttled(retry_after):
+    STATS["throttled"] += 1
+    return JSONResponse(
+        {"error": {"code": "429", "message": "Rate limit is exceeded. Try again later."}},
+        status_code=429,
+        headers={"Retry-After": str(max(1, round(retry_after))), "retry-after-ms": str(int(retry_after * 1000))}
+    )
+
+
+async def chat_completions(request):
+    """POST /openai/deployments/{deployment}/chat/completions"""
+    body = await request.json()
+    STATS["requests"] += 1
+
+    roll = random.random()
+    failure = injected_failure(roll)
+    if failure is not None:
+        return failure
+
+    prompt_tokens = estimate_tokens(body.get("messages", []))
+    delay = max(0.0, CONFIG["latency_ms"] + random.uniform(-1, 1) * CONFIG["jitter_ms"]) / 1000
+    delay += prompt_seconds(prompt_tokens)
+    if random.random() < CONFIG["slow_rate"]:
+        STATS["slow"] += 1
+        delay += CONFIG["slow_ms"] / 1000
+    STATS["in_flight"] += 1
+    STATS["max_in_flight"] = max(STATS["max_in_flight"], STATS["in_flight"])
+    try:
+        await asyncio.sleep(delay * load_factor())
+    finally:
+        STATS["in_flight"] -= 1
+
+    if roll < CONFIG["throttle_rate"] + CONFIG["error_rate"]:
+        return server_error()
+
+    message = {"role": "assistant", "content": "Synthetic response from the fake OpenAI server."}
+    finish_reason = "stop"
+    tools = body.get("tools") or []
+    if tools:
+        function = tools[0]["function"]
+        arguments = json.dumps(sample_value(function.get("parameters", {}), {}))
+        if random.random() < CONFIG["malformed_rate"]:
+            STATS["malformed"] += 1
+            arguments = arguments[:len(arguments) // 2]
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": arguments},
+            }],
+        }
+        finish_reason = "tool_calls"
+
+    if body.get("stream"):
+        return StreamingResponse(stream_chunks(message, request.path_params["deployment"]),
+                                 media_type="text/event-stream")
+
+    completion_tokens = estimate_tokens(message)
+    return JSONResponse({
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.path_params["deployment"],
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    })
+
+
+async def stream_chunks(message, deployment):
+    """Emit a completion as chat.completion.chunk SSE events, about 4 characters per token"""
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    def chunk(delta, finish_reason=None):
+        payload = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    token_delay = 1 / CONFIG["tokens_per_second"] if CONFIG["tokens_per_second"] else 0
+    if message.get("tool_calls"):
+        call = message["tool_calls"][0]
+        yield chunk({"role": "assistant", "content": None, "tool_calls": [{
+            "index": 0, "id": call["id"], "type": "function",
+            "function": {"name": call["function"]["name"], "arguments": ""},
+        }]})
+        text, finish_reason = call["function"]["arguments"], "tool_calls"
+        make_delta = lambda piece: {"tool_calls": [{"index": 0, "function": {"arguments": piece}}]}
+    else:
+        yield chunk({"role": "assistant", "content": ""})
+        text, finish_reason = message["content"], "stop"
+        make_delta = lambda piece: {"content": piece}
+
+    for start in range(0, len(text), 4):
+        await asyncio.sleep(token_delay)
+        yield chunk(make_delta(text[start:start + 4]))
+    yield chunk({}, finish_reason)
+    yield "data: [DONE]\n\n"
+
+
+async def embeddings(request):
+    """POST /openai/deployments/{deployment}/embeddings"""
+    body = await request.json()
+    STATS["embedding_requests"] += 1
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    # Token-array inputs are embedded by their token ids
+    texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+
+    roll = random.random()
+    failure = injected_failure(roll)
+    if failure is not None:
+        return failure
+    prompt_tokens = sum(max(1, len(text) // 4) for text in texts)
+    await asyncio.sleep(CONFIG["embedding_latency_ms"] / 1000 + prompt_seconds(prompt_tokens))
+    if roll < CONFIG["throttle_rate"] + CONFIG["error_rate"]:
+        return server_error()
+
+    vectors = hashing_embedder(texts, int(CONFIG["embedding_dim"])).astype(np.float32)
+    as_base64 = body.get("encoding_format") == "base64"
+    return JSONResponse({
+        "object": "list",
+        "model": request.path_params["deployment"],
+        "data": [{
+            "object": "embedding",
+            "index": index,
+            "embedding": base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii") if as_base64 else vector.tolist(),
+        } for index, vector in enumerate(vectors)],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    })
+
+
+async def fake_config(request):
+    """GET returns config and counters; POST updates config"""
+    if request.method == "POST":
+        CONFIG.update(await request.json())
+    return JSONResponse({"config": CONFIG, "stats": STATS})
+
+
+app = Starlette(routes=[
+    Route("/openai/deployments/{deployment}/chat/completions", chat_completions, methods=["POST"]),
+    Route("/openai/deployments/{deployment}/embeddings", embeddings, methods=["POST"]),
+    Route("/fake/config", fake_config, methods=["GET", "POST"]),
+])
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=CONFIG["jitter_ms"])
+    parser.add_argument("--throttle-rate", type=float, default=CONFIG["throttle_rate"])
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"])
+    parser.add_argument("--slow-rate", type=float, default=CONFIG["slow_rate"])
+    parser.add_argument("--slow-ms", type=float, default=CONFIG["slow_ms"])
+    parser.add_argument("--rate-limit-rps", type=float, default=CONFIG["rate_limit_rps"])
+    parser.add_argument("--tokens-per-second", type=float, default=CONFIG["tokens_per_second"])
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=CONFIG["prompt_tokens_per_second"])
+    parser.add_argument("--malformed-rate", type=float, default=CONFIG["malformed_rate"])
+    parser.add_argument("--capacity", type=int, default=CONFIG["capacity"])
+    parser.add_argument("--embedding-latency-ms", type=float, default=CONFIG["embedding_latency_ms"])
+    parser.add_argument("--embedding-dim", type=int, default=CONFIG["embedding_dim"])
+    args = parser.parse_args()
+    CONFIG.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, throttle_rate=args.throttle_rate,
+                  error_rate=args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+                  rate_limit_rps=args.rate_limit_rps, tokens_per_second=args.tokens_per_second,
+                  prompt_tokens_per_second=args.prompt_tokens_per_second, malformed_rate=args.malformed_rate,
+                  capacity=args.capacity,
+                  embedding_latency_ms=args.embedding_latency_ms, embedding_dim=args.embedding_dim)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Synthetic RFP document and project generators for benchmarks.
+Writes minimal, valid text PDFs without any PDF-authoring dependency.
+"""
+
+import itertools
+import random
+
+RFP_VOCABULARY = [
+    "contractor", "shall", "provide", "legal", "services", "compliance", "regulatory",
+    "litigation", "agency", "proposal", "deliverables", "liability", "indemnification",
+    "budget", "schedule", "requirements", "evaluation", "criteria", "statement", "work",
+    "counsel", "securities", "employment", "procurement", "amendment", "termination",
+]
+
+SECTION_HEADINGS = [
+    "SECTION {n}. SCOPE OF WORK",
+    "SECTION {n}. EVALUATION CRITERIA",
+    "SECTION {n}. CONTRACT TERMS AND CONDITIONS",
+    "SECTION {n}. BUDGET AND PAYMENT SCHEDULE",
+    "SECTION {n}. LIABILITY AND INSURANCE",
+]
+
+
+def synthetic_lines(page_number, lines_per_page, rng):
+    """Return the text lines for one synthetic RFP page"""
+    lines = [SECTION_HEADINGS[page_number % len(SECTION_HEADINGS)].format(n=page_number + 1)]
+    for _ in range(lines_per_page - 1):
+        lines.append(" ".join(rng.choice(RFP_VOCABULARY) for _ in range(12)))
+    return lines
+
+
+# Scope-specific vocabulary for labeled RFP mixes; "legal" is the firm's practice, the rest are out of scope
+SERVICE_DOMAINS = {
+    "legal": ["counsel", "litigation", "attorney", "legal", "regulatory", "compliance", "securities",
+              "employment", "arbitration", "contract", "review", "advice", "law", "firm", "court"],
+    "paving": ["asphalt", "paving", "resurfacing", "roadway", "pavement", "striping", "curb",
+               "gravel", "milling", "traffic", "control", "aggregate", "base", "course", "lane"],
+    "janitorial": ["janitorial", "custodial", "cleaning", "restroom", "floor", "waxing", "trash",
+                   "disinfecting", "carpet", "window", "supplies", "nightly", "facility", "vacuum", "mop"],
+    "it": ["software", "network", "server", "cloud", "hosting", "helpdesk", "cybersecurity",
+           "database", "application", "integration", "licenses", "hardware", "migration", "backup", "api"],
+    "construction": ["construction", "concrete", "steel", "framing", "foundation", "excavation",
+                     "electrical", "plumbing", "roofing", "drywall", "site", "grading", "masonry", "hvac", "permit"],
+    "catering": ["catering", "meals", "food", "menu", "kitchen", "nutrition", "beverages", "serving",
+                 "cafeteria", "dietary", "delivery", "breakfast", "lunch", "sanitation", "utensils"],
+}
+PROCUREMENT_VOCABULARY = ["contractor", "shall", "provide", "services", "agency", "proposal", "deliverables",
+                          "budget", "schedule", "requirements", "evaluation", "criteria", "statement", "work",
+                          "procurement", "amendment", "termination", "insurance", "payment", "vendor"]
+
+
+def synthetic_rfp_text(domain, rng, lines=40, words_per_line=12, domain_share=0.3):
+    """Synthetic RFP text for one service domain: procurement boilerplate mixed with domain terms"""
+    vocabulary = SERVICE_DOMAINS[domain]
+    text = []
+    for line in range(lines):
+        text.append(" ".join(rng.choice(vocabulary) if rng.random() < domain_share else rng.choice(PROCUREMENT_VOCABULARY)
+                             for _ in range(words_per_line)))
+    return "\n".join(text)
+
+
+def _escape_pdf_text(text):
+    """Escape characters that are special inside a PDF string literal"""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_table(page_number, rng, rows=4):
+    """A small pricing table as column-aligned text lines"""
+    lines = ["Item          Quantity     Unit Price     Total"]
+    for row in range(rows):
+        quantity, price = rng.randint(1, 40), rng.randint(100, 900)
+        lines.append(f"{rng.choice(RFP_VOCABULARY).title()} {page_number}-{row}     {quantity}     {price}.00     {quantity * price}.00")
+    return lines
+
+
+def write_synthetic_pdf(path, pages, lines_per_page=45, seed=0, tables=False):
+    """Write synthetic_pdf_bytes() to path"""
+    with open(path, "wb") as file:
+        file.write(synthetic_pdf_bytes(pages, lines_per_page, seed, tables))
+
+
+def synthetic_pdf_bytes(pages, lines_per_page=45, seed=0, tables=False):
+    """
+    A synthetic multi-page RFP as a text PDF. Each page starts with a section heading set in
+    a larger bold font.
+
+    Args:
+        pages (int): Number of pages
+        lines_per_page (int): Text lines on each page
+        seed (int): Random seed so runs are reproducible
+        tables (bool): Append a small pricing table to every page
+    """
+    rng = random.Random(seed)
+    # Object layout: 1 catalog, 2 pages tree, 3 body font, 4 heading font, then (page, content) pairs
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    page_refs = []
+    for page_number in range(pages):
+        page_id = len(objects) + 1
+        content_id = page_id + 1
+        page_refs.append(f"{page_id} 0 R")
+
+        heading, *body = synthetic_lines(page_number, lines_per_page, rng)
+        if tables:
+            body += synthetic_table(page_number, rng)
+        stream_lines = ["BT", "12 TL", "50 750 Td", "/F2 14 Tf", f"({_escape_pdf_text(heading)}) Tj T*", "/F1 10 Tf"]
+        for line in body:
+            stream_lines.append(f"({_escape_pdf_text(line)}) Tj T*")
+        stream_lines.append("ET")
+        stream = "\n".join(stream_lines).encode("latin-1")
+
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {pages} >>".encode("latin-1")
+
+    chunks = [b"%PDF-1.4\n"]
+    offsets = []
+    position = len(chunks[0])
+    for number, body in enumerate(objects, start=1):
+        chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        offsets.append(position)
+        chunks.append(chunk)
+        position += len(chunk)
+
+    xref = [b"xref\n0 %d\n" % (len(objects) + 1), b"0000000000 65535 f \n"]
+    xref.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    trailer = b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, position)
+
+    return b"".join(chunks + xref + [trailer])
+
+
+def synthetic_txt_bytes(pages, lines_per_page=45, seed=0):
+    """The same synthetic RFP as plain UTF-8 text, pages separated by a blank line"""
+    rng = random.Random(seed)
+    return "\n\n".join("\n".join(synthetic_lines(page_number, lines_per_page, rng))
+                        for page_number in range(pages)).encode("utf-8")
+
+
+PRACTICE_AREAS = ["Corporate Law", "Employment Law", "Securities Law", "Patent Law", "Commercial Litigation",
+                  "Tax Law", "Regulatory Defense", "Class Action", "IP Licensing", "Capital Markets"]
+
+
+def synthetic_projects(size, rng):
+    """Projects with Zipf-ish description vocabulary so some terms are rare and some are everywhere"""
+    vocabulary = RFP_VOCABULARY + [f"term{i}" for i in range(20_000)]
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    projects = []
+    for i in range(size):
+        words = rng.choices(vocabulary, cum_weights=cumulative, k=40)
+        projects.append({
+            "id": i,
+            "title": " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=5)),
+            "description": " ".join(words),
+            "technology_stack": rng.sample(PRACTICE_AREAS, 3),
+            "cost": rng.randint(50_000, 1_000_000),
+            "completion_date": f"20{18 + i % 7}-{1 + i % 12:02d}-15",
+        })
+    return projects
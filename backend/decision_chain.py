@@ -0,0 +1,71 @@
+"""
+Prepared structured-output LLM calls.
+The structured-output runnable (tool schema binding) and the static prompt prefix are built once
+at startup; each request only appends its variable messages. Keeping the static part first and
+byte-identical across requests lets provider-side prompt caching bill it at the cached rate.
+"""
+
+import json
+from llm_utils import count_tokens, parse_structured_response
+from result_cache import content_hash
+
+# Azure OpenAI caches prompt prefixes of at least this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+class PreparedChain:
+    """A structured-output call whose schema binding and static prefix messages are built once"""
+
+    def __init__(self, llm, schema, static_messages):
+        """
+        Args:
+            llm: LangChain chat model
+            schema: Pydantic model describing the output
+            static_messages (list): Messages identical for every request; they always come first
+        """
+        self.llm = llm
+        self.schema = schema
+        self.static_messages = [dict(message) for message in static_messages]
+        self.runnable = llm.with_structured_output(schema, include_raw=True)
+        self._tool_runnable = None
+        self._prefix_tokens = None
+
+        # The tool definition is sent ahead of the messages, so it is part of the cacheable prefix.
+        # langchain_core is imported here so the app can start before any chain is prepared
+        from langchain_core.utils.function_calling import convert_to_openai_tool
+        self._tool = json.dumps(convert_to_openai_tool(schema), sort_keys=True)
+        static = json.dumps(self.static_messages, sort_keys=True)
+        self.fingerprint = content_hash(self._tool, static)
+
+    @property
+    def prefix_tokens(self):
+        """Tokens in the cacheable prefix; counted on first use, since loading the tokenizer may download it"""
+        if self._prefix_tokens is None:
+            self._prefix_tokens = count_tokens(self._tool) + sum(count_tokens(m["content"]) for m in self.static_messages)
+        return self._prefix_tokens
+
+    @property
+    def tool_runnable(self):
+        """The model bound to the schema as a forced tool call, for streaming the arguments"""
+        if self._tool_runnable is None:
+            self._tool_runnable = self.llm.bind_tools([self.schema], tool_choice=self.schema.__name__)
+        return self._tool_runnable
+
+    def messages(self, variable_messages):
+        """Static prefix followed by the per-request messages"""
+        return self.static_messages + list(variable_messages)
+
+    def invoke(self, variable_messages):
+        """Returns (parsed output, usage dict)"""
+        return parse_structured_response(self.runnable.invoke(self.messages(variable_messages)))
+
+    async def ainvoke(self, variable_messages):
+        """Async counterpart of invoke"""
+        return parse_structured_response(await self.runnable.ainvoke(self.messages(variable_messages)))
+
+    def stats(self):
+        return {
+            "schema": self.schema.__name__,
+            "prefix_tokens": self.prefix_tokens,
+            "prefix_cacheable": self.prefix_tokens >= PROMPT_CACHE_MIN_TOKENS,
+        }
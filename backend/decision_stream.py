@@ -0,0 +1,112 @@
+"""
+Incremental parsing of a streamed structured-output decision.
+Consumes the JSON arguments of the decision tool call as they arrive and reports each top-level
+field (and each list item) as soon as it is complete, so the memo can render progressively.
+"""
+
+import json
+
+_decoder = json.JSONDecoder()
+
+# Characters that prove a number literal is finished
+_NUMBER_TERMINATORS = set(",}] \t\r\n")
+
+
+class IncrementalDecisionParser:
+    """Incremental parser for a flat JSON object whose values are scalars or lists of scalars"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.fields = {}
+        self._started = False
+        self._current_key = None
+        self._current_list = None
+
+    def _skip(self, characters):
+        while self.position < len(self.buffer) and self.buffer[self.position] in characters:
+            self.position += 1
+
+    def _decode(self):
+        """Decode one complete JSON value at position, or return (False, None) if more input is needed"""
+        try:
+            value, end = _decoder.raw_decode(self.buffer, self.position)
+        except ValueError:
+            return False, None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if end >= len(self.buffer) or self.buffer[end] not in _NUMBER_TERMINATORS:
+                return False, None
+        self.position = end
+        return True, value
+
+    def feed(self, text):
+        """
+        Add streamed text and return the events it completes.
+
+        Returns:
+            list: ("item", field, value) for each completed list item and ("field", field, value)
+                  for each completed top-level field
+        """
+        self.buffer += text
+        events = []
+        while True:
+            self._skip(" \t\r\n")
+            if self.position >= len(self.buffer):
+                return events
+
+            if not self._started:
+                if self.buffer[self.position] != "{":
+                    raise ValueError("Decision stream is not a JSON object")
+                self._started = True
+                self.position += 1
+                continue
+
+            if self._current_list is not None:
+                self._skip(" \t\r\n,")
+                if self.position >= len(self.buffer):
+                    return events
+                if self.buffer[self.position] == "]":
+                    self.position += 1
+                    self.fields[self._current_key] = self._current_list
+                    events.append(("field", self._current_key, self._current_list))
+                    self._current_key, self._current_list = None, None
+                    continue
+                complete, value = self._decode()
+                if not complete:
+                    return events
+                self._current_list.append(value)
+                events.append(("item", self._current_key, value))
+                continue
+
+            if self._current_key is None:
+                self._skip(" \t\r\n,")
+                if self.position >= len(self.buffer) or self.buffer[self.position] == "}":
+                    return events
+                start = self.position
+                complete, key = self._decode()
+                self._skip(" \t\r\n")
+                if not complete or self.position >= len(self.buffer):
+                    self.position = start
+                    return events
+                if self.buffer[self.position] != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                self.position += 1
+                self._current_key = key
+                continue
+
+            if self.buffer[self.position] == "[":
+                self.position += 1
+                self._current_list = []
+                continue
+
+            complete, value = self._decode()
+            if not complete:
+                return events
+            self.fields[self._current_key] = value
+            events.append(("field", self._current_key, value))
+            self._current_key = None
+
+
+def sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,424 @@
+"""
+Page-indexed, layout-aware document artifacts for extracted PDFs.
+Each PDF is extracted once into blocks (body text, section headings, tables) per page and saved
+as a single memory-mappable file keyed by the file's content hash. Later reads (full text, one
+page, a section, the tables) map the file instead of re-parsing the PDF. Extraction can stop at a
+page or character budget; a later caller that needs more resumes from the last extracted page.
+Artifacts are bounded like the result caches: they expire after the cache TTL, and the least
+recently used ones are dropped once the store exceeds its size cap (on disk, or in memory when
+persistence is off).
+
+Artifact layout: 8-byte magic, 8-byte header length, JSON header, then 8-byte aligned arrays of
+page offsets (uint64, pages + 1), blocks (page, kind, start, end) and the UTF-8 text they index.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import mmap
+from collections import OrderedDict
+import numpy as np
+from long_document import HEADING_PATTERN
+from pdf_extraction import iter_pdf_pages, count_pages
+from result_cache import CACHE_FOLDER, CACHE_PERSIST, CACHE_TTL_SECONDS, CACHE_MAX_DISK_BYTES
+
+# Configuration
+DOCUMENT_CACHE_FOLDER = os.path.join(CACHE_FOLDER, "documents")
+DOCUMENT_CACHE_MAX_BYTES = int(float(os.getenv("DOCUMENT_CACHE_MAX_MB", str(CACHE_MAX_DISK_BYTES / 1024 / 1024)))
+                               * 1024 * 1024)  # on disk, or in memory when persistence is off
+DOCUMENT_MAX_PAGES = int(os.getenv("DOCUMENT_MAX_PAGES", "0"))  # extraction budget for uploads; 0 = whole document
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "0"))
+HEADING_SIZE_RATIO = 1.15  # lines this much larger than the page's body text are headings
+HEADING_MAX_CHARS = 120
+TABLE_MAX_CELL_CHARS = 40  # average cell length above which aligned-looking lines are prose
+
+BLOCK_TEXT, BLOCK_HEADING, BLOCK_TABLE = 0, 1, 2
+BLOCK_KINDS = ("text", "heading", "table")
+BLOCK_DTYPE = np.dtype([("page", "<u4"), ("kind", "<u4"), ("start", "<u8"), ("end", "<u8")])
+
+# Bump when block detection changes so stale artifacts are re-extracted
+ARTIFACT_VERSION = 1
+_MAGIC = b"RFPDOC1\0"
+
+# Table cells are separated by runs of 2+ spaces, tabs or pipes
+CELL_SEPARATOR = re.compile(r"\s{2,}|\t|\s*\|\s*")
+
+
+def _cells(line):
+    return [cell for cell in CELL_SEPARATOR.split(line.strip()) if cell]
+
+
+def _body_font_size(lines):
+    """Character-weighted median font size of a page's lines (0 when sizes are unknown)"""
+    sized = sorted((size, len(text)) for text, size, _ in lines if size)
+    remaining = sum(weight for _, weight in sized) / 2
+    for size, weight in sized:
+        remaining -= weight
+        if remaining <= 0:
+            return size
+    return 0.0
+
+
+def page_blocks(lines):
+    """
+    Group one page's (text, font_size, bold) lines into (kind, text) blocks.
+    Headings are lines set noticeably larger than the page's body text, short bold lines, or lines
+    shaped like numbered/ALL-CAPS section titles; tables are 2+ consecutive lines with the same
+    number (2+) of column-aligned cells.
+    """
+    body_size = _body_font_size(lines)
+
+    def is_heading(text, size, bold):
+        if len(text) > HEADING_MAX_CHARS:
+            return False
+        larger = body_size and size >= body_size * HEADING_SIZE_RATIO
+        return larger or (bold and not text.endswith(".")) or bool(HEADING_PATTERN.match(text))
+
+    def table_row_cells(text):
+        cells = _cells(text)
+        # Justified prose also has double spaces; table cells are short
+        return len(cells) if len(cells) >= 2 and sum(map(len, cells)) / len(cells) <= TABLE_MAX_CELL_CHARS else 0
+
+    blocks, paragraph, i = [], [], 0
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append((BLOCK_TEXT, "\n".join(paragraph)))
+            paragraph.clear()
+
+    while i < len(lines):
+        text, size, bold = lines[i]
+        text = text.strip()
+        if is_heading(text, size, bold):
+            flush_paragraph()
+            blocks.append((BLOCK_HEADING, text))
+            i += 1
+            continue
+        columns = table_row_cells(text)
+        end = i
+        while columns and end + 1 < len(lines) and table_row_cells(lines[end + 1][0].strip()) == columns:
+            end += 1
+        if end > i:
+            flush_paragraph()
+            blocks.append((BLOCK_TABLE, "\n".join(" | ".join(_cells(row)) for row, _, _ in lines[i:end + 1])))
+            i = end + 1
+            continue
+        paragraph.append(text)
+        i += 1
+    flush_paragraph()
+    return blocks
+
+
+class Document:
+    """Read-only view of a document artifact; the arrays and text are views over one buffer"""
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:8]) != _MAGIC:
+            raise ValueError("Not a document artifact")
+        header_length = int.from_bytes(view[8:16], "little")
+        self.header = json.loads(bytes(view[16:16 + header_length]))
+        offset = _align(16 + header_length)
+        pages = self.header["pages_extracted"]
+        self.page_offsets = np.frombuffer(buffer, dtype="<u8", count=pages + 1, offset=offset)
+        offset += self.page_offsets.nbytes
+        self.blocks = np.frombuffer(buffer, dtype=BLOCK_DTYPE, count=self.header["blocks"], offset=offset)
+        offset += self.blocks.nbytes
+        self._text = view[offset:offset + self.header["text_bytes"]]
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    @property
+    def page_count(self):
+        return self.header["page_count"]
+
+    @property
+    def pages_extracted(self):
+        return self.header["pages_extracted"]
+
+    @property
+    def complete(self):
+        return self.pages_extracted >= self.page_count
+
+    @property
+    def chars(self):
+        return self.header["chars"]
+
+    def _slice(self, start, end):
+        return bytes(self._text[int(start):int(end)]).decode("utf-8")
+
+    def text(self, max_pages=None):
+        """Text of the extracted pages, blocks on their own lines and one line break after each page"""
+        pages = self.pages_extracted if max_pages is None else min(max_pages, self.pages_extracted)
+        return self._slice(0, self.page_offsets[pages])
+
+    def page_text(self, index):
+        return self._slice(self.page_offsets[index], self.page_offsets[index + 1])
+
+    def page_blocks(self, index):
+        """(kind, text) blocks of one page"""
+        rows = self.blocks[self.blocks["page"] == index]
+        return [(BLOCK_KINDS[row["kind"]], self._slice(row["start"], row["end"])) for row in rows]
+
+    def headings(self):
+        """(page, heading) for every section heading, in document order"""
+        rows = self.blocks[self.blocks["kind"] == BLOCK_HEADING]
+        return [(int(row["page"]), self._slice(row["start"], row["end"])) for row in rows]
+
+    def section(self, heading):
+        """Text from the first heading matching (case-insensitive prefix) up to the next heading, or None"""
+        wanted = heading.strip().lower()
+        starts = np.flatnonzero(self.blocks["kind"] == BLOCK_HEADING)
+        for position, row in enumerate(starts):
+            if self._slice(self.blocks[row]["start"], self.blocks[row]["end"]).lower().startswith(wanted):
+                end = self.blocks[starts[position + 1]]["start"] if position + 1 < len(starts) else self.page_offsets[-1]
+                return self._slice(self.blocks[row]["start"], end)
+        return None
+
+    def tables(self):
+        """(page, rows) for every table, rows being lists of cell strings"""
+        rows = self.blocks[self.blocks["kind"] == BLOCK_TABLE]
+        return [(int(row["page"]), [line.split(" | ") for line in self._slice(row["start"], row["end"]).split("\n")])
+                for row in rows]
+
+    def summary(self):
+        kinds = np.bincount(self.blocks["kind"], minlength=len(BLOCK_KINDS)) if len(self.blocks) else [0] * 3
+        return {
+            "pages": self.page_count,
+            "pages_extracted": self.pages_extracted,
+            "headings": int(kinds[BLOCK_HEADING]),
+            "tables": int(kinds[BLOCK_TABLE]),
+            "chars": self.chars,
+        }
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def build_artifact(key, page_count, pages):
+    """Serialize pages (a list of per-page block lists) into artifact bytes"""
+    text, offsets, blocks, position, chars = [], [0], [], 0, 0
+    for page_index, page in enumerate(pages):
+        for kind, block_text in page:
+            encoded = (block_text + "\n").encode("utf-8")
+            blocks.append((page_index, kind, position, position + len(encoded) - 1))
+            text.append(encoded)
+            position += len(encoded)
+            chars += len(block_text) + 1
+        # One extra line break per page, like join_pages
+        text.append(b"\n")
+        position += 1
+        chars += 1
+        offsets.append(position)
+
+    header = json.dumps({
+        "version": ARTIFACT_VERSION, "key": key, "page_count": page_count, "pages_extracted": len(pages),
+        "blocks": len(blocks), "text_bytes": position, "chars": chars,
+    }).encode("utf-8")
+    prefix = _MAGIC + len(header).to_bytes(8, "little") + header
+    parts = [prefix, b"\0" * (_align(len(prefix)) - len(prefix)),
+             np.asarray(offsets, dtype="<u8").tobytes(),
+             np.array(blocks, dtype=BLOCK_DTYPE).tobytes()] + text
+    return b"".join(parts)
+
+
+class DocumentStore:
+    """Content-addressed document artifacts on disk (or in memory when persistence is off), capped at max_bytes"""
+
+    def __init__(self, folder=DOCUMENT_CACHE_FOLDER, persist=CACHE_PERSIST, ttl_seconds=CACHE_TTL_SECONDS,
+                 max_bytes=DOCUMENT_CACHE_MAX_BYTES):
+        self.folder = folder if persist else None
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()  # key -> (created_at, artifact bytes) when not persisting, least recently used first
+        self._disk = None  # key -> (created_at, bytes) of artifacts on disk, least recently used first; scanned on first use
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extractions = 0
+        self.resumed = 0
+        self.pages_extracted = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.doc")
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _disk_index(self):
+        """Artifacts on disk, scanned once (oldest write first) with expired files deleted (lock held)"""
+        if self._disk is None:
+            found = []
+            for root, _, names in os.walk(self.folder):
+                for name in names:
+                    if not name.endswith(".doc"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                        if self._expired(stat.st_mtime):
+                            os.remove(path)
+                            continue
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, name[:-len(".doc")], stat.st_size))
+            found.sort()
+            self._disk = OrderedDict((key, (created_at, size)) for created_at, key, size in found)
+            self._bytes = sum(size for _, _, size in found)
+        return self._disk
+
+    def _entries(self):
+        """Index of the stored artifacts, in memory or on disk (lock held)"""
+        return self._memory if self.folder is None else self._disk_index()
+
+    def _forget(self, key):
+        """Drop an artifact from the index and delete its file (lock held)"""
+        entry = self._entries().pop(key)
+        if self.folder is None:
+            self._bytes -= len(entry[1])
+            return
+        self._bytes -= entry[1]
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _trim(self):
+        """Drop expired artifacts at the cold end, then least recently used ones beyond the size cap (lock held)"""
+        entries = self._entries()
+        while entries:
+            key, (created_at, _) = next(iter(entries.items()))
+            if not self._expired(created_at) and (self.max_bytes is None or self._bytes <= self.max_bytes):
+                break
+            self._forget(key)
+            self.evictions += 1
+
+    def load(self, key):
+        """The artifact for key, or None"""
+        if self.folder is None:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is None:
+                    return None
+                if self._expired(entry[0]):
+                    self._forget(key)
+                    return None
+                self._memory.move_to_end(key)
+            return Document(entry[1])
+        path = self._path(key)
+        try:
+            # Another worker may have written the file since the index was scanned
+            if self._expired(os.stat(path).st_mtime):
+                with self._lock:
+                    if key in self._disk_index():
+                        self._forget(key)
+                    else:
+                        os.remove(path)
+                return None
+            document = Document.open(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable document artifact {path}: {e}")
+            return None
+        with self._lock:
+            if key in self._disk_index():
+                self._disk.move_to_end(key)
+        return document if document.header.get("version") == ARTIFACT_VERSION else None
+
+    def _save(self, key, data):
+        created_at = time.time()
+        if self.folder is None:
+            with self._lock:
+                if key in self._memory:
+                    self._bytes -= len(self._memory.pop(key)[1])
+                self._memory[key] = (created_at, data)
+                self._bytes += len(data)
+                self._trim()
+            return Document(data)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: could not persist document artifact: {e}")
+            return Document(data)
+        # Map before trimming: an open mapping stays valid even if the cap deletes the file
+        document = Document.open(path)
+        with self._lock:
+            disk = self._disk_index()
+            if key in disk:
+                self._bytes -= disk.pop(key)[1]
+            disk[key] = (created_at, len(data))
+            self._bytes += len(data)
+            self._trim()
+        return document
+
+    def get_or_extract(self, key, source, max_pages=None, max_chars=None):
+        """
+        Return the document for a PDF, extracting only what the budget and the existing artifact require.
+
+        Args:
+            key (str): Content hash of the PDF
+            source (str | bytes | memoryview): Path to the PDF, or its contents
+            max_pages (int): Stop after this many pages (None = no page budget)
+            max_chars (int): Stop once this many characters are extracted (None = no character budget)
+
+        Returns:
+            Document: Covers at least the budget, or the whole document
+        """
+        document = self.load(key)
+        if document is not None and _satisfies(document, max_pages, max_chars):
+            self.hits += 1
+            return document
+
+        pages = [document.page_blocks(index) for index in range(document.pages_extracted)] if document else []
+        chars = document.chars if document else 0
+        page_count = document.page_count if document else count_pages(source)
+        if document is not None:
+            self.resumed += 1
+        kinds = {name: kind for kind, name in enumerate(BLOCK_KINDS)}
+        pages = [[(kinds[name], text) for name, text in page] for page in pages]
+
+        for _, lines in iter_pdf_pages(source, ordered=True, start_page=len(pages), layout=True):
+            blocks = page_blocks(lines)
+            pages.append(blocks)
+            chars += sum(len(text) + 1 for _, text in blocks) + 1
+            if (max_pages and len(pages) >= max_pages) or (max_chars and chars >= max_chars):
+                break  # the generator cancels the page ranges it has not started
+
+        self.extractions += 1
+        self.pages_extracted += len(pages) - (document.pages_extracted if document else 0)
+        return self._save(key, build_artifact(key, page_count, pages))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "artifact_hits": self.hits,
+                "extractions": self.extractions,
+                "resumed": self.resumed,
+                "pages_extracted": self.pages_extracted,
+                "artifacts": len(self._memory) if self.folder is None else len(self._disk or ()),
+                "bytes": self._bytes if self.folder is None or self._disk is not None else None,
+                "evictions": self.evictions,
+            }
+
+
+def _satisfies(document, max_pages, max_chars):
+    if document.complete:
+        return True
+    if not max_pages and not max_chars:
+        return False
+    return bool((max_pages and document.pages_extracted >= max_pages) or (max_chars and document.chars >= max_chars))
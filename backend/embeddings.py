@@ -0,0 +1,256 @@
+"""
+Batched, cached embedding generation.
+Texts are deduplicated, looked up in a persistent content-hash-keyed cache of float32 vectors,
+and only the misses are sent to the embedding backend, packed into as few requests as the model
+limits allow. Backends are pluggable: Azure OpenAI for production, a deterministic local
+hashing embedder for offline tests and benchmarks.
+"""
+
+import hashlib
+import os
+import threading
+import numpy as np
+from llm_utils import count_tokens
+from result_cache import CACHE_FOLDER, CACHE_PERSIST
+from vector_index import hashing_embedder, EMBEDDING_DIM
+
+# Configuration
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")  # "hashing" or "azure"
+EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
+EMBEDDING_AZURE_DIM = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIM", "0")) or None  # 0 = learn it from the first response
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))  # inputs per request
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "250000"))  # tokens per request
+EMBEDDING_CACHE_FOLDER = os.path.join(CACHE_FOLDER, "embeddings")
+DIMENSION_PROBE_TEXT = "dimension probe"
+
+_MAGIC = b"RFPEMB1\0"
+_KEY_BYTES = 32
+
+
+class HashingEmbeddingBackend:
+    """Deterministic offline embedder (feature hashing), no network"""
+
+    max_input_tokens = None  # no request limits, so texts are never tokenized for batching
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        return hashing_embedder(texts, self.dim)
+
+
+class AzureOpenAIEmbeddingBackend:
+    """
+    Azure OpenAI embeddings deployment; one request per call to embed().
+    The dimension depends on the deployed model; when not given it is taken from the first response.
+    """
+
+    max_input_tokens = 8191
+
+    def __init__(self, client, model=EMBEDDING_DEPLOYMENT, dim=None):
+        self.client = client
+        self.model = model
+        self.dim = dim
+        self.name = f"azure-{model}"
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(input=list(texts), model=self.model)
+        dim = len(response.data[0].embedding) if response.data else self.dim
+        if self.dim is None:
+            self.dim = dim
+        elif dim != self.dim:
+            raise ValueError(f"Embedding deployment {self.model} returned {dim}-dimensional vectors, expected {self.dim}")
+        # Results carry their input index; do not rely on response order
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for item in response.data:
+            vectors[item.index] = item.embedding
+        return vectors
+
+
+def azure_backend_from_env():
+    """Azure OpenAI embedding backend configured from the standard AZURE_OPENAI_* variables"""
+    from openai import AzureOpenAI
+    client = AzureOpenAI(
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version="2023-05-15"
+    )
+    return AzureOpenAIEmbeddingBackend(client, dim=EMBEDDING_AZURE_DIM)
+
+
+def default_backend():
+    """Backend selected by EMBEDDING_BACKEND"""
+    return azure_backend_from_env() if EMBEDDING_BACKEND == "azure" else HashingEmbeddingBackend()
+
+
+def embedding_key(backend_name, text):
+    """Cache key for one text under one backend/model"""
+    return hashlib.sha256(f"{backend_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only store of float32 vectors keyed by 32-byte content hashes.
+    One file per backend: an 8-byte magic, the dimension, then fixed-size (key, vector) records.
+    A cache opened without a dimension takes it from the file, or from the first vectors added.
+    """
+
+    def __init__(self, backend_name, dim=None, folder=EMBEDDING_CACHE_FOLDER, persist=CACHE_PERSIST):
+        self.dim = dim
+        self.path = os.path.join(folder, f"{backend_name}.bin") if persist else None
+        self._rows = {}  # key -> row in self._vectors
+        self._vectors = np.zeros((0, dim or 0), dtype=np.float32)
+        self._size = 0
+        self._lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    def _record_dtype(self):
+        return np.dtype([("key", f"S{_KEY_BYTES}"), ("vector", np.float32, (self.dim,))])
+
+    def _load(self):
+        with open(self.path, "rb") as file:
+            header = file.read(len(_MAGIC) + 8)
+            dim = int.from_bytes(header[len(_MAGIC):], "little")
+            if header[:len(_MAGIC)] != _MAGIC or (self.dim is not None and dim != self.dim):
+                print(f"Warning: ignoring embedding cache {self.path} with a different format or dimension")
+                self.path = None
+                return
+            self.dim = dim
+            data = file.read()
+        dtype = self._record_dtype()
+        # A torn trailing record (crash mid-append) is dropped
+        records = np.frombuffer(data[:len(data) - len(data) % dtype.itemsize], dtype=dtype)
+        self._vectors = np.array(records["vector"], dtype=np.float32)
+        self._size = len(records)
+        self._rows = {key: row for row, key in enumerate(records["key"].tolist())}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present in the cache"""
+        with self._lock:
+            return {key: self._vectors[self._rows[key]] for key in keys if key in self._rows}
+
+    def set_many(self, keys, vectors):
+        """Add vectors (rows aligned with keys) to memory and append them to disk"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            needed = self._size + len(keys)
+            if needed > len(self._vectors):
+                grown = np.zeros((max(needed, len(self._vectors) * 3 // 2, 1024), self.dim), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            self._vectors[self._size:needed] = vectors
+            for offset, key in enumerate(keys):
+                self._rows[key] = self._size + offset
+            self._size = needed
+
+            if self.path:
+                records = np.zeros(len(keys), dtype=self._record_dtype())
+                records["key"] = keys
+                records["vector"] = vectors
+                try:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    new_file = not os.path.exists(self.path)
+                    # O_APPEND with a single write per batch keeps records whole across processes
+                    with open(self.path, "ab") as file:
+                        if new_file:
+                            file.write(_MAGIC + self.dim.to_bytes(8, "little"))
+                        file.write(records.tobytes())
+                except OSError as e:
+                    print(f"Warning: could not persist embeddings: {e}")
+
+
+class EmbeddingService:
+    """Deduplicating, cached, batched front end to an embedding backend"""
+
+    def __init__(self, backend=None, cache=None, batch_size=EMBEDDING_BATCH_SIZE, batch_tokens=EMBEDDING_BATCH_TOKENS):
+        self.backend = backend or default_backend()
+        self.cache = cache if cache is not None else EmbeddingCache(self.backend.name, self.backend.dim)
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.requests = 0
+        self.texts_embedded = 0
+        self.cache_hits = 0
+
+    @property
+    def dim(self):
+        """Vector dimension: declared by the backend, else read from the cache file or learned from one request"""
+        if self.backend.dim is None:
+            # Pinning the cached dimension makes the backend reject a redeployed model of another size
+            self.backend.dim = self.cache.dim
+        if self.backend.dim is None:
+            self.embed([DIMENSION_PROBE_TEXT], remember=False)
+        return self.backend.dim
+
+    def _batches(self, items):
+        """Pack (key, text) pairs into requests bounded by input count and total tokens"""
+        batch, batch_tokens = [], 0
+        limit = self.backend.max_input_tokens
+        for key, text in items:
+            # Backends without token limits (the local hashing embedder) are batched by count alone
+            tokens = count_tokens(text) if limit else 0
+            if limit and tokens > limit:
+                # The model rejects oversized inputs; embed the leading part (roughly 3 chars per token)
+                text = text[:limit * 3]
+                tokens = limit
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.batch_tokens):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append((key, text))
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def embed(self, texts, remember=True):
+        """
+        Embed texts, calling the backend only for texts not seen before.
+
+        Args:
+            texts (list): Strings to embed; duplicates are embedded once
+            remember (bool): Add new vectors to the cache; off for texts that are unlikely to recur
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim), rows aligned with texts
+        """
+        keys = [embedding_key(self.backend.name, text) for text in texts]
+        unique = dict(zip(keys, texts))
+        found = self.cache.get_many(unique)
+        self.cache_hits += len(found)
+
+        missing = [(key, text) for key, text in unique.items() if key not in found]
+        for batch in self._batches(missing):
+            batch_keys = [key for key, _ in batch]
+            vectors = np.asarray(self.backend.embed([text for _, text in batch]), dtype=np.float32)
+            self.requests += 1
+            self.texts_embedded += len(batch)
+            if remember:
+                self.cache.set_many(batch_keys, vectors)
+            found.update(zip(batch_keys, vectors))
+
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def embed_queries(self, texts):
+        """Embed search queries (RFP texts): cached vectors are reused, new ones are not kept, so the cache holds projects only"""
+        return self.embed(texts, remember=False)
+
+    def embed_one(self, text):
+        """Embedding of a single text as a float32 vector"""
+        return self.embed([text])[0]
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "cached_vectors": len(self.cache),
+            "requests": self.requests,
+            "texts_embedded": self.texts_embedded,
+            "cache_hits": self.cache_hits,
+        }
@@ -0,0 +1,156 @@
+"""
+Background job pipeline for RFP processing.
+Runs staged work (extraction, similar-project lookup, decision generation) on a bounded
+worker pool and records per-stage progress events for polling and server-sent events.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# Configuration
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "32"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+SSE_KEEPALIVE_SECONDS = 15
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at JOB_QUEUE_LIMIT"""
+
+
+class Job:
+    """A single staged job and its progress events"""
+
+    def __init__(self, stage_names, metadata=None):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.metadata = metadata or {}
+        self.stages = {name: "pending" for name in stage_names}
+        self.result = None
+        self.error = None
+        self.events = []
+        self._condition = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ("completed", "failed")
+
+    def _emit(self, event, **data):
+        """Append a progress event and wake any SSE listeners"""
+        with self._condition:
+            self.events.append({"event": event, "job_id": self.id, "timestamp": time.time(), **data})
+            self._condition.notify_all()
+
+    def wait_for_events(self, cursor, timeout):
+        """Block until there are events past cursor (or the job is done) and return them"""
+        with self._condition:
+            if len(self.events) <= cursor and not self.done:
+                self._condition.wait(timeout)
+            return self.events[cursor:]
+
+    def to_dict(self):
+        """Polling representation of the job"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": dict(self.stages),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "metadata": self.metadata,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Bounded worker pool plus an in-memory registry of recent jobs"""
+
+    def __init__(self, max_workers=JOB_WORKERS, queue_limit=JOB_QUEUE_LIMIT,
+                 retention_seconds=JOB_RETENTION_SECONDS):
+        self.queue_limit = queue_limit
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rfp-job")
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, stages, context, metadata=None):
+        """
+        Queue a staged job.
+
+        Args:
+            stages (list): (name, callable) pairs; each callable receives the shared context dict
+            context (dict): Inputs for the first stage; the job result is context["result"]
+            metadata (dict): Extra fields echoed back when polling
+
+        Returns:
+            Job: The queued job
+        """
+        with self._lock:
+            self._prune()
+            if self._active >= self.queue_limit:
+                raise QueueFullError(f"Job queue is full ({self.queue_limit} jobs in flight)")
+            job = Job([name for name, _ in stages], metadata)
+            self._jobs[job.id] = job
+            self._active += 1
+
+        job._emit("queued")
+        self._executor.submit(self._run, job, stages, context)
+        return job
+
+    def get(self, job_id):
+        """Return the job with job_id, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """In-flight and retained job counts"""
+        with self._lock:
+            return {"active": self._active, "retained": len(self._jobs), "queue_limit": self.queue_limit}
+
+    def _run(self, job, stages, context):
+        """Execute stages in order, recording progress events"""
+        job.status = "running"
+        result, error, completed = None, None, False
+        try:
+            for name, stage in stages:
+                job.stages[name] = "running"
+                job._emit("stage", stage=name, status="running")
+                started = time.perf_counter()
+                stage(context)
+                job.stages[name] = "completed"
+                job._emit("stage", stage=name, status="completed",
+                          duration_ms=round((time.perf_counter() - started) * 1000, 1))
+            result = context.get("result")
+            completed = True
+        except Exception as e:
+            metrics.log_event("job_failed", level="error", job_id=job.id, error=str(e), error_type=type(e).__name__)
+            for name, state in job.stages.items():
+                if state == "running":
+                    job.stages[name] = "failed"
+            error = str(e)
+        finally:
+            # The terminal status and finished_at change together, so a finished job always has both
+            with self._lock:
+                job.result, job.error = result, error
+                job.finished_at = time.time()
+                job.status = "completed" if completed else "failed"
+                self._active -= 1
+            job._emit("done", status=job.status)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window (lock held)"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
@@ -0,0 +1,349 @@
+"""
+In-process lexical retrieval and hybrid fusion for similar-project matching.
+BM25Index is a compact inverted index (CSR postings in NumPy arrays) over project titles,
+descriptions and technology_stack terms, with incremental add/remove and snapshot save/load.
+HybridRetriever fuses BM25 and vector-index rankings with reciprocal-rank fusion (RRF),
+the in-process counterpart of an Azure AI Search hybrid query.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+import numpy as np
+from vector_index import normalize
+
+# Configuration
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Long queries (whole RFPs) keep only their most selective terms
+QUERY_MAX_TERMS = int(os.getenv("LEXICAL_QUERY_MAX_TERMS", "64"))
+# Terms in more than this fraction of projects barely move BM25 scores but have the longest postings
+QUERY_MAX_DF_RATIO = 0.5
+RRF_K = 60
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "100"))
+
+# Title and technology_stack terms count this many times a description term
+FIELD_WEIGHTS = {"title": 2, "description": 1, "technology_stack": 2}
+
+# Compact the postings once this fraction of rows are removed
+COMPACT_THRESHOLD = 0.25
+
+# Merge pending postings into the CSR arrays once this many have accumulated
+PENDING_FREEZE_POSTINGS = 50_000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was were will with "
+    "shall all any its our their your".split()
+)
+
+
+def tokenize(text):
+    """Lowercase alphanumeric terms without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def project_terms(project):
+    """Weighted term frequencies for one project record"""
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = project.get(field) or ""
+        if isinstance(value, list):
+            value = " ".join(value)
+        for token in tokenize(value):
+            counts[token] += weight
+    return counts
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring; rows are tombstoned on removal and dropped by compact()"""
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self._rows = {}  # project id -> row
+        self._vocab = {}  # term -> term id
+        self._doc_freq = np.zeros(0, dtype=np.int32)  # live documents per term id
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._total_length = 0.0
+        # Frozen postings: term id t owns _post_rows/_post_tfs[_offsets[t]:_offsets[t + 1]]
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._post_rows = np.zeros(0, dtype=np.int32)
+        self._post_tfs = np.zeros(0, dtype=np.float32)
+        # Postings added since the last freeze, sorted by term id
+        self._pending_terms = np.zeros(0, dtype=np.int64)
+        self._pending_rows = np.zeros(0, dtype=np.int32)
+        self._pending_tfs = np.zeros(0, dtype=np.float32)
+        self._norm = None  # cached per-row BM25 length normalization
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._lengths):
+            capacity = max(needed, len(self._lengths) * 3 // 2, 1024)
+            for name in ("_lengths", "_alive"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:self._size] = old[:self._size]
+                setattr(self, name, grown)
+
+    def _term_id(self, term):
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._vocab[term] = len(self._vocab)
+            if term_id >= len(self._doc_freq):
+                grown = np.zeros(max(1024, len(self._doc_freq) * 2), dtype=np.int32)
+                grown[:len(self._doc_freq)] = self._doc_freq
+                self._doc_freq = grown
+        return term_id
+
+    def add(self, projects):
+        """Add or replace projects (dicts with at least an "id")"""
+        replaced = [project["id"] for project in projects if project["id"] in self._rows]
+        if replaced:
+            self.remove(replaced)
+        if not projects:
+            return
+        self._reserve(len(projects))
+        terms, rows, tfs, lengths = [], [], [], []
+        for row, project in enumerate(projects, start=self._size):
+            counts = project_terms(project)
+            terms.extend(map(self._term_id, counts))
+            tfs.extend(counts.values())
+            rows.extend([row] * len(counts))
+            lengths.append(sum(counts.values()))
+            self.ids.append(project["id"])
+            self._rows[project["id"]] = row
+
+        terms = np.array(terms, dtype=np.int64)
+        self._doc_freq[:len(self._vocab)] += np.bincount(terms, minlength=len(self._vocab)).astype(np.int32)
+        self._lengths[self._size:self._size + len(projects)] = lengths
+        self._alive[self._size:self._size + len(projects)] = True
+        self._total_length += sum(lengths)
+        self._size += len(projects)
+        self._norm = None
+
+        terms = np.concatenate([self._pending_terms, terms])
+        order = np.argsort(terms, kind="stable")
+        self._pending_terms = terms[order]
+        self._pending_rows = np.concatenate([self._pending_rows, np.array(rows, dtype=np.int32)])[order]
+        self._pending_tfs = np.concatenate([self._pending_tfs, np.array(tfs, dtype=np.float32)])[order]
+        if len(self._pending_terms) >= PENDING_FREEZE_POSTINGS:
+            self.freeze()
+
+    def remove(self, project_ids):
+        """Remove projects by id; unknown ids are ignored"""
+        rows = [self._rows.pop(project_id) for project_id in project_ids if project_id in self._rows]
+        if not rows:
+            return
+        self._alive[rows] = False
+        self._total_length -= float(self._lengths[rows].sum())
+        self._norm = None
+        # One scan over the postings finds every term the removed rows contained
+        self.freeze()
+        hits = np.flatnonzero(np.isin(self._post_rows, rows))
+        terms = np.searchsorted(self._offsets, hits, side="right") - 1
+        self._doc_freq[:len(self._vocab)] -= np.bincount(terms, minlength=len(self._vocab)).astype(np.int32)
+        if (self._size - len(self._rows)) / self._size > COMPACT_THRESHOLD:
+            self.compact()
+
+    def freeze(self):
+        """Merge pending postings into the CSR arrays"""
+        if not len(self._pending_terms):
+            return
+        term_count = len(self._vocab)
+        old_counts = np.zeros(term_count, dtype=np.int64)
+        old_counts[:len(self._offsets) - 1] = np.diff(self._offsets)
+        pending_counts = np.bincount(self._pending_terms, minlength=term_count)
+        offsets = np.zeros(term_count + 1, dtype=np.int64)
+        np.cumsum(old_counts + pending_counts, out=offsets[1:])
+
+        post_rows = np.empty(offsets[-1], dtype=np.int32)
+        post_tfs = np.empty(offsets[-1], dtype=np.float32)
+        # Existing postings keep their relative order and shift by the pending ones before them
+        old_terms = np.repeat(np.arange(len(self._offsets) - 1), old_counts[:len(self._offsets) - 1])
+        shift = offsets[:-1][old_terms] - self._offsets[:-1][old_terms]
+        destination = np.arange(len(self._post_rows)) + shift
+        post_rows[destination] = self._post_rows
+        post_tfs[destination] = self._post_tfs
+        # Pending postings go after the existing ones of the same term
+        group_start = np.cumsum(pending_counts) - pending_counts
+        position = np.arange(len(self._pending_terms)) - group_start[self._pending_terms]
+        destination = offsets[:-1][self._pending_terms] + old_counts[self._pending_terms] + position
+        post_rows[destination] = self._pending_rows
+        post_tfs[destination] = self._pending_tfs
+
+        self._offsets, self._post_rows, self._post_tfs = offsets, post_rows, post_tfs
+        self._pending_terms = self._pending_terms[:0]
+        self._pending_rows = self._pending_rows[:0]
+        self._pending_tfs = self._pending_tfs[:0]
+
+    def compact(self):
+        """Drop removed rows from the postings and renumber the remaining ones"""
+        self.freeze()
+        keep = self._alive[:self._size]
+        new_row = np.cumsum(keep) - 1
+        live = keep[self._post_rows]
+        terms = np.repeat(np.arange(len(self._offsets) - 1), np.diff(self._offsets))[live]
+        self._post_rows = new_row[self._post_rows[live]].astype(np.int32)
+        self._post_tfs = self._post_tfs[live]
+        counts = np.bincount(terms, minlength=len(self._vocab))
+        self._offsets = np.zeros(len(self._vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._offsets[1:])
+        self._lengths = self._lengths[:self._size][keep].copy()
+        self.ids = [project_id for project_id, alive in zip(self.ids, keep) if alive]
+        self._size = len(self.ids)
+        self._alive = np.ones(self._size, dtype=bool)
+        self._rows = {project_id: row for row, project_id in enumerate(self.ids)}
+        self._norm = None
+
+    def _postings(self, term_id):
+        rows = self._post_rows[self._offsets[term_id]:self._offsets[term_id + 1]] \
+            if term_id < len(self._offsets) - 1 else self._post_rows[:0]
+        tfs = self._post_tfs[self._offsets[term_id]:self._offsets[term_id + 1]] \
+            if term_id < len(self._offsets) - 1 else self._post_tfs[:0]
+        start, stop = np.searchsorted(self._pending_terms, [term_id, term_id + 1])
+        if stop > start:
+            rows = np.concatenate([rows, self._pending_rows[start:stop]])
+            tfs = np.concatenate([tfs, self._pending_tfs[start:stop]])
+        return rows, tfs
+
+    def search(self, text, k=10):
+        """
+        BM25 top-k for one query text.
+
+        Returns:
+            list: (project_id, score) pairs, best first
+        """
+        live = len(self._rows)
+        if not live:
+            return []
+        query = Counter(term_id for term_id in map(self._vocab.get, tokenize(text)) if term_id is not None)
+        doc_freq = np.array([self._doc_freq[term_id] for term_id in query], dtype=np.float64)
+        idf = np.log1p((live - doc_freq + 0.5) / (doc_freq + 0.5))
+        weights = idf * np.array(list(query.values()), dtype=np.float64)
+        selected = np.flatnonzero(doc_freq <= QUERY_MAX_DF_RATIO * live)
+        if not len(selected):
+            selected = np.arange(len(query))
+        if len(selected) > QUERY_MAX_TERMS:
+            # Rare terms carry the signal and have short postings; skip the long common ones
+            selected = selected[np.argpartition(-weights[selected], QUERY_MAX_TERMS - 1)[:QUERY_MAX_TERMS]]
+
+        term_ids = list(query)
+        scores = np.zeros(self._size, dtype=np.float32)
+        if self._norm is None:
+            self._norm = self.k1 * (1 - self.b + self.b * self._lengths[:self._size] / (self._total_length / live))
+        norm = self._norm
+        for position in selected:
+            rows, tfs = self._postings(term_ids[position])
+            if len(rows):
+                # A term's postings hold each row once, so fancy-index += is exact
+                scores[rows] += weights[position] * tfs * (self.k1 + 1) / (tfs + norm[rows])
+        scores[~self._alive[:self._size]] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[row], float(scores[row])) for row in candidates]
+
+    def memory_bytes(self):
+        """Approximate footprint of the postings and per-row arrays (excluding Python dicts)"""
+        arrays = (self._offsets, self._post_rows, self._post_tfs, self._lengths, self._alive, self._doc_freq)
+        return sum(array.nbytes for array in arrays)
+
+    def save(self, path):
+        """Write postings as lexical.npz and vocabulary/ids as lexical.json under directory path"""
+        if len(self._rows) < self._size:
+            self.compact()
+        self.freeze()
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, "lexical.npz"), offsets=self._offsets, rows=self._post_rows,
+                 tfs=self._post_tfs, lengths=self._lengths[:self._size], doc_freq=self._doc_freq[:len(self._vocab)])
+        with open(os.path.join(path, "lexical.json"), "w", encoding="utf-8") as file:
+            json.dump({"k1": self.k1, "b": self.b, "ids": self.ids, "vocab": list(self._vocab)}, file)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()"""
+        with open(os.path.join(path, "lexical.json"), "r", encoding="utf-8") as file:
+            saved = json.load(file)
+        arrays = np.load(os.path.join(path, "lexical.npz"))
+        index = cls(saved["k1"], saved["b"])
+        index.ids = saved["ids"]
+        index._rows = {project_id: row for row, project_id in enumerate(index.ids)}
+        index._vocab = {term: term_id for term_id, term in enumerate(saved["vocab"])}
+        index._offsets, index._post_rows, index._post_tfs = arrays["offsets"], arrays["rows"], arrays["tfs"]
+        index._lengths = arrays["lengths"].copy()
+        index._doc_freq = arrays["doc_freq"].copy()
+        index._size = len(index.ids)
+        index._alive = np.ones(index._size, dtype=bool)
+        index._total_length = float(index._lengths.sum())
+        index._norm = None
+        return index
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, "lexical.json"))
+
+
+class HybridRetriever:
+    """Reciprocal-rank fusion of BM25 and vector-index results over the same projects"""
+
+    def __init__(self, vector_index, lexical_index, rrf_k=RRF_K, candidates=HYBRID_CANDIDATES):
+        self.vector_index = vector_index
+        self.lexical_index = lexical_index
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+
+    def add(self, projects):
+        self.vector_index.add(projects)
+        self.lexical_index.add(projects)
+
+    def remove(self, project_ids):
+        self.vector_index.remove(project_ids)
+        self.lexical_index.remove(project_ids)
+
+    def search(self, texts, k=5, **filters):
+        """
+        Batched hybrid top-k; same contract as VectorIndex.search.
+
+        Returns:
+            list: One list per text of project records with similarity_score (cosine) and match_score (RRF)
+        """
+        queries = normalize(self.vector_index.query_fn(texts))
+        vector_hits = self.vector_index.search_vectors(queries, k=self.candidates, **filters)
+        mask = self.vector_index._filter_mask(**filters) if any(v is not None for v in filters.values()) else None
+        rows = self.vector_index._rows
+
+        results = []
+        for text, query, hits in zip(texts, queries, vector_hits):
+            fused, cosine = {}, {}
+            for rank, (project_id, score) in enumerate(hits):
+                fused[project_id] = 1.0 / (self.rrf_k + rank + 1)
+                cosine[project_id] = score
+            lexical_hits = self.lexical_index.search(text, k=self.candidates)
+            rank = 0
+            for project_id, _ in lexical_hits:
+                row = rows.get(project_id)
+                if row is None or (mask is not None and not mask[row]):
+                    continue
+                fused[project_id] = fused.get(project_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                rank += 1
+            best = sorted(fused, key=fused.get, reverse=True)[:k]
+            for project_id in best:
+                if project_id not in cosine:
+                    cosine[project_id] = float(self.vector_index._vectors[rows[project_id]] @ query)
+            results.append([
+                dict(self.vector_index.records[rows[project_id]],
+                     similarity_score=round(cosine.get(project_id, 0.0), 4),
+                     match_score=round(fused[project_id], 6))
+                for project_id in best
+            ])
+        return results
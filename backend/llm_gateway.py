@@ -0,0 +1,432 @@
+"""
+Resilient front end to one or more Azure OpenAI deployments.
+Each call gets an overall deadline. Deployments are picked by weight among those whose circuit
+breaker is closed and that are not cooling down after a 429. Throttled calls are retried at once
+on another deployment, or after Retry-After when every deployment is throttled. When the first
+attempt runs past its deployment's recent p95 latency a second, hedged request is sent elsewhere
+and whichever answers first wins.
+
+Deployments come from AZURE_OPENAI_DEPLOYMENTS, a JSON list such as
+    [{"name": "eastus", "endpoint": "https://...", "deployment": "gpt-4o", "api_key_env": "EASTUS_KEY", "weight": 3},
+     {"name": "westus", "endpoint": "https://...", "deployment": "gpt-4o", "api_key": "...", "weight": 1}]
+and default to the single AZURE_OPENAI_ENDPOINT / AZURE_OPENAI_DEPLOYMENT_NAME deployment.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from decision_chain import PreparedChain
+from llm_utils import is_throttling_error, retry_after_seconds
+import metrics
+
+# Configuration
+LLM_DEPLOYMENTS = os.getenv("AZURE_OPENAI_DEPLOYMENTS")
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "30"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "true").lower() in ("1", "true", "yes")
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1.0"))  # never hedge sooner than this
+LLM_HEDGE_MIN_SAMPLES = 20  # latencies needed before the p95 is trusted
+LLM_LATENCY_WINDOW = 200
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+LLM_THROTTLE_DEFAULT_SECONDS = 1.0  # cool-down after a 429 without Retry-After
+LLM_GATEWAY_WORKERS = int(os.getenv("LLM_GATEWAY_WORKERS", "64"))
+
+
+class LLMUnavailableError(Exception):
+    """No deployment could answer before the deadline"""
+
+    def __init__(self, message, throttled=False):
+        super().__init__(message)
+        self.throttled = throttled
+        # Never 429, even when every deployment was throttled: the gateway already retried until its
+        # deadline, so callers must not back off and run the whole deadline again
+        self.status_code = 503
+
+
+class DeadlineExceededError(LLMUnavailableError, TimeoutError):
+    """The per-request deadline passed with no answer"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.status_code = 504
+
+
+def error_status(error):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_retryable(error):
+    """Throttling, timeouts, connection failures and 5xx are retried; bad requests and parse errors are not"""
+    if is_throttling_error(error):
+        return True
+    status = error_status(error)
+    if status is not None:
+        return status >= 500 or status in (408, 409)
+    name = type(error).__name__
+    return "Timeout" in name or "Connect" in name or isinstance(error, (TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; after the cool-down one probe request decides whether it closes"""
+
+    def __init__(self, failures=LLM_BREAKER_FAILURES, cooldown_seconds=LLM_BREAKER_COOLDOWN_SECONDS):
+        self.failures = failures
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def available(self, now):
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return now - self.opened_at >= self.cooldown_seconds
+        return not self._probing
+
+    def on_attempt(self, now):
+        if self.state != "closed" and self.available(now):
+            self.state = "half_open"
+            self._probing = True
+
+    def release(self):
+        """The probe ended without telling whether the deployment works (throttled, cancelled, unused)"""
+        self._probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probing = False
+
+    def record_failure(self, now):
+        """Returns True when this failure opened the breaker"""
+        self.consecutive_failures += 1
+        self._probing = False
+        if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= self.failures):
+            self.state = "open"
+            self.opened_at = now
+            return True
+        return False
+
+
+class Deployment:
+    """One chat deployment with its routing weight, breaker, throttle window and recent latencies"""
+
+    def __init__(self, name, llm, weight=1.0):
+        self.name = name
+        self.llm = llm
+        self.weight = weight
+        self.breaker = CircuitBreaker()
+        self.throttled_until = 0.0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LLM_LATENCY_WINDOW)
+
+    def available(self, now):
+        return now >= self.throttled_until and self.breaker.available(now)
+
+    def latency_percentile(self, pct):
+        if len(self.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def stats(self):
+        p50, p95 = self.latency_percentile(50), self.latency_percentile(95)
+        return {
+            "weight": self.weight,
+            "circuit": self.breaker.state,
+            "throttled_for_seconds": round(max(0.0, self.throttled_until - time.monotonic()), 1),
+            "in_flight": self.in_flight,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+def deployment_configs():
+    """Deployment settings from AZURE_OPENAI_DEPLOYMENTS, or the single default deployment"""
+    if not LLM_DEPLOYMENTS:
+        return [{"name": "default"}]
+    configs = json.loads(LLM_DEPLOYMENTS)
+    for i, config in enumerate(configs):
+        config.setdefault("name", config.get("deployment") or f"deployment-{i}")
+        if "api_key_env" in config:
+            config["api_key"] = os.getenv(config.pop("api_key_env"))
+    return configs
+
+
+class LLMGateway:
+    """Routes calls across deployments with deadlines, breakers, 429 priority retry and hedging"""
+
+    def __init__(self, deployments, deadline_seconds=LLM_DEADLINE_SECONDS, max_attempts=LLM_MAX_ATTEMPTS,
+                 hedge=LLM_HEDGE, hedge_min_seconds=LLM_HEDGE_MIN_SECONDS):
+        self.deployments = list(deployments)
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_min_seconds = hedge_min_seconds
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def prepare(self, schema, static_messages):
+        """A PreparedChain-compatible chain whose calls go through this gateway"""
+        return GatewayChain(self, schema, static_messages)
+
+    def select(self, exclude=()):
+        """Pick an available deployment by weight, preferring ones not in exclude; None if none is available"""
+        now = time.monotonic()
+        with self._lock:
+            available = [d for d in self.deployments if d.available(now)]
+            candidates = [d for d in available if d.name not in exclude] or available
+            if not candidates:
+                return None
+            deployment = random.choices(candidates, weights=[d.weight for d in candidates])[0]
+            deployment.breaker.on_attempt(now)
+            deployment.in_flight += 1
+        return deployment
+
+    def _seconds_until_available(self):
+        now = time.monotonic()
+        waits = [max(d.throttled_until, d.breaker.opened_at + d.breaker.cooldown_seconds
+                     if d.breaker.state == "open" else 0.0) - now for d in self.deployments]
+        # Half-open deployments with a probe in flight have no known end; poll them
+        return max(0.05, min(waits))
+
+    def _hedge_delay(self, deployment):
+        if not self.hedge:
+            return None
+        p95 = deployment.latency_percentile(95)
+        return None if p95 is None else max(self.hedge_min_seconds, p95)
+
+    def _record(self, deployment, started, error=None):
+        """Update breaker, throttle window, latency window and metrics after one attempt"""
+        now = time.monotonic()
+        with self._lock:
+            deployment.in_flight -= 1
+            if error is None:
+                deployment.breaker.record_success()
+                deployment.latencies.append(now - started)
+                outcome = "ok"
+            elif is_throttling_error(error):
+                # Busy, not broken: keep the breaker closed but route around it until Retry-After
+                deployment.throttled_until = now + (retry_after_seconds(error) or LLM_THROTTLE_DEFAULT_SECONDS)
+                deployment.breaker.release()
+                outcome = "throttled"
+            elif is_retryable(error):
+                if deployment.breaker.record_failure(now):
+                    metrics.LLM_CIRCUIT_OPENS.inc(deployment=deployment.name)
+                outcome = "error"
+            else:
+                # The deployment answered; the request itself was bad (4xx, unparseable output)
+                deployment.breaker.record_success()
+                outcome = "rejected"
+        metrics.LLM_ATTEMPTS.inc(deployment=deployment.name, outcome=outcome)
+
+    def _attempt(self, call, deployment):
+        started = time.monotonic()
+        try:
+            result = call(deployment)
+        except Exception as e:
+            self._record(deployment, started, e)
+            raise
+        self._record(deployment, started)
+        return result
+
+    async def _aattempt(self, call, deployment):
+        started = time.monotonic()
+        try:
+            result = await call(deployment)
+        except asyncio.CancelledError:
+            self._release(deployment)
+            metrics.LLM_ATTEMPTS.inc(deployment=deployment.name, outcome="cancelled")
+            raise
+        except Exception as e:
+            self._record(deployment, started, e)
+            raise
+        self._record(deployment, started)
+        return result
+
+    def _next_deployment(self, tried, deadline, last_error):
+        """Deployment for the next attempt, waiting out throttling when it ends before the deadline"""
+        deployment = self.select(exclude=tried)
+        if deployment is not None:
+            return deployment, 0.0
+        wait_seconds = self._seconds_until_available()
+        if time.monotonic() + wait_seconds >= deadline:
+            throttled = last_error is not None and is_throttling_error(last_error)
+            raise LLMUnavailableError("No LLM deployment available before the deadline", throttled) from last_error
+        return None, wait_seconds
+
+    def invoke(self, call, deadline_seconds=None):
+        """
+        Run call(deployment) with failover, hedging and an overall deadline.
+
+        Args:
+            call (callable): deployment -> result; raises on failure
+            deadline_seconds (float): Overrides the gateway's default deadline
+
+        Returns:
+            The result of the first successful attempt
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(LLM_GATEWAY_WORKERS, thread_name_prefix="llm-gateway")
+        deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+        pending, tried = {}, set()
+        failures, hedged, last_error, primary_started = 0, False, None, 0.0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.LLM_DEADLINE_EXCEEDED.inc()
+                raise DeadlineExceededError(f"LLM call exceeded its {deadline_seconds or self.deadline_seconds:.0f}s deadline") from last_error
+            if not pending:
+                if failures >= self.max_attempts:
+                    raise last_error
+                deployment, wait_seconds = self._next_deployment(tried, deadline, last_error)
+                if deployment is None:
+                    time.sleep(wait_seconds)
+                    continue
+                # Worker threads inherit the request context so stage timings and usage land on this request
+                context = contextvars.copy_context()
+                pending[self._executor.submit(context.run, self._attempt, call, deployment)] = deployment
+                tried.add(deployment.name)
+                hedged, primary_started = False, time.monotonic()
+
+            timeout = remaining
+            hedge_delay = None if hedged or len(pending) > 1 else self._hedge_delay(next(iter(pending.values())))
+            if hedge_delay is not None:
+                timeout = min(timeout, max(0.0, primary_started + hedge_delay - time.monotonic()))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if hedge_delay is not None and time.monotonic() >= primary_started + hedge_delay:
+                    hedged = True
+                    deployment = self.select(exclude=tried)
+                    # Another deployment if one is available, else a second try on the same one
+                    if deployment is not None:
+                        metrics.LLM_HEDGES.inc(deployment=deployment.name)
+                        context = contextvars.copy_context()
+                        pending[self._executor.submit(context.run, self._attempt, call, deployment)] = deployment
+                        tried.add(deployment.name)
+                continue
+
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()  # a losing hedge keeps running; its result is discarded
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    # 429s are retried until the deadline; only real failures use up attempts
+                    failures += not is_throttling_error(e)
+                    last_error = e
+
+    async def ainvoke(self, call, deadline_seconds=None):
+        """Async counterpart of invoke; call(deployment) returns an awaitable and losers are cancelled"""
+        deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+        pending, tried = {}, set()
+        failures, hedged, last_error, primary_started = 0, False, None, 0.0
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.LLM_DEADLINE_EXCEEDED.inc()
+                    raise DeadlineExceededError(f"LLM call exceeded its {deadline_seconds or self.deadline_seconds:.0f}s deadline") from last_error
+                if not pending:
+                    if failures >= self.max_attempts:
+                        raise last_error
+                    deployment, wait_seconds = self._next_deployment(tried, deadline, last_error)
+                    if deployment is None:
+                        await asyncio.sleep(wait_seconds)
+                        continue
+                    pending[asyncio.ensure_future(self._aattempt(call, deployment))] = deployment
+                    tried.add(deployment.name)
+                    hedged, primary_started = False, time.monotonic()
+
+                timeout = remaining
+                hedge_delay = None if hedged or len(pending) > 1 else self._hedge_delay(next(iter(pending.values())))
+                if hedge_delay is not None:
+                    timeout = min(timeout, max(0.0, primary_started + hedge_delay - time.monotonic()))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if hedge_delay is not None and time.monotonic() >= primary_started + hedge_delay:
+                        hedged = True
+                        deployment = self.select(exclude=tried)
+                        if deployment is not None:
+                            metrics.LLM_HEDGES.inc(deployment=deployment.name)
+                            pending[asyncio.ensure_future(self._aattempt(call, deployment))] = deployment
+                            tried.add(deployment.name)
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        if not is_retryable(e):
+                            raise
+                        failures += not is_throttling_error(e)
+                        last_error = e
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _release(self, deployment):
+        """Undo select() for a deployment that was picked but not used"""
+        with self._lock:
+            deployment.in_flight -= 1
+            deployment.breaker.release()
+
+    def stats(self):
+        return {deployment.name: deployment.stats() for deployment in self.deployments}
+
+
+class GatewayChain:
+    """PreparedChain interface over a gateway: one prepared chain per deployment, calls routed by the gateway"""
+
+    def __init__(self, gateway, schema, static_messages):
+        self.gateway = gateway
+        self.chains = {d.name: PreparedChain(d.llm, schema, static_messages) for d in gateway.deployments}
+        first = self.chains[gateway.deployments[0].name]
+        self.schema = schema
+        self.static_messages = first.static_messages
+        self.fingerprint = first.fingerprint
+        self._first = first
+
+    @property
+    def prefix_tokens(self):
+        return self._first.prefix_tokens
+
+    def messages(self, variable_messages):
+        return self._first.messages(variable_messages)
+
+    @property
+    def tool_runnable(self):
+        """Streaming binding on a healthy deployment (streams are routed but not hedged or retried)"""
+        deployment = self.gateway.select()
+        if deployment is None:
+            return self._first.tool_runnable
+        self.gateway._release(deployment)
+        return self.chains[deployment.name].tool_runnable
+
+    def invoke(self, variable_messages):
+        """Returns (parsed output, usage dict)"""
+        return self.gateway.invoke(lambda deployment: self.chains[deployment.name].invoke(variable_messages))
+
+    async def ainvoke(self, variable_messages):
+        """Async counterpart of invoke"""
+        return await self.gateway.ainvoke(lambda deployment: self.chains[deployment.name].ainvoke(variable_messages))
+
+    def stats(self):
+        return self._first.stats()
@@ -0,0 +1,82 @@
+"""
+Shared helpers for LLM calls: token counting, usage reporting and classification of throttling errors.
+"""
+
+import functools
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken encoding, or None when tiktoken or its BPE files are unavailable (e.g. offline)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Warning: tiktoken unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text):
+    """Number of tokens in text (estimated from length when no tokenizer is available)"""
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def is_throttling_error(error):
+    """True for HTTP 429 / rate-limit errors from the OpenAI SDK or anything carrying their status code"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    # Decided from the status or type only: a message can mention "429" as a page number or token count
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error):
+    """Server-suggested delay from a retry-after-ms or Retry-After header, if the error carries one"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers.get("retry-after-ms")) / 1000
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def empty_usage():
+    return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_prompt_tokens": 0}
+
+
+def add_usage(total, usage):
+    """Accumulate one call's token usage into a running total (in place) and return it"""
+    for key in total:
+        total[key] += usage.get(key, 0) or 0
+    return total
+
+
+def message_usage(message):
+    """Token usage reported on a LangChain AIMessage, normalized to OpenAI field names"""
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    # Prompt tokens served from the provider's prompt cache (billed at a discount)
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "cached_prompt_tokens": cached,
+        }
+    return add_usage(empty_usage(), dict(token_usage, cached_prompt_tokens=cached))
+
+
+def parse_structured_response(response):
+    """(parsed output, usage) from an include_raw structured-output response"""
+    if not isinstance(response, dict) or "raw" not in response:
+        # Models/fakes that ignore include_raw return the parsed output directly
+        return response, empty_usage()
+    if response.get("parsing_error"):
+        raise response["parsing_error"]
+    return response["parsed"], message_usage(response["raw"])
@@ -0,0 +1,201 @@
+"""
+Long-document RFP analysis (map-reduce).
+Splits extracted text into token-bounded chunks along section boundaries, extracts findings
+from every chunk concurrently (cached per chunk), and condenses them into a digest that the
+decision prompt uses in place of a truncated prefix of the RFP. Each map call can hold a slot of
+the caller's admission controller, so the fan-out counts against the LLM concurrency limit.
+"""
+
+import contextlib
+import contextvars
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from pydantic import BaseModel
+from llm_utils import count_tokens, empty_usage, add_usage
+from result_cache import ResultCache, content_hash
+import metrics
+
+# Configuration
+LONG_DOC_CHUNK_TOKENS = int(os.getenv("LONG_DOC_CHUNK_TOKENS", "4000"))
+LONG_DOC_MAP_CONCURRENCY = int(os.getenv("LONG_DOC_MAP_CONCURRENCY", "16"))
+
+# Lines that start a new section: "SECTION 4", "ARTICLE IV", "4.2 Scope of Work", or short ALL-CAPS titles
+HEADING_PATTERN = re.compile(
+    r"^\s*((SECTION|ARTICLE|PART|ATTACHMENT|APPENDIX)\s+[\dIVXLC]+\b.*"
+    r"|\d+(\.\d+)*\.?\s+[A-Z][^\n]{2,80}"
+    r"|[A-Z][A-Z0-9 ,&/\-]{3,80})\s*$"
+)
+
+MAP_PROMPT = """You are reviewing one section of a Request for Proposal (RFP) for a legal services firm.
+Extract only what this section states; do not speculate about other sections.
+Return a short summary plus any requirements, budget or pricing signals, risks (liability,
+indemnification, penalties, unusual terms), deadlines, and legal practice areas involved.
+Leave a list empty when the section says nothing relevant."""
+
+# Per-chunk findings survive decision prompt changes; only the reduce step reruns
+chunk_cache = ResultCache("chunk_findings")
+
+
+class ChunkFindings(BaseModel):
+    """Schema for findings extracted from one RFP chunk"""
+    summary: str
+    requirements: List[str]
+    budget_signals: List[str]
+    risks: List[str]
+    deadlines: List[str]
+    practice_areas: List[str]
+
+
+def split_sections(text):
+    """Split text into (heading, body) sections at heading-like lines"""
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and any(part.strip() for part in lines):
+            sections.append((heading, "\n".join(lines)))
+            heading, lines = line.strip(), []
+        elif HEADING_PATTERN.match(line) and not heading:
+            heading = line.strip()
+        lines.append(line)
+    if any(part.strip() for part in lines):
+        sections.append((heading, "\n".join(lines)))
+    return sections
+
+
+def _split_oversized(text, max_tokens):
+    """Split one section that exceeds max_tokens at paragraph, then line, then character boundaries"""
+    for separator in ("\n\n", "\n"):
+        parts = text.split(separator)
+        if len(parts) > 1:
+            pieces, current, current_tokens = [], [], 0
+            for part in parts:
+                # Token counts are close enough to additive across separators for packing
+                part_tokens = count_tokens(part) + 1
+                if current and current_tokens + part_tokens > max_tokens:
+                    pieces.append(separator.join(current))
+                    current, current_tokens = [], 0
+                current.append(part)
+                current_tokens += part_tokens
+            pieces.append(separator.join(current))
+            if len(pieces) > 1:
+                return [chunk for piece in pieces for chunk in _split_oversized(piece, max_tokens)]
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    # No usable boundary: fall back to fixed-size character windows
+    width = max_tokens * 4
+    return [text[start:start + width] for start in range(0, len(text), width)]
+
+
+def chunk_text(text, max_tokens=LONG_DOC_CHUNK_TOKENS):
+    """
+    Pack consecutive sections into chunks of at most max_tokens tokens.
+
+    Returns:
+        list: Dicts with index, heading (first section in the chunk), text and tokens
+    """
+    chunks = []
+    current, current_tokens, current_heading = [], 0, ""
+
+    def flush():
+        if current:
+            chunks.append({
+                "index": len(chunks),
+                "heading": current_heading,
+                "text": "\n".join(current),
+                "tokens": current_tokens,
+            })
+
+    for heading, body in split_sections(text):
+        tokens = count_tokens(body)
+        pieces = [(body, tokens)] if tokens <= max_tokens else [
+            (piece, count_tokens(piece)) for piece in _split_oversized(body, max_tokens)
+        ]
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+                current, current_tokens, current_heading = [], 0, ""
+            if not current:
+                current_heading = heading
+            current.append(piece)
+            current_tokens += piece_tokens
+    flush()
+    return chunks
+
+
+def prepare_map_chain(gateway):
+    """Map-step structured call with the static MAP_PROMPT prefix, routed through the LLM gateway"""
+    return gateway.prepare(ChunkFindings, [{"role": "system", "content": MAP_PROMPT}])
+
+
+def _no_slot(size):
+    return contextlib.nullcontext()
+
+
+def _map_chunk(chunk, map_chain, cache_key, slot=_no_slot):
+    """Extract findings from one chunk; returns (findings dict, usage)"""
+    messages = [{"role": "user", "content": f"###RFP Section {chunk['index'] + 1}###\n{chunk['text']}"}]
+    # The gateway behind map_chain is the only retry layer: it fails over and waits out throttling
+    # within its deadline, so a failure here is final
+    with slot(len(chunk["text"])):
+        with metrics.stage("llm_map"):
+            findings, usage = map_chain.invoke(messages)
+    metrics.record_llm_usage("map", usage)
+    findings = findings.dict() if hasattr(findings, "dict") else dict(findings)
+    chunk_cache.set(cache_key, findings)
+    return findings, usage
+
+
+def format_digest(chunks, findings):
+    """Render per-chunk findings as the RFP section of the decision prompt"""
+    lines = []
+    for chunk, found in zip(chunks, findings):
+        title = chunk["heading"] or f"Part {chunk['index'] + 1}"
+        lines.append(f"[{title}] {found['summary']}")
+        for label, key in (("Requirements", "requirements"), ("Budget", "budget_signals"),
+                           ("Risks", "risks"), ("Deadlines", "deadlines"), ("Practice areas", "practice_areas")):
+            if found.get(key):
+                lines.append(f"  {label}: {'; '.join(found[key])}")
+    return "\n".join(lines)
+
+
+def analyze_long_document(rfp_text, map_chain, deployment, temperature, max_tokens=LONG_DOC_CHUNK_TOKENS, slot=_no_slot):
+    """
+    Map step of the long-document mode.
+
+    Args:
+        slot (callable): Called with a chunk's size in characters, returns the context manager each
+            map call runs in (e.g. an admission slot)
+
+    Returns:
+        tuple: (digest text for the decision prompt, stats with chunk counts, tokens and timings)
+    """
+    started = time.perf_counter()
+    chunks = chunk_text(rfp_text, max_tokens)
+    keys = [content_hash(chunk["text"], MAP_PROMPT, deployment or "", str(temperature)) for chunk in chunks]
+    findings = [chunk_cache.get(key) for key in keys]
+    missing = [i for i, found in enumerate(findings) if found is None]
+
+    map_usage = empty_usage()
+    if missing:
+        with ThreadPoolExecutor(min(LONG_DOC_MAP_CONCURRENCY, len(missing)), thread_name_prefix="rfp-map") as pool:
+            # Each map call runs in a copy of the request context, so its LLM time and tokens land on the request trace
+            futures = {i: pool.submit(contextvars.copy_context().run, _map_chunk, chunks[i], map_chain, keys[i], slot)
+                       for i in missing}
+            for i, future in futures.items():
+                findings[i], usage = future.result()
+                add_usage(map_usage, usage)
+
+    digest = format_digest(chunks, findings)
+    stats = {
+        "mode": "map_reduce",
+        "chunks": len(chunks),
+        "cached_chunks": len(chunks) - len(missing),
+        "document_tokens": sum(chunk["tokens"] for chunk in chunks),
+        "digest_tokens": count_tokens(digest),
+        "tokens": {"map": map_usage},
+        "map_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return digest, stats
@@ -0,0 +1,240 @@
+"""
+Low-overhead hot-path instrumentation.
+Counters and fixed-bucket histograms rendered in the Prometheus text format, plus a per-request
+trace that collects stage timings and sizes into one structured (JSON) log line.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+# Configuration
+METRICS_REQUEST_LOG = os.getenv("METRICS_REQUEST_LOG", "true").lower() in ("1", "true", "yes")
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** n for n in range(8))  # 1KB .. 16MB
+PAGES_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 300, 500, 1000)
+TOKENS_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+_registry = []
+
+
+def _json_logger(name):
+    """Logger that writes each (already JSON) message as one line on stdout"""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+request_logger = _json_logger("rfp.requests")
+event_logger = _json_logger("rfp.events")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, [("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def render_prometheus():
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Metrics recorded by the upload path
+STAGE_SECONDS = Histogram("rfp_stage_seconds", "Time spent in each upload pipeline stage", SECONDS_BUCKETS, ["stage"])
+REQUEST_SECONDS = Histogram("rfp_http_request_seconds", "API request latency", SECONDS_BUCKETS, ["endpoint", "status"])
+UPLOAD_BYTES = Histogram("rfp_upload_bytes", "Size of uploaded RFP documents", BYTES_BUCKETS, ["file_type"])
+PDF_PAGES = Histogram("rfp_pdf_pages", "Pages per uploaded PDF", PAGES_BUCKETS)
+LLM_TOKENS = Histogram("rfp_llm_tokens", "Tokens per LLM call", TOKENS_BUCKETS, ["call", "kind"])
+LLM_TOKENS_TOTAL = Counter("rfp_llm_tokens_total", "Tokens consumed by LLM calls", ["call", "kind"])
+LLM_HTTP_RESPONSES = Counter("rfp_llm_http_responses_total", "HTTP responses from Azure OpenAI, including retried attempts", ["status_code"])
+LLM_RETRIES = Counter("rfp_llm_retries_total", "Application-level LLM retries after throttling", ["call"])
+PRESCREEN_DECISIONS = Counter("rfp_prescreen_total", "RFPs checked by the local pre-screen, by outcome (declined skips the LLM)", ["outcome"])
+LLM_ATTEMPTS = Counter("rfp_llm_attempts_total", "LLM gateway attempts by deployment and outcome", ["deployment", "outcome"])
+LLM_HEDGES = Counter("rfp_llm_hedged_requests_total", "Second requests sent after the first ran past its deployment's p95 latency", ["deployment"])
+LLM_CIRCUIT_OPENS = Counter("rfp_llm_circuit_opens_total", "Times a deployment's circuit breaker opened", ["deployment"])
+LLM_DEADLINE_EXCEEDED = Counter("rfp_llm_deadline_exceeded_total", "LLM calls abandoned at their deadline")
+NEAR_DUPLICATE_LOOKUPS = Counter("rfp_near_duplicate_lookups_total", "Decision lookups in the near-duplicate RFP index, by outcome (matched reuses an earlier decision)", ["outcome"])
+ADMISSION_REQUESTS = Counter("rfp_admission_requests_total", "LLM-bound requests by priority and admission outcome (admitted, shed, timed_out)", ["priority", "outcome"])
+ADMISSION_WAIT_SECONDS = Histogram("rfp_admission_wait_seconds", "Queue wait before an LLM slot was granted", SECONDS_BUCKETS, ["priority"])
+LONG_DOCUMENT_CHUNKS = Counter("rfp_long_document_chunks_total", "Chunks of long RFPs condensed by the map step, by source (mapped by the LLM or cached)", ["source"])
+FALLBACK_DECISIONS = Counter("rfp_fallback_decisions_total", "Fallback DECLINE decisions returned after AI errors")
+
+
+_current_trace = contextvars.ContextVar("rfp_request_trace", default=None)
+_trace_lock = threading.Lock()  # worker threads (map calls, gateway attempts) add to one request's trace
+
+
+def start_trace(**fields):
+    """Begin collecting per-request fields for the structured request log"""
+    trace = {"stages_ms": {}, **fields}
+    _current_trace.set(trace)
+    return trace
+
+
+def annotate(**fields):
+    """Attach fields to the current request's log line (no-op outside a traced request)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.update(fields)
+
+
+def current_trace():
+    """The current request's trace, or None outside a traced request"""
+    return _current_trace.get()
+
+
+def finish_trace(trace=None, **fields):
+    """
+    Emit a request's structured log line and clear the current trace.
+
+    Args:
+        trace (dict): Trace to finish, for streamed responses whose body runs after the request
+            handler returned; defaults to the current one
+    """
+    trace = trace if trace is not None else _current_trace.get()
+    if trace is None:
+        return None
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+    trace.update(fields)
+    if METRICS_REQUEST_LOG:
+        request_logger.info(json.dumps(trace, default=str))
+    return trace
+
+
+def log_event(event, level="info", **fields):
+    """
+    Emit one structured (JSON) log line for an application event, such as an LLM error.
+
+    Args:
+        event (str): Event name, e.g. "ai_decision_error"
+        level (str): "info", "warning" or "error"
+        **fields: Event details; the current request's method and path are added when traced
+    """
+    trace = _current_trace.get()
+    record = {"event": event, "level": level}
+    if trace is not None:
+        record.update({key: trace[key] for key in ("method", "path") if key in trace})
+    record.update(fields)
+    event_logger.log(getattr(logging, level.upper()), json.dumps(record, default=str))
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a pipeline stage into rfp_stage_seconds and the current request trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            with _trace_lock:
+                trace["stages_ms"][name] = round(trace["stages_ms"].get(name, 0) + elapsed * 1000, 2)
+
+
+def record_llm_usage(call, usage):
+    """Record prompt/completion token counts for one LLM call"""
+    for kind in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens"):
+        tokens = usage.get(kind) or 0
+        if tokens:
+            LLM_TOKENS.observe(tokens, call=call, kind=kind)
+            LLM_TOKENS_TOTAL.inc(tokens, call=call, kind=kind)
+    trace = _current_trace.get()
+    if trace is not None:
+        with _trace_lock:
+            tokens = trace.setdefault("tokens", {})
+            for kind in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens"):
+                tokens[kind] = tokens.get(kind, 0) + (usage.get(kind) or 0)
+
+
+def record_llm_response(response):
+    """httpx response hook: count every Azure OpenAI HTTP response, including retried attempts"""
+    LLM_HTTP_RESPONSES.inc(status_code=response.status_code)
@@ -0,0 +1,321 @@
+"""
+Near-duplicate RFP detection.
+Agencies reissue RFPs with trivial edits (a new date, an amended addendum), which exact content
+hashing misses. Every decided RFP is reduced to a MinHash signature over word shingles of its
+extracted text and filed in an LSH table (one sorted array of 64-bit band keys). A new upload's
+candidates are found with one vectorized binary search over its band keys; the best candidate whose estimated Jaccard
+similarity clears the threshold has its decision reused, with a summary of the sections that changed.
+Only decisions made under the same context (prompt fingerprint, deployment, temperature and supporting
+projects) and younger than the result-cache TTL are reused, so a prompt or model change is not
+answered with decisions made under the old one.
+
+Storage: per document, a 16-bit-per-permutation signature (b-bit MinHash), one key per band, the
+context key, the indexing time and a record offset are kept in memory and appended to signatures.bin; the decision and the compressed
+text (for the diff) go to records.jsonl and are read back by offset only on a match.
+"""
+
+import base64
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+import numpy as np
+from long_document import split_sections
+from result_cache import CACHE_FOLDER, CACHE_PERSIST, CACHE_TTL_SECONDS
+from vector_index import TOKEN_PATTERN
+
+# Configuration
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))  # estimated Jaccard needed to reuse
+NEAR_DUPLICATE_FOLDER = os.path.join(CACHE_FOLDER, "near_duplicates")
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16  # 16 bands x 8 rows: pairs at 0.9 similarity are candidates with probability > 0.9999
+PENDING_MAX = 4096  # rows added since the last sort that are scanned linearly
+DIFF_MAX_SECTIONS = 10
+DIFF_MAX_LINES = 6  # changed lines reported per section
+
+_MAGIC = b"RFPLSH2\0"
+_SEED = 20240501
+_SIGNATURE_CHUNK = 4096  # shingles hashed per step, bounds the (shingles x permutations) temporary
+_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+_MULTIPLIER = np.uint64(0x100000001B3)
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2^64 >> 32, a odd
+_rng = np.random.default_rng(_SEED)
+_A = _rng.integers(1, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+RECORD_DTYPE = np.dtype([("signature", "<u2", (NUM_PERMUTATIONS,)), ("bands", "<u8", (LSH_BANDS,)),
+                         ("context", "<u8"), ("indexed_at", "<f8"), ("offset", "<u8")])
+
+
+def shingle_hashes(text, words=SHINGLE_WORDS):
+    """Distinct 64-bit hashes of the overlapping word n-grams of text (lowercased, punctuation dropped)"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    width = min(words, len(tokens))
+    combined = np.zeros(len(tokens) - width + 1, dtype=np.uint64)
+    for offset in range(width):
+        # uint64 arithmetic wraps, as intended for hashing
+        combined = combined * _MULTIPLIER + token_hashes[offset:offset + len(combined)]
+    return np.unique(combined)
+
+
+def minhash(text):
+    """
+    MinHash signature of a text.
+
+    Returns:
+        numpy.ndarray: NUM_PERMUTATIONS uint32 minimums, or None for text without words
+    """
+    shingles = shingle_hashes(text)
+    if not len(shingles):
+        return None
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(shingles), _SIGNATURE_CHUNK):
+        block = shingles[start:start + _SIGNATURE_CHUNK, None]
+        np.minimum(signature, ((block * _A + _B) >> np.uint64(32)).min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+
+def band_keys(signature):
+    """One 64-bit key per LSH band of a signature; the band number is mixed in, so all bands share one table"""
+    rows = signature.reshape(LSH_BANDS, _ROWS).astype(np.uint64)
+    keys = np.arange(1, LSH_BANDS + 1, dtype=np.uint64)
+    for row in range(_ROWS):
+        keys = keys * _MULTIPLIER + rows[:, row]
+    return keys
+
+
+def context_id(context):
+    """64-bit row tag for a context key (any string; the full key is checked against the record on a match)"""
+    return int.from_bytes(hashlib.sha256(context.encode("utf-8")).digest()[:8], "little")
+
+
+def _section_key(heading, seen):
+    """Heading label, numbered when the same heading repeats"""
+    label = heading or "(untitled)"
+    seen[label] = seen.get(label, 0) + 1
+    return label if seen[label] == 1 else f"{label} ({seen[label]})"
+
+
+def diff_summary(old_text, new_text):
+    """
+    Sections added, removed and changed between two versions of an RFP, with the changed lines.
+
+    Returns:
+        dict: changed_sections ([{heading, changes}]), added_sections and removed_sections (headings)
+    """
+    def sections(text):
+        seen = {}
+        return {_section_key(heading, seen): body for heading, body in split_sections(text)}
+
+    old, new = sections(old_text), sections(new_text)
+    changed = []
+    for heading, body in new.items():
+        if heading not in old or old[heading] == body:
+            continue
+        if len(changed) >= DIFF_MAX_SECTIONS:
+            break
+        before, after = old[heading].splitlines(), body.splitlines()
+        # autojunk would treat boilerplate lines that repeat through long sections as noise
+        matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+        lines = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                lines += [f"-{line}" for line in before[i1:i2] if line.strip()]
+                lines += [f"+{line}" for line in after[j1:j2] if line.strip()]
+        changed.append({"heading": heading, "changes": lines[:DIFF_MAX_LINES], "changed_lines": len(lines)})
+    return {
+        "changed_sections": changed,
+        "added_sections": [heading for heading in new if heading not in old],
+        "removed_sections": [heading for heading in old if heading not in new],
+    }
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of decided RFPs; thread-safe, persisted as append-only files"""
+
+    def __init__(self, folder=NEAR_DUPLICATE_FOLDER, persist=CACHE_PERSIST, threshold=NEAR_DUPLICATE_THRESHOLD,
+                 ttl_seconds=CACHE_TTL_SECONDS):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.folder = folder if persist else None
+        self._records = []  # record JSON strings when not persisting
+        self._rows = np.zeros(0, dtype=RECORD_DTYPE)
+        self._size = 0
+        self._sorted_size = 0
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._sorted_rows = np.zeros(0, dtype=np.uint32)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        if self.folder and os.path.exists(self._path("signatures.bin")):
+            self._load()
+
+    def _path(self, name):
+        return os.path.join(self.folder, name)
+
+    def __len__(self):
+        return self._size
+
+    def _header(self):
+        return _MAGIC + json.dumps({"permutations": NUM_PERMUTATIONS, "bands": LSH_BANDS,
+                                    "shingle_words": SHINGLE_WORDS, "seed": _SEED}).encode("utf-8").ljust(120) + b"\n"
+
+    def _load(self):
+        header = self._header()
+        with open(self._path("signatures.bin"), "rb") as file:
+            if file.read(len(header)) != header:
+                print(f"Warning: ignoring near-duplicate index {self.folder} built with different parameters")
+                self.folder = None
+                return
+            data = file.read()
+        # A torn trailing record (crash mid-append) is dropped
+        self._rows = np.frombuffer(data[:len(data) - len(data) % RECORD_DTYPE.itemsize], dtype=RECORD_DTYPE).copy()
+        self._size = len(self._rows)
+        self._sort()
+
+    def _sort(self):
+        """Rebuild the sorted band-key table over every row (lock held or during load)"""
+        keys = self._rows["bands"][:self._size].ravel()
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._sorted_rows = (order // LSH_BANDS).astype(np.uint32)
+        self._sorted_size = self._size
+
+    def _candidates(self, keys):
+        rows = set()
+        starts = np.searchsorted(self._sorted_keys, keys, side="left")
+        stops = np.searchsorted(self._sorted_keys, keys, side="right")
+        for band in np.flatnonzero(stops > starts):
+            rows.update(self._sorted_rows[starts[band]:stops[band]].tolist())
+        if self._size > self._sorted_size:
+            pending = self._rows["bands"][self._sorted_size:self._size]
+            rows.update((np.flatnonzero((pending == keys).any(axis=1)) + self._sorted_size).tolist())
+        return rows
+
+    def find(self, signature, context=""):
+        """
+        Best match for a signature among RFPs decided under the same context and within the TTL.
+
+        Returns:
+            tuple: (similarity, row) of the most similar indexed RFP at or above the threshold, or None
+        """
+        keys = band_keys(signature)
+        compact = (signature & 0xFFFF).astype(np.uint16)
+        with self._lock:
+            rows = self._candidates(keys)
+            if not rows:
+                return None
+            rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            current = self._rows["context"][rows] == np.uint64(context_id(context))
+            if self.ttl_seconds is not None:
+                current &= self._rows["indexed_at"][rows] >= time.time() - self.ttl_seconds
+            rows = rows[current]
+            if not len(rows):
+                return None
+            similarities = (self._rows["signature"][rows] == compact).mean(axis=1)
+        best = int(np.argmax(similarities))
+        return (float(similarities[best]), int(rows[best])) if similarities[best] >= self.threshold else None
+
+    def _read_record(self, row):
+        if self.folder is None:
+            return json.loads(self._records[row])
+        with open(self._path("records.jsonl"), "rb") as file:
+            file.seek(int(self._rows["offset"][row]))
+            return json.loads(file.readline())
+
+    def lookup(self, text, context="", signature=None):
+        """
+        The decision of a near-duplicate of text decided under context, annotated with the similarity
+        and a diff summary, or None.
+        """
+        signature = minhash(text) if signature is None else signature
+        match = self.find(signature, context) if signature is not None else None
+        record = self._read_record(match[1]) if match is not None else None
+        if record is not None and record.get("context") != context:
+            record = None  # 64-bit context tag collision
+        with self._lock:
+            self.lookups += 1
+            self.matches += record is not None
+        if record is None:
+            return None
+        similarity = match[0]
+        decision = dict(record["decision"])
+        decision["near_duplicate"] = {
+            "similarity": round(similarity, 4),
+            "threshold": self.threshold,
+            "matched_rfp": record["text_hash"][:16],
+            "decided_at": record["indexed_at"],
+            "diff": diff_summary(zlib.decompress(base64.b64decode(record["text"])).decode("utf-8"), text),
+        }
+        return decision
+
+    def add(self, text, decision, context="", signature=None):
+        """File a decided RFP so later near-duplicates decided under the same context can reuse its decision"""
+        signature = minhash(text) if signature is None else signature
+        if signature is None:
+            return
+        indexed_at = time.time()
+        record = json.dumps({
+            "text_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "indexed_at": datetime.fromtimestamp(indexed_at).isoformat(timespec="seconds"),
+            "context": context,
+            "decision": decision,
+            "text": base64.b64encode(zlib.compress(text.encode("utf-8"), 6)).decode("ascii"),
+        }) + "\n"
+        row = np.zeros(1, dtype=RECORD_DTYPE)
+        row["signature"] = (signature & 0xFFFF).astype(np.uint16)
+        row["bands"] = band_keys(signature)
+        row["context"] = context_id(context)
+        row["indexed_at"] = indexed_at
+
+        with self._lock:
+            if self.folder is None:
+                row["offset"] = len(self._records)
+                self._records.append(record)
+            else:
+                try:
+                    os.makedirs(self.folder, exist_ok=True)
+                    signatures_path = self._path("signatures.bin")
+                    new_file = not os.path.exists(signatures_path)
+                    with open(self._path("records.jsonl"), "ab") as file:
+                        row["offset"] = file.tell()
+                        file.write(record.encode("utf-8"))
+                    with open(signatures_path, "ab") as file:
+                        if new_file:
+                            file.write(self._header())
+                        file.write(row.tobytes())
+                except OSError as e:
+                    print(f"Warning: could not persist near-duplicate index entry: {e}")
+                    return
+            if self._size == len(self._rows):
+                grown = np.zeros(max(1024, len(self._rows) * 3 // 2), dtype=RECORD_DTYPE)
+                grown[:self._size] = self._rows[:self._size]
+                self._rows = grown
+            self._rows[self._size] = row[0]
+            self._size += 1
+            if self._size - self._sorted_size > PENDING_MAX:
+                self._sort()
+
+    def memory_bytes(self):
+        """Bytes held by the index arrays (signatures, band keys, context tags, times, offsets and the sorted band tables)"""
+        return self._rows[:self._size].nbytes + self._sorted_keys.nbytes + self._sorted_rows.nbytes
+
+    def stats(self):
+        return {
+            "indexed": self._size,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "memory_bytes_per_rfp": round(self.memory_bytes() / self._size) if self._size else 0,
+        }
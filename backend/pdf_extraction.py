@@ -0,0 +1,218 @@
+"""
+Page-parallel PDF text extraction for RFP documents.
+Fans page ranges out to a process pool and yields page text (or per-line layout runs) as it
+finishes, so downstream stages can start before the last page of a large RFP is parsed.
+Only a bounded window of page ranges is queued at a time, so a consumer that stops early
+does not pay for pages it never reads.
+Sources may be a file path or an in-memory buffer (bytes, bytearray or memoryview); buffers are
+shared with pool workers through shared memory rather than written to disk.
+"""
+
+import io
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import resource_tracker, shared_memory
+
+# Configuration
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+# Process pool shared by all requests, created on first use
+_executor = None
+
+# Per-process reader cache so a worker parses the PDF structure once per file
+_worker_readers = {}
+
+
+def _get_executor():
+    """Return the shared extraction process pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PDF_EXTRACTION_WORKERS)
+    return _executor
+
+
+def _attach_shared_memory(name):
+    """Attach to a block the parent created without registering it with the resource tracker"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching always registers the block. Unregistering afterwards would drop the
+    # parent's own registration too (pool workers share its tracker), so skip the registration.
+    # Pool workers run one task at a time, so swapping the function is safe here.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _open_reader(source):
+    """Open (or reuse) a PdfReader inside the current process for a ("path", path, mtime) or ("shm", name, size) source"""
+    reader = _worker_readers.get(source)
+    if reader is None:
+        import PyPDF2  # imported on first use so the app starts without it
+        _worker_readers.clear()
+        if source[0] == "shm":
+            block = _attach_shared_memory(source[1])
+            try:
+                # One copy per worker; the parent unlinks the block once extraction finishes
+                reader = PyPDF2.PdfReader(io.BytesIO(bytes(block.buf[:source[2]])))
+            finally:
+                block.close()
+        else:
+            reader = PyPDF2.PdfReader(source[1])
+        _worker_readers[source] = reader
+    return reader
+
+
+def extract_page_lines(page):
+    """
+    Text lines of one page with their font size (points, after text/page scaling) and boldness.
+
+    Returns:
+        list: (line_text, font_size, bold) tuples in content-stream order
+    """
+    lines = [["", 0.0, False]]
+
+    def visit(text, cm, tm, font, size):
+        scale = math.hypot(tm[2], tm[3]) * math.hypot(cm[2], cm[3]) or 1.0
+        bold = "bold" in str((font or {}).get("/BaseFont", "")).lower()
+        for i, piece in enumerate(text.split("\n")):
+            if i:
+                lines.append(["", 0.0, False])
+            if piece.strip():
+                line = lines[-1]
+                line[0] += piece
+                line[1] = max(line[1], (size or 0) * scale)
+                line[2] = line[2] or bold
+
+    page.extract_text(visitor_text=visit)
+    return [tuple(line) for line in lines if line[0].strip()]
+
+
+def _page_content(page, layout):
+    return extract_page_lines(page) if layout else page.extract_text() or ""
+
+
+def _extract_page_range(source, start, stop, layout=False):
+    """Worker task: extract pages [start, stop) and return (index, text or layout lines) pairs"""
+    reader = _open_reader(source)
+    return [(index, _page_content(reader.pages[index], layout)) for index in range(start, stop)]
+
+
+def _local_reader(source):
+    """PdfReader in this process for a file path or an in-memory buffer"""
+    import PyPDF2
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return PyPDF2.PdfReader(io.BytesIO(source))
+    return PyPDF2.PdfReader(source)
+
+
+def count_pages(source):
+    """Return the number of pages in a PDF (file path or in-memory buffer)"""
+    return len(_local_reader(source).pages)
+
+
+def iter_pdf_pages(source, ordered=False, max_workers=None, start_page=0, layout=False):
+    """
+    Yield (page_index, text) pairs for a PDF as pages finish extracting.
+
+    Args:
+        source (str | bytes | memoryview): Path to the PDF file, or its contents
+        ordered (bool): Yield strictly in page order, buffering pages that finish early
+        max_workers (int): Override PDF_EXTRACTION_WORKERS with a pool of this size for this call;
+            1 forces in-process extraction
+        start_page (int): First page to extract (to resume a partial extraction)
+        layout (bool): Yield extract_page_lines() output instead of plain page text
+
+    Yields:
+        tuple: (page_index, page_text or layout lines)
+    """
+    in_memory = isinstance(source, (bytes, bytearray, memoryview))
+    if not in_memory:
+        source = os.path.abspath(source)
+    reader = _local_reader(source)
+    page_count = len(reader.pages)
+    workers = max_workers or PDF_EXTRACTION_WORKERS
+
+    # Small documents are cheaper to parse in-process than to ship to the pool
+    if workers <= 1 or page_count - start_page < PDF_PARALLEL_MIN_PAGES:
+        for index in range(start_page, page_count):
+            yield index, _page_content(reader.pages[index], layout)
+        return
+
+    block = None
+    if in_memory:
+        block = shared_memory.SharedMemory(create=True, size=len(source))
+        block.buf[:len(source)] = source
+        worker_source = ("shm", block.name, len(source))
+    else:
+        worker_source = ("path", source, os.path.getmtime(source))
+
+    # Another worker count gets its own pool, shut down when the call ends
+    dedicated = max_workers is not None and max_workers != PDF_EXTRACTION_WORKERS
+    executor = ProcessPoolExecutor(max_workers=workers) if dedicated else _get_executor()
+    ranges = iter(range(start_page, page_count, PDF_PAGES_PER_TASK))
+    futures = []
+    in_flight = set()
+
+    def submit_next():
+        start = next(ranges, None)
+        if start is not None:
+            future = executor.submit(_extract_page_range, worker_source, start,
+                                     min(start + PDF_PAGES_PER_TASK, page_count), layout)
+            futures.append(future)
+            in_flight.add(future)
+
+    # Keep every worker busy with one range queued behind it; more is wasted if the consumer stops early
+    for _ in range(workers * 2):
+        submit_next()
+
+    try:
+        buffered = {}
+        next_index = start_page
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                submit_next()
+                for index, content in future.result():
+                    if not ordered:
+                        yield index, content
+                    else:
+                        buffered[index] = content
+                while next_index in buffered:
+                    yield next_index, buffered.pop(next_index)
+                    next_index += 1
+    finally:
+        # Consumer stopped early - drop work that has not started yet
+        for future in futures:
+            future.cancel()
+        if block is not None:
+            # Tasks already running keep their own copy; wait for them before unlinking
+            for future in futures:
+                if not future.cancelled():
+                    future.exception()
+            block.close()
+            block.unlink()
+        if dedicated:
+            executor.shutdown(wait=False)
+
+
+def extract_pdf_pages(source, max_workers=None):
+    """Extract the text of every page of a PDF (file path or in-memory buffer), in page order"""
+    return [text for _, text in sorted(iter_pdf_pages(source, max_workers=max_workers))]
+
+
+def extract_pdf_text(source, max_workers=None):
+    """Extract the full text of a PDF (file path or in-memory buffer), one line break after each page, in page order"""
+    return join_pages(extract_pdf_pages(source, max_workers=max_workers))
+
+
+def join_pages(pages):
+    """Join page texts the way extract_pdf_text does"""
+    return "".join(f"{text}\n" for text in pages)
@@ -0,0 +1,241 @@
+"""
+Local pre-screen ahead of the AI decision.
+A small logistic-regression model over hashed unigram/bigram features of the extracted RFP text
+scores how likely the RFP is outside legal services. Confident out-of-scope RFPs get an immediate
+DECLINE in the AIDecisionResponse shape without an LLM call; everything else goes to the model.
+Trained from labeled past RFPs (see the CLI below); a built-in seed set is used until one exists.
+
+Usage (from the backend directory):
+    python prescreen.py train labeled.jsonl [--model prescreen_model.npz]
+where each line is {"text": "...", "in_scope": true|false} (or "label": "in_scope"/"out_of_scope").
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import threading
+import zlib
+import numpy as np
+from vector_index import TOKEN_PATTERN
+
+# Configuration
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "true").lower() in ("1", "true", "yes")
+PRESCREEN_MODEL_PATH = os.getenv("PRESCREEN_MODEL_PATH", "prescreen_model.npz")
+PRESCREEN_THRESHOLD = float(os.getenv("PRESCREEN_THRESHOLD", "0.9"))  # P(out of scope) needed to skip the LLM
+PRESCREEN_MAX_CHARS = int(os.getenv("PRESCREEN_MAX_CHARS", "20000"))  # scope is evident from the opening pages
+PRESCREEN_MIN_CHARS = 200  # too little text to judge; leave it to the LLM
+FEATURE_BITS = 18
+
+# Small labeled seed set (True = legal services, in scope) so the pre-screen works before a model is trained
+SEED_EXAMPLES = [
+    ("Request for proposal for outside legal counsel to represent the city in employment litigation and advise on labor law compliance", True),
+    ("The agency seeks a law firm to provide general counsel services including contract review, regulatory advice and litigation support", True),
+    ("RFP for legal services: intellectual property portfolio management, patent prosecution and trademark registration", True),
+    ("Seeking qualified attorneys for bond counsel and disclosure counsel services for municipal securities offerings", True),
+    ("Proposals are invited from law firms for merger and acquisition due diligence, corporate governance and securities law advice", True),
+    ("Outside counsel to defend the authority in a class action lawsuit and provide litigation management", True),
+    ("Legal services for tax law advice, IRS audit representation and tax controversy matters", True),
+    ("The department requires legal representation in regulatory enforcement proceedings and compliance investigations", True),
+    ("Request for qualifications for attorneys to provide real estate law services, lease negotiation and title review", True),
+    ("Law firm panel for data privacy and cybersecurity legal advice, GDPR compliance and breach response counsel", True),
+    ("Legal counsel for environmental law matters including permitting disputes and Superfund litigation", True),
+    ("RFP for special counsel to conduct an independent investigation and provide legal opinion to the board", True),
+    ("Attorneys to draft and negotiate commercial contracts, licensing agreements and vendor agreements", True),
+    ("Provide immigration legal services including visa petitions, employer compliance and consular processing", True),
+    ("Legal services for construction contract disputes, claims defense and arbitration", True),
+    ("Request for proposal for road paving, asphalt resurfacing and pavement markings on county roads", False),
+    ("Bids are invited for janitorial and custodial cleaning services at municipal office buildings", False),
+    ("RFP for the supply and installation of HVAC equipment and mechanical system upgrades", False),
+    ("Catering and food services for school cafeterias including meal preparation and delivery", False),
+    ("Construction of a new fire station including site work, concrete foundations and steel framing", False),
+    ("Software development services to build a cloud based permitting portal and mobile application", False),
+    ("Landscaping, lawn mowing, tree trimming and grounds maintenance for city parks", False),
+    ("Supply of office furniture, desks, chairs and filing cabinets for the administration building", False),
+    ("Fleet vehicle maintenance, oil changes, tire replacement and collision repair services", False),
+    ("Water main replacement, sewer pipe rehabilitation and storm drain installation", False),
+    ("Managed IT services, network infrastructure, help desk support and server hosting", False),
+    ("Printing and mailing services for utility bills and election ballots", False),
+    ("Security guard services and video surveillance system installation for transit stations", False),
+    ("Roof replacement and waterproofing of the public library building", False),
+    ("Marketing, advertising campaign design and social media management for the tourism board", False),
+    ("Snow removal and de-icing services for municipal parking lots and sidewalks", False),
+    ("Medical supplies, laboratory equipment and pharmaceutical distribution for county clinics", False),
+]
+
+
+def text_features(text, max_chars=PRESCREEN_MAX_CHARS):
+    """Feature strings of a document: lowercase unigrams and bigrams of its first max_chars characters"""
+    tokens = TOKEN_PATTERN.findall(text[:max_chars].lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def hash_features(features, bits=FEATURE_BITS):
+    """(indices, values) of a sublinear-tf, L2-normalized hashed feature vector"""
+    mask = (1 << bits) - 1
+    indices = np.fromiter((zlib.crc32(feature.encode("utf-8")) & mask for feature in features),
+                          dtype=np.int64, count=len(features))
+    indices, counts = np.unique(indices, return_counts=True)
+    values = 1.0 + np.log(counts)
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+class PreScreenModel:
+    """Binary logistic regression: P(out of scope | text)"""
+
+    def __init__(self, weights=None, bias=0.0, bits=FEATURE_BITS, trained_on=0):
+        self.bits = bits
+        self.weights = weights if weights is not None else np.zeros(1 << bits, dtype=np.float64)
+        self.bias = bias
+        self.trained_on = trained_on
+
+    @classmethod
+    def train(cls, examples, epochs=30, learning_rate=0.5, l2=1e-4, bits=FEATURE_BITS, seed=0):
+        """
+        Fit on labeled examples with plain SGD.
+
+        Args:
+            examples (list): (text, in_scope) pairs
+            epochs (int): Passes over the data
+            learning_rate (float): Initial SGD step size (decays per epoch)
+            l2 (float): L2 penalty applied to the touched weights
+
+        Returns:
+            PreScreenModel: The trained model
+        """
+        model = cls(bits=bits, trained_on=len(examples))
+        data = [(hash_features(text_features(text), bits), 0.0 if in_scope else 1.0) for text, in_scope in examples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for (indices, values), target in data:
+                error = model._probability(indices, values) - target
+                model.weights[indices] -= rate * (error * values + l2 * model.weights[indices])
+                model.bias -= rate * error
+        return model
+
+    def _probability(self, indices, values):
+        margin = float(self.weights[indices] @ values) + self.bias
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, margin))))
+
+    def out_of_scope_probability(self, text):
+        return self._probability(*hash_features(text_features(text), self.bits))
+
+    def top_indicators(self, text, limit=5):
+        """Terms in text that push most strongly toward out of scope"""
+        mask = (1 << self.bits) - 1
+        scored = {}
+        for feature in text_features(text):
+            weight = self.weights[zlib.crc32(feature.encode("utf-8")) & mask]
+            if weight > 0:
+                scored[feature] = weight
+        return [feature for feature, _ in sorted(scored.items(), key=lambda item: -item[1])[:limit]]
+
+    def save(self, path):
+        # Only the touched weights are stored
+        nonzero = np.flatnonzero(self.weights)
+        np.savez_compressed(path, indices=nonzero, weights=self.weights[nonzero],
+                            meta=np.array(json.dumps({"bits": self.bits, "bias": self.bias, "trained_on": self.trained_on})))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            weights = np.zeros(1 << meta["bits"], dtype=np.float64)
+            weights[data["indices"]] = data["weights"]
+        return cls(weights, meta["bias"], meta["bits"], meta["trained_on"])
+
+
+class PreScreener:
+    """Applies the model ahead of the AI decision and counts how often it short-circuits"""
+
+    def __init__(self, model, threshold=PRESCREEN_THRESHOLD, source="seed"):
+        self.model = model
+        self.threshold = threshold
+        self.source = source
+        self.screened = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def screen(self, rfp_text):
+        """
+        Return a DECLINE decision dict when the RFP is confidently outside legal services, else None.
+        """
+        # Too little text to judge (e.g. a failed extraction) always goes to the LLM
+        probability = self.model.out_of_scope_probability(rfp_text) if len(rfp_text.strip()) >= PRESCREEN_MIN_CHARS else 0.0
+        short_circuit = probability >= self.threshold
+        with self._lock:
+            self.screened += 1
+            self.short_circuited += short_circuit
+        if not short_circuit:
+            return None
+
+        indicators = self.model.top_indicators(rfp_text)
+        return {
+            "recommendation": "DECLINE",
+            "confidence_score": round(probability, 3),
+            "executive_summary": "Pre-screen: this RFP does not appear to request legal services, which is outside our firm's practice. Declined without full AI analysis.",
+            "key_factors": ["RFP scope is outside legal services"] + ([f"Out-of-scope indicators: {', '.join(indicators)}"] if indicators else []),
+            "risk_assessment": "Not assessed: the opportunity does not match the firm's core competencies.",
+            "financial_analysis": "Not assessed: no comparable legal engagements apply.",
+            "next_steps": ["No proposal recommended", "Request a full AI review if this RFP does involve legal services"],
+            "prescreen": {"out_of_scope_probability": round(probability, 4), "threshold": self.threshold, "model": self.source}
+        }
+
+    def stats(self):
+        return {
+            "model": self.source,
+            "trained_on": self.model.trained_on,
+            "threshold": self.threshold,
+            "screened": self.screened,
+            "short_circuited": self.short_circuited,
+            "short_circuit_rate": round(self.short_circuited / self.screened, 4) if self.screened else 0.0,
+        }
+
+
+def load_prescreener(path=PRESCREEN_MODEL_PATH, threshold=PRESCREEN_THRESHOLD):
+    """Trained model from path if present, otherwise one fitted on SEED_EXAMPLES"""
+    if path and os.path.exists(path):
+        try:
+            return PreScreener(PreScreenModel.load(path), threshold, source=os.path.basename(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: could not load pre-screen model {path}: {e}")
+    return PreScreener(PreScreenModel.train(SEED_EXAMPLES), threshold, source="seed")
+
+
+def iter_labeled_file(path):
+    """(text, in_scope) pairs from a JSONL or CSV file with text and in_scope/label columns"""
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = (json.loads(line) for line in file if line.strip()) if path.endswith(".jsonl") else csv.DictReader(file)
+        for row in rows:
+            if "in_scope" in row:
+                value = row["in_scope"]
+                in_scope = value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes")
+            else:
+                in_scope = str(row.get("label", "")).strip().lower() in ("in_scope", "legal", "pursue")
+            yield row["text"], in_scope
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train", help="Train the pre-screen model from labeled RFPs")
+    train_parser.add_argument("path", help="JSONL or CSV with text and in_scope (or label) fields")
+    train_parser.add_argument("--model", default=PRESCREEN_MODEL_PATH)
+    train_parser.add_argument("--no-seed", action="store_true", help="Do not add the built-in seed examples")
+    train_parser.add_argument("--epochs", type=int, default=30)
+    args = parser.parse_args()
+
+    examples = list(iter_labeled_file(args.path)) + ([] if args.no_seed else SEED_EXAMPLES)
+    model = PreScreenModel.train(examples, epochs=args.epochs)
+    model.save(args.model)
+    out_of_scope = sum(1 for _, in_scope in examples if not in_scope)
+    print(f"Trained on {len(examples)} examples ({out_of_scope} out of scope), wrote {args.model}")
+
+
+if __name__ == "__main__":
+    main()
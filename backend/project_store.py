@@ -0,0 +1,407 @@
+"""
+Persistent project repository backed by SQLite.
+Historical engagements live in one table indexed by id, practice area, completion date and cost,
+with technology_stack entries in a side table for indexed membership filters. Listing uses keyset
+(cursor) pagination and column projection; a revision counter bumped on every write backs ETags,
+and a change log (the last revision that wrote each project id) lets derived aggregates refresh
+from just the rows written since they were built.
+
+Usage (from the backend directory):
+    python project_store.py import path/to/projects.csv --db projects.db --index path/to/index
+"""
+
+import argparse
+import base64
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+# Configuration
+PROJECT_DB_PATH = os.getenv("PROJECT_DB_PATH", "projects.db")
+PROJECTS_PAGE_SIZE = int(os.getenv("PROJECTS_PAGE_SIZE", "50"))
+PROJECTS_MAX_PAGE_SIZE = 500
+IMPORT_BATCH_SIZE = 1000
+
+# Record fields stored as columns; anything else is kept in the "extra" JSON column
+PROJECT_FIELDS = ("id", "title", "description", "cost", "duration", "client", "completion_date",
+                  "practice_area", "technology_stack")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    cost REAL,
+    duration TEXT,
+    client TEXT,
+    completion_date TEXT,
+    practice_area TEXT COLLATE NOCASE,
+    technology_stack TEXT NOT NULL DEFAULT '[]',
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_practice_area ON projects (practice_area, id);
+CREATE INDEX IF NOT EXISTS idx_projects_completion_date ON projects (completion_date, id);
+CREATE INDEX IF NOT EXISTS idx_projects_cost ON projects (cost, id);
+CREATE TABLE IF NOT EXISTS project_technologies (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    technology TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (technology, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_project_technologies_project ON project_technologies (project_id);
+CREATE TABLE IF NOT EXISTS project_changes (
+    project_id INTEGER PRIMARY KEY,
+    revision INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_project_changes_revision ON project_changes (revision);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('revision', 0);
+"""
+
+
+class InvalidQueryError(ValueError):
+    """Raised for malformed pagination cursors, projections or filter values"""
+
+
+def encode_cursor(last_id):
+    """Opaque pagination cursor for the row after last_id"""
+    return base64.urlsafe_b64encode(str(last_id).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii"))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidQueryError("Invalid cursor")
+
+
+def _technologies(value):
+    """Normalize technology_stack from a list, a JSON list string or a ';'/'|'-separated string"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        if value.lstrip().startswith("["):
+            value = json.loads(value)
+        else:
+            separator = ";" if ";" in value else "|"
+            value = value.split(separator)
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def normalize_project(project):
+    """Coerce an imported record (CSV cells are all strings) to typed fields: int id, numeric cost, list stack"""
+    try:
+        project_id = int(project["id"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidQueryError(f"Project record has no integer id: {project.get('id')!r}")
+    cost = project.get("cost")
+    if isinstance(cost, str):
+        cost = float(cost) if cost.strip() else None
+        cost = int(cost) if cost is not None and cost.is_integer() else cost
+    normalized = {key: value for key, value in project.items() if value != ""}
+    normalized.update(id=project_id, cost=cost, technology_stack=_technologies(project.get("technology_stack")))
+    return normalized
+
+
+def _row_values(project):
+    """Column values for one normalized project record"""
+    extra = {key: value for key, value in project.items() if key not in PROJECT_FIELDS}
+    return (
+        project["id"],
+        project.get("title") or "",
+        project.get("description") or "",
+        project.get("cost"),
+        project.get("duration") or None,
+        project.get("client") or None,
+        project.get("completion_date") or None,
+        project.get("practice_area") or None,
+        json.dumps(project["technology_stack"]),
+        json.dumps(extra) if extra else None,
+    )
+
+
+class ProjectStore:
+    """SQLite-backed project repository; one connection per thread, WAL so reads never block on writes"""
+
+    def __init__(self, path=PROJECT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def revision(self):
+        """Counter bumped by every write; changes whenever any listing or record could change"""
+        return self._connection().execute("SELECT value FROM store_meta WHERE key = 'revision'").fetchone()[0]
+
+    def count(self, **filters):
+        """Number of projects matching filters"""
+        where, params = self._where(filters)
+        return self._connection().execute(f"SELECT COUNT(*) FROM projects{where}", params).fetchone()[0]
+
+    def upsert_many(self, projects):
+        """Insert or replace project records in one transaction; returns the number written"""
+        rows = [_row_values(normalize_project(project)) for project in projects]
+        if not rows:
+            return 0
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO projects (id, title, description, cost, duration, client, completion_date, "
+                "practice_area, technology_stack, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            connection.executemany("DELETE FROM project_technologies WHERE project_id = ?", [(row[0],) for row in rows])
+            connection.executemany(
+                "INSERT OR IGNORE INTO project_technologies (project_id, technology) VALUES (?, ?)",
+                [(row[0], technology) for row in rows for technology in json.loads(row[8])]
+            )
+            self._log_changes(connection, [row[0] for row in rows])
+        return len(rows)
+
+    def delete(self, project_ids):
+        """Remove projects by id; returns the number deleted"""
+        connection = self._connection()
+        with connection:
+            deleted = connection.executemany("DELETE FROM projects WHERE id = ?", [(int(i),) for i in project_ids]).rowcount
+            self._log_changes(connection, [int(i) for i in project_ids])
+        return deleted
+
+    @staticmethod
+    def _log_changes(connection, project_ids):
+        """Bump the revision and record it against every written id (inside the write transaction)"""
+        connection.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'revision'")
+        connection.executemany(
+            "INSERT OR REPLACE INTO project_changes (project_id, revision) "
+            "SELECT ?, value FROM store_meta WHERE key = 'revision'", [(i,) for i in project_ids]
+        )
+
+    def changes_since(self, revision):
+        """
+        Project ids inserted, replaced or deleted after a revision.
+
+        Returns:
+            tuple: (current revision, list of changed ids); ids written after the current revision
+                was read are left for the next call
+        """
+        connection = self._connection()
+        current = self.revision()
+        if current == revision:
+            return current, []
+        rows = connection.execute(
+            "SELECT project_id FROM project_changes WHERE revision > ? AND revision <= ?", (revision, current)
+        ).fetchall()
+        return current, [row[0] for row in rows]
+
+    @staticmethod
+    def _columns(fields):
+        """SELECT list for a projection; id is always included so cursors keep working"""
+        if not fields:
+            return list(PROJECT_FIELDS) + ["extra"]
+        unknown = [field for field in fields if field not in PROJECT_FIELDS]
+        if unknown:
+            raise InvalidQueryError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(PROJECT_FIELDS)}")
+        return ["id"] + [field for field in dict.fromkeys(fields) if field != "id"]
+
+    @staticmethod
+    def _record(row):
+        """Project dict from a row, in the same shape the records were imported with"""
+        project = {}
+        for key in row.keys():
+            value = row[key]
+            if key == "technology_stack":
+                project[key] = json.loads(value)
+            elif key == "extra":
+                project.update(json.loads(value) if value else {})
+            elif key == "cost" and value is not None and value.is_integer():
+                project[key] = int(value)
+            elif value is not None or key in ("cost", "completion_date"):
+                project[key] = value
+        return project
+
+    @staticmethod
+    def _where(filters, after_id=None):
+        """WHERE clause and parameters for list/count filters (same names as VectorIndex filters)"""
+        clauses, params = [], []
+        if filters.get("practice_area"):
+            # Matches the practice area column or a technology_stack entry, like VectorIndex
+            clauses.append("(practice_area = ? OR id IN (SELECT project_id FROM project_technologies WHERE technology = ?))")
+            params += [filters["practice_area"]] * 2
+        technologies = filters.get("technology") or []
+        if technologies:
+            placeholders = ", ".join("?" * len(technologies))
+            clauses.append(f"id IN (SELECT project_id FROM project_technologies WHERE technology IN ({placeholders}))")
+            params += list(technologies)
+        for name, clause in (("min_cost", "cost >= ?"), ("max_cost", "cost <= ?"),
+                             ("completed_after", "completion_date >= ?"), ("completed_before", "completion_date <= ?")):
+            if filters.get(name) is not None:
+                clauses.append(clause)
+                params.append(filters[name])
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def get(self, project_id, fields=None):
+        """Return one project by id, or None"""
+        columns = ", ".join(self._columns(fields))
+        row = self._connection().execute(f"SELECT {columns} FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def get_many(self, project_ids):
+        """Full records for project ids, in id order; missing ids are skipped"""
+        project_ids = list(project_ids)
+        columns = ", ".join(self._columns(None))
+        connection = self._connection()
+        projects = []
+        for start in range(0, len(project_ids), PROJECTS_MAX_PAGE_SIZE):
+            batch = project_ids[start:start + PROJECTS_MAX_PAGE_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            rows = connection.execute(f"SELECT {columns} FROM projects WHERE id IN ({placeholders}) ORDER BY id", batch)
+            projects += [self._record(row) for row in rows]
+        return projects
+
+    def list(self, cursor=None, limit=PROJECTS_PAGE_SIZE, fields=None, **filters):
+        """
+        One page of projects in id order.
+
+        Args:
+            cursor (str): next_cursor from the previous page, or None for the first page
+            limit (int): Page size, capped at PROJECTS_MAX_PAGE_SIZE
+            fields (list): Columns to return (id is always included); None for full records
+            **filters: practice_area, technology (list, any-of), min_cost, max_cost,
+                completed_after, completed_before
+
+        Returns:
+            tuple: (list of project dicts, next_cursor or None on the last page)
+        """
+        limit = max(1, min(int(limit), PROJECTS_MAX_PAGE_SIZE))
+        after_id = decode_cursor(cursor) if cursor else None
+        columns = ", ".join(self._columns(fields))
+        where, params = self._where(filters, after_id)
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM projects{where} ORDER BY id LIMIT ?", params + [limit + 1]
+        ).fetchall()
+        projects = [self._record(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(projects[-1]["id"]) if len(rows) > limit else None
+        return projects, next_cursor
+
+    def analytics_rows(self, project_ids=None, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Yield (id, cost, duration, client, practice_area, technology_stack JSON, outcome) tuples,
+        for every project or only the given ids (missing ids are skipped).
+        """
+        query = ("SELECT id, cost, duration, client, practice_area, technology_stack, "
+                 "json_extract(extra, '$.outcome') FROM projects")
+        connection = self._connection()
+        if project_ids is None:
+            cursor = connection.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from (tuple(row) for row in rows)
+        project_ids = list(project_ids)
+        for start in range(0, len(project_ids), PROJECTS_MAX_PAGE_SIZE):
+            batch = project_ids[start:start + PROJECTS_MAX_PAGE_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            yield from (tuple(row) for row in connection.execute(f"{query} WHERE id IN ({placeholders})", batch))
+
+    def iter_all(self, batch_size=IMPORT_BATCH_SIZE):
+        """Yield every project record in id order, one page at a time"""
+        cursor = None
+        while True:
+            projects, cursor = self.list(cursor=cursor, limit=min(batch_size, PROJECTS_MAX_PAGE_SIZE))
+            yield from projects
+            if cursor is None:
+                return
+
+
+def iter_project_file(path):
+    """
+    Stream project records from a CSV (header row) or JSONL export without loading the file.
+
+    CSV technology_stack cells may hold a JSON list or ';'/'|'-separated values.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if key is not None}
+
+
+def import_projects(store, records, batch_size=IMPORT_BATCH_SIZE):
+    """Upsert an iterable of records into store in batches of batch_size; returns the number imported"""
+    total, batch = 0, []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            total += store.upsert_many(batch)
+            batch = []
+    return total + store.upsert_many(batch)
+
+
+def build_vector_index(store, embedding_service=None, batch_size=IMPORT_BATCH_SIZE):
+    """Similar-project index over every project in the store, embedded batch by batch"""
+    from vector_index import VectorIndex
+    index = VectorIndex(embedding_service.embed, embedding_service.dim, embedding_service.embed_queries) \
+        if embedding_service else VectorIndex()
+    batch = []
+    for project in store.iter_all(batch_size):
+        batch.append(project)
+        if len(batch) >= batch_size:
+            index.add(batch)
+            batch = []
+    if batch:
+        index.add(batch)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import a CSV or JSONL project export")
+    import_parser.add_argument("path", help="CSV (with header) or .jsonl file")
+    import_parser.add_argument("--db", default=PROJECT_DB_PATH)
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.add_argument("--index", help="Also build similar-project index snapshots (vector and BM25) at this directory")
+    import_parser.add_argument("--embedding-backend", choices=["hashing", "azure"], default=None,
+                               help="Embedding backend for --index (default: EMBEDDING_BACKEND)")
+    args = parser.parse_args()
+
+    store = ProjectStore(args.db)
+    total = import_projects(store, iter_project_file(args.path), args.batch_size)
+    print(f"Imported {total} projects into {args.db} ({store.count()} total)")
+    if args.index:
+        from embeddings import EmbeddingService, HashingEmbeddingBackend, azure_backend_from_env, default_backend
+        backend = {"hashing": HashingEmbeddingBackend, "azure": azure_backend_from_env}.get(args.embedding_backend, default_backend)()
+        service = EmbeddingService(backend)
+        from lexical_index import BM25Index
+        index = build_vector_index(store, service, args.batch_size)
+        index.save(args.index)
+        lexical = BM25Index()
+        lexical.add(index.records)
+        lexical.save(args.index)
+        print(f"Embedding stats: {service.stats()}")
+        print(f"Wrote similar-project index to {args.index}")
+
+
+if __name__ == "__main__":
+    main()
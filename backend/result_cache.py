@@ -0,0 +1,201 @@
+"""
+Content-addressed cache for extracted RFP text and AI decisions.
+Two tiers: an in-memory LRU with TTL in front of a JSON-on-disk store that survives restarts.
+The disk tier is bounded too: entries past the TTL and, once the namespace exceeds its size cap,
+the least recently used entries are deleted as new ones are written.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configuration
+CACHE_FOLDER = os.getenv("RESULT_CACHE_FOLDER", "cache")
+CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_PERSIST = os.getenv("RESULT_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+CACHE_MAX_DISK_BYTES = int(float(os.getenv("RESULT_CACHE_MAX_DISK_MB", "512")) * 1024 * 1024)  # per namespace
+
+# Bump when the extraction or decision logic changes so stale entries are not served
+# 2: layout-aware PDF extraction (section headings and tables)
+CACHE_VERSION = "2"
+
+
+def content_hash(*parts):
+    """Return a SHA-256 hex digest over bytes/str parts, separated so boundaries are unambiguous"""
+    digest = hashlib.sha256(CACHE_VERSION.encode("utf-8"))
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def stream_hash(stream, chunk_size=1024 * 1024):
+    """Hash a file-like object in chunks and rewind it"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU + TTL memory cache backed by one JSON file per entry on disk, capped at max_disk_bytes"""
+
+    def __init__(self, namespace, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS,
+                 folder=CACHE_FOLDER, persist=CACHE_PERSIST, max_disk_bytes=CACHE_MAX_DISK_BYTES):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.folder = os.path.join(folder, namespace) if persist else None
+        self._entries = OrderedDict()  # key -> (created_at, value)
+        self._disk = None  # key -> (created_at, bytes) of files on disk, least recently used first; scanned on first use
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.json")
+
+    def _disk_index(self):
+        """Entries on disk, scanned once (oldest write first) with expired files deleted (lock held)"""
+        if self._disk is None:
+            found = []
+            for root, _, names in os.walk(self.folder):
+                for name in names:
+                    if not name.endswith(".json"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                        if self._expired(stat.st_mtime):
+                            os.remove(path)
+                            continue
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+            found.sort()
+            self._disk = OrderedDict((key, (created_at, size)) for created_at, key, size in found)
+            self._disk_bytes = sum(size for _, _, size in found)
+        return self._disk
+
+    def _forget_file(self, key):
+        """Drop a disk entry from the index and delete its file (lock held)"""
+        _, size = self._disk.pop(key)
+        self._disk_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _trim_disk(self):
+        """Delete expired entries at the cold end, then least recently used ones beyond the size cap (lock held)"""
+        disk = self._disk_index()
+        while disk:
+            key, (created_at, _) = next(iter(disk.items()))
+            if not self._expired(created_at) and (self.max_disk_bytes is None or self._disk_bytes <= self.max_disk_bytes):
+                break
+            self._forget_file(key)
+            self.disk_evictions += 1
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key, created_at, value):
+        """Insert into the memory tier, evicting least recently used entries (lock held)"""
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.folder:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    record = json.load(file)
+                if not self._expired(record["created_at"]):
+                    with self._lock:
+                        self._remember(key, record["created_at"], record["value"])
+                        self.disk_hits += 1
+                        if key in self._disk_index():
+                            self._disk.move_to_end(key)
+                    return record["value"]
+                with self._lock:
+                    if key in self._disk_index():
+                        self._forget_file(key)
+                    else:
+                        os.remove(path)
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key in both tiers"""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, value)
+
+        if self.folder:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    json.dump({"created_at": created_at, "value": value}, file)
+                    size = file.tell()
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Warning: could not persist {self.namespace} cache entry: {e}")
+                return
+            with self._lock:
+                disk = self._disk_index()
+                if key in disk:
+                    self._disk_bytes -= disk.pop(key)[1]
+                disk[key] = (created_at, size)
+                self._disk_bytes += size
+                self._trim_disk()
+
+    def stats(self):
+        """Hit/miss counters for the health endpoint"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_bytes": self._disk_bytes if self._disk is not None else None,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared caches used by the upload path
+text_cache = ResultCache("text")
+decision_cache = ResultCache("decisions")
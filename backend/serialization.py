@@ -0,0 +1,219 @@
+"""
+Response serialization: fast JSON encoding, cached project record encodings, compression and NDJSON.
+JSON is encoded with orjson when it is installed (several times faster than the json module, and it
+emits bytes directly) and with the json module otherwise. Project records only change when the store
+writes them, so their encodings are cached per id and dropped when the store's change log names the
+id again; a page of projects is assembled from cached bytes instead of re-reading and re-encoding
+every record. Bodies are compressed for the client's Accept-Encoding (brotli when the brotli package
+is installed, else gzip) once they are large enough to benefit.
+"""
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configuration
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))  # smaller bodies go as-is
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "1"))  # about 4x smaller JSON for less CPU than jsonify costs; raise when bandwidth-bound
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))  # 4-5 is the speed/size sweet spot for dynamic content
+PROJECT_ENCODING_CACHE_SIZE = int(os.getenv("PROJECT_ENCODING_CACHE_SIZE", "50000"))
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _default(value):
+    """Encode numpy scalars and arrays (similarity scores, embeddings) that neither encoder takes natively"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    """Compact UTF-8 JSON bytes for value"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_array(encoded_items):
+    """JSON array bytes from already-encoded items"""
+    return b"[" + b",".join(encoded_items) + b"]"
+
+
+def json_object(**members):
+    """JSON object bytes whose members are bytes (already encoded, inserted as-is) or plain values"""
+    parts = [dumps(name) + b":" + (value if isinstance(value, bytes) else dumps(value)) for name, value in members.items()]
+    return b"{" + b",".join(parts) + b"}"
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Best content coding the client accepts.
+
+    Args:
+        accept_encoding (str): Accept-Encoding request header
+
+    Returns:
+        str: "br", "gzip" or None for an uncompressed response
+    """
+    if not RESPONSE_COMPRESSION or not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    available = (["br"] if brotli is not None else []) + ["gzip"]
+    ranked = [(accepted.get(coding, accepted.get("*", 0.0)), -rank, coding) for rank, coding in enumerate(available)]
+    quality, _, coding = max(ranked)
+    return coding if quality > 0 else None
+
+
+def compress(body, encoding):
+    """body compressed with a coding from negotiate_encoding (None returns it unchanged)"""
+    if encoding == "br":
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+    return body
+
+
+def encode_body(body, accept_encoding):
+    """
+    Compress a response body for the client when it is worth it.
+
+    Returns:
+        tuple: (body bytes, dict of headers to add: Vary, plus Content-Encoding when compressed)
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= RESPONSE_COMPRESS_MIN_BYTES else None
+    if encoding is None:
+        return body, headers
+    headers["Content-Encoding"] = encoding
+    return compress(body, encoding), headers
+
+
+def encoded_etag(etag, accept_encoding):
+    """
+    ETag of the representation encode_body sends for accept_encoding. Each content coding gets its
+    own suffix, so a cache holding a gzip body never revalidates it as the identity one. The suffix
+    follows the negotiated coding even when the body turns out too small to compress: the tag then
+    still names exactly one set of bytes.
+
+    Args:
+        etag (str): ETag of the uncompressed body (without quotes)
+        accept_encoding (str): Accept-Encoding request header
+
+    Returns:
+        str: etag, or etag with a "-gzip"/"-br" suffix
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of byte chunks incrementally, flushing after each so streamed lines arrive promptly"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=RESPONSE_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    elif encoding == "gzip":
+        compressor = zlib.compressobj(RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    else:
+        yield from chunks
+
+
+def wants_ndjson(args, accept):
+    """True when a list endpoint should stream NDJSON (format=ndjson or an Accept header asking for it)"""
+    return args.get("format") == "ndjson" or NDJSON_MIMETYPE in (accept or "")
+
+
+class ProjectEncodings:
+    """LRU of encoded project records, kept in step with the project store's change log; thread-safe"""
+
+    def __init__(self, store, max_entries=PROJECT_ENCODING_CACHE_SIZE):
+        self.store = store
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._revision = store.revision()
+        self.hits = 0
+        self.misses = 0
+
+    def _refresh(self):
+        """Drop encodings of projects written since the last call"""
+        revision, changed = self.store.changes_since(self._revision)
+        if revision == self._revision:
+            return
+        with self._lock:
+            for project_id in changed:
+                self._entries.pop(project_id, None)
+            self._revision = max(self._revision, revision)
+
+    def records(self, project_ids, remember=True):
+        """
+        Encoded records for project ids, in order; ids not in the store are skipped.
+
+        Args:
+            project_ids (list): Project ids
+            remember (bool): Cache records read from the store; off for one-off exports so they
+                do not evict the pages clients keep asking for
+        """
+        self._refresh()
+        with self._lock:
+            revision = self._revision
+            found = {}
+            for project_id in project_ids:
+                encoded = self._entries.get(project_id)
+                if encoded is not None:
+                    self._entries.move_to_end(project_id)
+                    found[project_id] = encoded
+            self.hits += len(found)
+        missing = [project_id for project_id in project_ids if project_id not in found]
+        if missing:
+            loaded = {project["id"]: dumps(project) for project in self.store.get_many(missing)}
+            found.update(loaded)
+            with self._lock:
+                self.misses += len(missing)
+                # A write that landed while reading was already dropped from the cache by another
+                # caller's refresh: keeping what was read could pin the old record
+                if remember and revision == self._revision:
+                    self._entries.update(loaded)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return [found[project_id] for project_id in project_ids if project_id in found]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "encoder": JSON_ENCODER,
+                "compression": ["br", "gzip"] if brotli is not None else ["gzip"],
+                "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "memory_bytes": sum(len(encoded) for encoded in self._entries.values()),
+            }
@@ -9,6 +9,7 @@ from azure.search.documents.models import VectorizedQuery
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI
 from openai import AzureOpenAI
+from embeddings import EmbeddingService, AzureOpenAIEmbeddingBackend
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +33,9 @@ aoai_client = AzureOpenAI(
     api_version="2023-05-15"
 )
 
+# Batched, cached embeddings per model: repeated texts are never sent twice
+embedding_services = {}
+
 primary_llm = AzureChatOpenAI(
     azure_deployment=AOAI_DEPLOYMENT,
     api_version="2024-05-01-preview",
@@ -113,7 +117,22 @@ def generate_embeddings(text, model="text-embedding-ada-002"):
     Returns:
         list: Embedding vector
     """
-    return aoai_client.embeddings.create(input=[text], model=model).data[0].embedding
+    return generate_embeddings_batch([text], model)[0]
+
+def generate_embeddings_batch(texts, model="text-embedding-ada-002"):
+    """
+    Generate embeddings for many texts with as few Azure OpenAI requests as possible.
+    
+    Args:
+        texts (list): Texts to generate embeddings for; cached and duplicate texts are not re-sent
+        model (str): Embedding model name
+        
+    Returns:
+        list: One embedding vector per text
+    """
+    if model not in embedding_services:
+        embedding_services[model] = EmbeddingService(AzureOpenAIEmbeddingBackend(aoai_client, model))
+    return embedding_services[model].embed(texts).tolist()
 
 if __name__ == "__main__":
     # Example LLM call
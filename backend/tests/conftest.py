@@ -0,0 +1,25 @@
+"""
+Shared test setup. The backend modules read their configuration at import, so every cache, database
+and model path is pointed at a temporary directory (and the Azure OpenAI settings are cleared, which
+puts the app in mock mode) before any test imports them.
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = tempfile.mkdtemp(prefix="rfp-backend-tests-")
+
+os.environ.update(
+    RESULT_CACHE_FOLDER=os.path.join(STATE_DIR, "cache"),
+    PROJECT_DB_PATH=os.path.join(STATE_DIR, "projects.db"),
+    PRESCREEN_MODEL_PATH=os.path.join(STATE_DIR, "prescreen_model.npz"),
+    UPLOAD_PERSIST="false",
+    STARTUP_MODE="lazy",
+)
+for name in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_DEPLOYMENTS"):
+    os.environ.pop(name, None)
+
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(1, os.path.join(BACKEND_DIR, "benchmarks"))  # synthetic document generators
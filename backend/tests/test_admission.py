@@ -0,0 +1,106 @@
+"""Admission control: requests are shed with a Retry-After instead of waiting past their deadline"""
+
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejectedError
+
+
+def busy_controller(**kwargs):
+    """A one-slot controller with its slot taken; returns (controller, release function)"""
+    settings = {"max_concurrent": 1, "service_seconds": 10, "max_wait_seconds": 30}
+    settings.update(kwargs)
+    controller = AdmissionController(**settings)
+    slot = controller.slot()
+    slot.__enter__()
+    return controller, lambda: slot.__exit__(None, None, None)
+
+
+def test_free_slot_is_taken_without_waiting():
+    controller = AdmissionController(max_concurrent=2, service_seconds=10)
+    with controller.slot(deadline=0), controller.slot(deadline=0):
+        assert controller.stats()["in_flight"] == 2
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_estimated_wait_past_deadline_is_shed():
+    controller, release = busy_controller()
+    try:
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            controller.check("normal", 0, deadline=5)
+        assert rejected.value.retry_after >= 1
+        with pytest.raises(AdmissionRejectedError):
+            with controller.slot("normal", 0, deadline=5):
+                pass
+        assert controller.stats()["shed"] == 2
+        controller.check("normal", 0, deadline=60)  # a 10s estimate is within a 60s deadline
+    finally:
+        release()
+
+
+def test_no_deadline_is_never_shed():
+    controller, release = busy_controller()
+    try:
+        controller.check("low", 0, deadline=None)
+        granted = threading.Event()
+
+        def wait_for_slot():
+            with controller.slot("low", 0, deadline=None):
+                granted.set()
+
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        time.sleep(0.05)
+        assert not granted.is_set()
+    finally:
+        release()
+    waiter.join(5)
+    assert granted.is_set()
+    assert controller.stats()["shed"] == 0
+
+
+def test_full_queue_is_shed():
+    controller, release = busy_controller(max_queue=0)
+    try:
+        with pytest.raises(AdmissionRejectedError):
+            controller.check("urgent", 0, deadline=1000)
+    finally:
+        release()
+
+
+def test_wait_that_outlasts_deadline_times_out():
+    controller, release = busy_controller(service_seconds=0.01)
+    try:
+        with pytest.raises(AdmissionRejectedError):
+            with controller.slot("normal", 0, deadline=0.05):
+                pass
+        assert controller.stats()["timed_out"] == 1
+    finally:
+        release()
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_urgent_waiter_goes_first():
+    controller, release = busy_controller()
+    order = []
+
+    def wait_for_slot(priority):
+        with controller.slot(priority, 0, deadline=None):
+            order.append(priority)
+
+    waiters = [threading.Thread(target=wait_for_slot, args=(priority,)) for priority in ("low", "normal", "urgent")]
+    for waiter in waiters:
+        waiter.start()
+        time.sleep(0.02)
+    release()
+    for waiter in waiters:
+        waiter.join(5)
+    assert order == ["urgent", "normal", "low"]
+
+
+def test_disabled_controller_admits_everything():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, enabled=False)
+    with controller.slot(deadline=0), controller.slot(deadline=0):
+        controller.check("low", 0, deadline=0)
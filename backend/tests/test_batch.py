@@ -0,0 +1,133 @@
+"""Batch evaluation: throttle detection, backoff and cancellation"""
+
+import threading
+import time
+import types
+
+import pytest
+
+import batch
+from batch import BatchEvaluator, TokenBucket, call_with_backoff
+from llm_utils import is_throttling_error, retry_after_seconds
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class StatusError(Exception):
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(batch.time, "sleep", delays.append)
+    return delays
+
+
+def test_throttling_is_decided_by_status_or_type():
+    assert is_throttling_error(StatusError("slow down", 429))
+    assert is_throttling_error(types.SimpleNamespace(response=types.SimpleNamespace(status_code=429)))
+    assert is_throttling_error(RateLimitError("rate limited"))
+    # Messages that merely mention 429 are not throttling
+    assert not is_throttling_error(ValueError("could not parse page 429"))
+    assert not is_throttling_error(StatusError("request 429 failed", 500))
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(StatusError("", 429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(StatusError("", 429, {"retry-after": "3"})) == 3
+    assert retry_after_seconds(StatusError("", 429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+def test_backoff_retries_throttling_then_succeeds(no_sleep):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StatusError("throttled", 429, {"retry-after": "2"})
+        return "decision"
+
+    assert call_with_backoff(flaky, max_retries=4) == ("decision", 2)
+    assert len(no_sleep) == 2
+    assert all(1.6 <= delay <= 2.4 for delay in no_sleep)  # Retry-After with jitter
+
+
+def test_backoff_gives_up(no_sleep):
+    def throttled():
+        raise StatusError("throttled", 429)
+
+    with pytest.raises(StatusError):
+        call_with_backoff(throttled, max_retries=2, base_delay=1)
+    assert len(no_sleep) == 2
+
+
+def test_backoff_does_not_retry_other_errors(no_sleep):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("page 429 is unreadable")
+
+    with pytest.raises(ValueError):
+        call_with_backoff(broken, max_retries=4)
+    assert len(calls) == 1 and no_sleep == []
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.09  # five refills at 50 per second
+
+
+def evaluator(decide, **kwargs):
+    def extract(upload):
+        if upload["original_name"] == "broken.pdf":
+            raise ValueError("unreadable PDF")
+        return f"text of {upload['original_name']}"
+
+    return BatchEvaluator(extract, lambda text: [{"id": 1}], decide, lambda error: {"recommendation": "DECLINE"},
+                          requests_per_minute=0, **kwargs)
+
+
+def test_every_upload_gets_one_result(no_sleep):
+    def decide(text, projects):
+        if "flaky" in text:
+            raise RuntimeError("LLM down")
+        return {"recommendation": "PURSUE"}
+
+    uploads = [{"original_name": name} for name in ("a.pdf", "broken.pdf", "flaky.txt", "b.txt")]
+    results = {result["file"]: result for result in evaluator(decide, max_retries=0).run(uploads)}
+    assert set(results) == {"a.pdf", "broken.pdf", "flaky.txt", "b.txt"}
+    assert results["a.pdf"]["ai_decision"] == {"recommendation": "PURSUE"}
+    assert results["broken.pdf"] == {"file": "broken.pdf", "success": False, "error": "unreadable PDF"}
+    assert results["flaky.txt"]["ai_decision"] == {"recommendation": "DECLINE"}  # fallback
+    assert results["flaky.txt"]["retries"] is None
+
+
+def test_closing_the_stream_cancels_queued_uploads():
+    decided = []
+    lock = threading.Lock()
+
+    def decide(text, projects):
+        time.sleep(0.05)
+        with lock:
+            decided.append(text)
+        return {"recommendation": "PURSUE"}
+
+    results = evaluator(decide, max_in_flight=2, extraction_workers=2).run(
+        [{"original_name": f"rfp{i}.txt"} for i in range(40)])
+    next(results)
+    started = time.monotonic()
+    results.close()
+    assert time.monotonic() - started < 1  # does not wait for the remaining uploads
+    time.sleep(0.3)
+    assert len(decided) < 10
@@ -0,0 +1,68 @@
+"""Benchmark suite helpers: regression comparison, percentiles and the synthetic RFP generators"""
+
+import random
+
+from bench_suite import compare, upload_requests
+from common import percentile
+from pdf_extraction import count_pages, extract_pdf_pages
+from synthetic import synthetic_pdf_bytes, synthetic_projects, synthetic_txt_bytes
+
+
+def results(commit, **scenarios):
+    return {"commit": commit, "scenarios": scenarios}
+
+
+def test_compare_counts_regressions_in_either_direction():
+    baseline = results("abc1234", upload_txt_1p={"throughput_rps": 100.0, "p95_ms": 200.0, "peak_rss_mb": 300.0},
+                       projects_list={"throughput_rps": 500.0, "p95_ms": 20.0})
+    current = results("def5678", upload_txt_1p={"throughput_rps": 85.0, "p95_ms": 230.0, "peak_rss_mb": 305.0},
+                      projects_list={"throughput_rps": 600.0, "p95_ms": 10.0}, project_detail={"p95_ms": 5.0})
+    # Throughput down 15% and p95 up 15% regress at 10%; RSS up 1.7% and the improvements do not
+    assert compare(baseline, current, threshold=0.10) == 2
+    assert compare(baseline, current, threshold=0.20) == 0
+
+
+def test_compare_skips_missing_and_zero_baselines():
+    baseline = results("abc1234", projects_list={"throughput_rps": 0.0, "p50_ms": None})
+    current = results("def5678", projects_list={"throughput_rps": 50.0, "p50_ms": 9.0})
+    assert compare(baseline, current, threshold=0.10) == 0
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) is None
+
+
+def test_synthetic_pdf_is_readable_and_reproducible():
+    pdf = synthetic_pdf_bytes(3, lines_per_page=5, seed=7)
+    assert pdf == synthetic_pdf_bytes(3, lines_per_page=5, seed=7)
+    assert pdf != synthetic_pdf_bytes(3, lines_per_page=5, seed=8)
+    assert count_pages(pdf) == 3
+    pages = extract_pdf_pages(pdf, max_workers=1)
+    assert pages[0].startswith("SECTION 1. SCOPE OF WORK")
+    assert "Unit Price" in extract_pdf_pages(synthetic_pdf_bytes(1, tables=True), max_workers=1)[0]
+
+
+def test_synthetic_txt_matches_the_pdf_text():
+    text = synthetic_txt_bytes(2, lines_per_page=5, seed=7).decode("utf-8")
+    pages = text.split("\n\n")
+    assert len(pages) == 2
+    assert all(len(page.splitlines()) == 5 for page in pages)
+    assert pages[1].splitlines()[0] == "SECTION 2. EVALUATION CRITERIA"
+
+
+def test_uploads_are_unique():
+    for kind in ("txt", "pdf"):
+        requests = upload_requests(kind, 1, 3, seed=11)
+        contents = {kwargs["files"]["file"][1] for _, _, kwargs in requests}
+        assert len(contents) == 3
+
+
+def test_synthetic_projects():
+    projects = synthetic_projects(50, random.Random(0))
+    assert [project["id"] for project in projects] == list(range(50))
+    assert all(len(project["technology_stack"]) == 3 and project["cost"] >= 50_000 for project in projects)
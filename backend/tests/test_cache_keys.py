@@ -0,0 +1,128 @@
+"""Cache keys and fingerprints: anything that changes a result must change the key it is cached under"""
+
+import time
+import types
+
+import pytest
+from pydantic import BaseModel
+
+import app
+import result_cache
+from decision_chain import PreparedChain
+from near_duplicates import NearDuplicateIndex
+from result_cache import ResultCache, content_hash
+
+SIMILAR_PROJECTS = [{"id": 1, "title": "Regulatory review", "similarity_score": 0.8},
+                    {"id": 2, "title": "Contract audit", "similarity_score": 0.7}]
+RFP_TEXT = " ".join(f"Clause {i}: the contractor shall provide legal review of regulatory filings." for i in range(60))
+
+
+class Decision(BaseModel):
+    recommendation: str
+
+
+class FakeLLM:
+    def with_structured_output(self, schema, **kwargs):
+        return None
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    """A stand-in decision chain whose fingerprint tests can change"""
+    chain = types.SimpleNamespace(fingerprint="prompt-v1")
+    monkeypatch.setattr(app, "decision_chain", chain)
+    return chain
+
+
+def test_content_hash_covers_cache_version(monkeypatch):
+    before = content_hash("rfp")
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", "next")
+    assert content_hash("rfp") != before
+
+
+def test_content_hash_separates_parts():
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+
+
+def test_upload_text_key_follows_extraction_budget(monkeypatch):
+    before = app.upload_cache_keys("digest", "pdf")
+    monkeypatch.setattr(app, "DOCUMENT_MAX_PAGES", app.DOCUMENT_MAX_PAGES + 10)
+    after = app.upload_cache_keys("digest", "pdf")
+    # The parsed document does not depend on the budget; the text cut from it does
+    assert after["document_key"] == before["document_key"]
+    assert after["text_key"] != before["text_key"]
+    assert app.upload_cache_keys("digest", "txt")["document_key"] != before["document_key"]
+
+
+def test_decision_key_changes_with_prompt_model_and_projects(chain, monkeypatch):
+    key = app.decision_cache_key(RFP_TEXT, SIMILAR_PROJECTS)
+    assert app.decision_cache_key(RFP_TEXT, SIMILAR_PROJECTS) == key
+    assert app.decision_cache_key(RFP_TEXT + " Addendum 1.", SIMILAR_PROJECTS) != key
+    assert app.decision_cache_key(RFP_TEXT, SIMILAR_PROJECTS[:1]) != key
+
+    chain.fingerprint = "prompt-v2"
+    assert app.decision_cache_key(RFP_TEXT, SIMILAR_PROJECTS) != key
+    chain.fingerprint = "prompt-v1"
+    monkeypatch.setattr(app, "AOAI_TEMPERATURE", app.AOAI_TEMPERATURE + 0.5)
+    assert app.decision_cache_key(RFP_TEXT, SIMILAR_PROJECTS) != key
+
+
+def test_prepared_chain_fingerprint_covers_schema_and_static_messages():
+    messages = [{"role": "system", "content": "You advise a legal services firm."}]
+    fingerprint = PreparedChain(FakeLLM(), Decision, messages).fingerprint
+    assert PreparedChain(FakeLLM(), Decision, messages).fingerprint == fingerprint
+    assert PreparedChain(FakeLLM(), Decision, [{"role": "system", "content": "Be brief."}]).fingerprint != fingerprint
+    assert PreparedChain(FakeLLM(), app.AIDecisionResponse, messages).fingerprint != fingerprint
+
+
+def test_near_duplicate_context_follows_prompt_and_top_projects(chain):
+    context = app.near_duplicate_context(SIMILAR_PROJECTS)
+    # Similarity scores move with every upload; only which projects support the decision matters
+    rescored = [dict(project, similarity_score=0.5) for project in SIMILAR_PROJECTS]
+    assert app.near_duplicate_context(rescored) == context
+    assert app.near_duplicate_context(SIMILAR_PROJECTS[::-1]) != context
+    chain.fingerprint = "prompt-v2"
+    assert app.near_duplicate_context(SIMILAR_PROJECTS) != context
+
+
+def test_near_duplicate_lookup_is_scoped_to_context():
+    index = NearDuplicateIndex(persist=False)
+    index.add(RFP_TEXT, {"recommendation": "PURSUE"}, context="prompt-v1")
+    reissued = RFP_TEXT.replace("Clause 59", "Clause 59 (amended)")
+
+    match = index.lookup(reissued, context="prompt-v1")
+    assert match["recommendation"] == "PURSUE"
+    assert match["near_duplicate"]["similarity"] >= index.threshold
+    assert index.lookup(reissued, context="prompt-v2") is None
+
+
+def test_near_duplicate_lookup_ignores_expired_decisions(monkeypatch):
+    index = NearDuplicateIndex(persist=False, ttl_seconds=60)
+    index.add(RFP_TEXT, {"recommendation": "PURSUE"})
+    assert index.lookup(RFP_TEXT) is not None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert index.lookup(RFP_TEXT) is None
+
+
+def test_result_cache_expires_entries(tmp_path, monkeypatch):
+    cache = ResultCache("decisions", folder=str(tmp_path), ttl_seconds=60)
+    cache.set("key", {"recommendation": "PURSUE"})
+    assert cache.get("key") == {"recommendation": "PURSUE"}
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("key") is None
+    # A fresh process does not serve the expired file from disk either
+    assert ResultCache("decisions", folder=str(tmp_path), ttl_seconds=60).get("key") is None
+
+
+def test_result_cache_disk_cap_evicts_least_recently_used(tmp_path):
+    cache = ResultCache("text", folder=str(tmp_path), max_entries=1, max_disk_bytes=300)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.set(key, "x" * 100)
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 300
+    assert stats["disk_evictions"] >= 1
+    reopened = ResultCache("text", folder=str(tmp_path), max_entries=1, max_disk_bytes=300)
+    assert reopened.get("aa1") is None
+    assert reopened.get("cc3") == "x" * 100
@@ -0,0 +1,70 @@
+"""Document artifacts: extraction resumes from the artifact, and the store stays within its TTL and size cap"""
+
+import time
+
+from document_store import BLOCK_HEADING, BLOCK_TEXT, DocumentStore, build_artifact
+from synthetic import synthetic_pdf_bytes
+
+
+def artifact(key, chars=100):
+    return build_artifact(key, 1, [[(BLOCK_HEADING, "SCOPE OF WORK"), (BLOCK_TEXT, "x" * chars)]])
+
+
+def test_extraction_resumes_from_the_artifact(tmp_path):
+    store = DocumentStore(str(tmp_path), persist=True)
+    pdf = synthetic_pdf_bytes(4, lines_per_page=10, tables=True)
+
+    partial = store.get_or_extract("ab12", pdf, max_pages=2)
+    assert (partial.pages_extracted, partial.page_count) == (2, 4)
+    whole = store.get_or_extract("ab12", pdf)
+    assert whole.complete
+    assert whole.page_text(0) == partial.page_text(0)
+    assert store.get_or_extract("ab12", pdf, max_pages=2) is not None
+    assert store.stats()["extractions"] == 2
+    assert store.stats()["resumed"] == 1
+    assert store.stats()["artifact_hits"] == 1
+    assert store.stats()["pages_extracted"] == 4
+
+    document = DocumentStore(str(tmp_path), persist=True).load("ab12")
+    assert document.complete
+    assert document.headings()[0] == (0, "SECTION 1. SCOPE OF WORK")
+    assert document.tables()
+
+
+def test_memory_store_evicts_least_recently_used():
+    size = len(artifact("aa1"))
+    store = DocumentStore(persist=False, max_bytes=2 * size)
+    store._save("aa1", artifact("aa1"))
+    store._save("bb2", artifact("bb2"))
+    assert store.load("aa1") is not None  # now the most recently used
+    store._save("cc3", artifact("cc3"))
+    assert store.load("bb2") is None
+    assert store.load("aa1").section("scope") == "SCOPE OF WORK\n" + "x" * 100 + "\n\n"
+    assert store.stats()["bytes"] <= 2 * size
+    assert store.stats()["evictions"] == 1
+
+
+def test_disk_cap_evicts_least_recently_used(tmp_path):
+    size = len(artifact("aa1"))
+    store = DocumentStore(str(tmp_path), persist=True, max_bytes=2 * size)
+    for key in ("aa1", "bb2", "cc3"):
+        store._save(key, artifact(key))
+    assert store.stats()["bytes"] <= 2 * size
+    assert store.stats()["evictions"] == 1
+    reopened = DocumentStore(str(tmp_path), persist=True, max_bytes=2 * size)
+    assert reopened.load("aa1") is None
+    assert reopened.load("cc3") is not None
+
+
+def test_expired_artifacts_are_dropped(tmp_path, monkeypatch):
+    stores = [DocumentStore(str(tmp_path), persist=True, ttl_seconds=60), DocumentStore(persist=False, ttl_seconds=60)]
+    for store in stores:
+        store._save("aa1", artifact("aa1"))
+        assert store.load("aa1") is not None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    for store in stores:
+        assert store.load("aa1") is None
+    # A fresh process does not map the expired file either
+    assert DocumentStore(str(tmp_path), persist=True, ttl_seconds=60).load("aa1") is None
+    assert not list(tmp_path.rglob("*.doc"))
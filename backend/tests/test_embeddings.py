@@ -0,0 +1,62 @@
+"""Embedding service: deduplicated, cached requests, and the vector dimension follows the deployed model"""
+
+import types
+
+import pytest
+
+from embeddings import AzureOpenAIEmbeddingBackend, EmbeddingCache, EmbeddingService
+
+
+class FakeEmbeddingsClient:
+    """Stand-in for the openai client's embeddings API, answering with dim-sized vectors in reverse order"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.requests = []
+        self.embeddings = self
+
+    def create(self, input, model):
+        self.requests.append(list(input))
+        data = [types.SimpleNamespace(index=index, embedding=[float(len(text))] * self.dim)
+                for index, text in enumerate(input)]
+        return types.SimpleNamespace(data=data[::-1])
+
+
+def service(client, tmp_path, dim=None):
+    backend = AzureOpenAIEmbeddingBackend(client, "text-embedding-3-large", dim=dim)
+    return EmbeddingService(backend, EmbeddingCache(backend.name, backend.dim, folder=str(tmp_path), persist=True))
+
+
+def test_dimension_is_learned_from_the_first_response(tmp_path):
+    client = FakeEmbeddingsClient(3072)
+    embeddings = service(client, tmp_path)
+    vectors = embeddings.embed(["scope of work", "budget", "scope of work"])
+    assert vectors.shape == (3, 3072)
+    assert vectors[1][0] == len("budget")  # rows follow the input index, not the response order
+    assert embeddings.dim == 3072
+    assert client.requests == [["scope of work", "budget"]]
+
+
+def test_dimension_without_a_response_probes_once(tmp_path):
+    client = FakeEmbeddingsClient(256)
+    embeddings = service(client, tmp_path)
+    assert embeddings.dim == 256
+    assert embeddings.dim == 256
+    assert len(client.requests) == 1
+    assert len(embeddings.cache) == 0  # the probe vector is not kept
+
+
+def test_dimension_is_read_from_the_cache_file(tmp_path):
+    service(FakeEmbeddingsClient(3072), tmp_path).embed(["scope of work"])
+    client = FakeEmbeddingsClient(3072)
+    embeddings = service(client, tmp_path)
+    assert embeddings.dim == 3072
+    assert embeddings.embed(["scope of work"]).shape == (1, 3072)
+    assert client.requests == []
+
+
+def test_mismatched_dimension_is_rejected(tmp_path):
+    embeddings = service(FakeEmbeddingsClient(1536), tmp_path, dim=3072)
+    with pytest.raises(ValueError, match="1536-dimensional"):
+        embeddings.embed(["scope of work"])
+    assert embeddings.dim == 3072
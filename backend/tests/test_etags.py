@@ -0,0 +1,92 @@
+"""Conditional GET of project responses: ETags per store revision, query and content coding"""
+
+import gzip
+
+import pytest
+
+import app
+import serialization
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Compress even small bodies so both endpoints have a gzip representation
+    monkeypatch.setattr(serialization, "RESPONSE_COMPRESS_MIN_BYTES", 0)
+    return app.app.test_client()
+
+
+@pytest.fixture
+def project_id(client):
+    return client.get("/api/projects?limit=1").get_json()["projects"][0]["id"]
+
+
+def paths(project_id):
+    return ["/api/projects?limit=5", f"/api/project/{project_id}"]
+
+
+def test_matching_etag_is_not_modified(client, project_id):
+    for path in paths(project_id):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-cache"
+        etag = response.headers["ETag"]
+
+        revalidated = client.get(path, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+        assert revalidated.headers["Vary"] == "Accept-Encoding"
+        assert revalidated.get_data() == b""
+        assert client.get(path, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+
+def test_each_content_coding_has_its_own_etag(client, project_id):
+    for path in paths(project_id):
+        identity = client.get(path)
+        compressed = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(compressed.get_data()) == identity.get_data()
+        assert compressed.headers["ETag"] != identity.headers["ETag"]
+
+        # A cached gzip body never revalidates as the identity one, and vice versa
+        assert client.get(path, headers={"If-None-Match": compressed.headers["ETag"]}).status_code == 200
+        assert client.get(path, headers={"Accept-Encoding": "gzip",
+                                          "If-None-Match": identity.headers["ETag"]}).status_code == 200
+        assert client.get(path, headers={"Accept-Encoding": "gzip",
+                                          "If-None-Match": compressed.headers["ETag"]}).status_code == 304
+
+
+def test_etag_follows_query(client):
+    first = client.get("/api/projects?limit=5").headers["ETag"]
+    assert client.get("/api/projects?limit=6", headers={"If-None-Match": first}).status_code == 200
+
+
+def test_store_write_invalidates_etag(client, project_id):
+    etags = {path: client.get(path).headers["ETag"] for path in paths(project_id)}
+    project = app.project_store.get_many([project_id])[0]
+    app.project_store.upsert_many([dict(project, title=project["title"] + " (renamed)")])
+
+    for path, etag in etags.items():
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    assert "(renamed)" in client.get(f"/api/project/{project_id}").get_json()["project"]["title"]
+
+
+def test_unknown_project_is_not_found(client):
+    assert client.get("/api/project/999999999").status_code == 404
+
+
+def test_asgi_server_matches_flask(client, project_id):
+    starlette_testclient = pytest.importorskip("starlette.testclient")
+    import asgi
+
+    asgi_client = starlette_testclient.TestClient(asgi.app)
+    for path in paths(project_id):
+        for accept_encoding in ("identity", "gzip"):
+            headers = {"Accept-Encoding": accept_encoding}
+            etag = client.get(path, headers=headers).headers["ETag"]
+            response = asgi_client.get(path, headers=headers)
+            assert response.headers["etag"] == etag
+            revalidated = asgi_client.get(path, headers=dict(headers, **{"If-None-Match": etag}))
+            assert revalidated.status_code == 304
+            assert "Accept-Encoding" in revalidated.headers["vary"]
@@ -0,0 +1,90 @@
+"""Background jobs: staged progress, failures and retention"""
+
+import threading
+import time
+
+import pytest
+
+from jobs import Job, JobManager, QueueFullError
+
+
+def wait_done(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        job.wait_for_events(len(job.events), 0.05)
+    assert job.done
+
+
+def test_completed_job_records_stages_and_result():
+    manager = JobManager(max_workers=1)
+
+    def decide(context):
+        context["result"] = {"recommendation": "PURSUE", "text": context["text"]}
+
+    job = manager.submit([("extract", lambda context: None), ("decision", decide)], {"text": "rfp"})
+    wait_done(job)
+    assert job.status == "completed"
+    assert job.finished_at is not None
+    assert job.result == {"recommendation": "PURSUE", "text": "rfp"}
+    assert job.stages == {"extract": "completed", "decision": "completed"}
+    assert [event["event"] for event in job.events] == ["queued", "stage", "stage", "stage", "stage", "done"]
+    assert manager.stats()["active"] == 0
+
+
+def test_failed_job_marks_the_running_stage():
+    manager = JobManager(max_workers=1)
+
+    def fail(context):
+        raise ValueError("unreadable PDF")
+
+    job = manager.submit([("extract", fail), ("decision", lambda context: None)], {})
+    wait_done(job)
+    assert job.status == "failed"
+    assert job.error == "unreadable PDF"
+    assert job.stages == {"extract": "failed", "decision": "pending"}
+    assert job.events[-1] == dict(job.events[-1], event="done", status="failed")
+
+
+def test_queue_limit():
+    manager = JobManager(max_workers=1, queue_limit=1)
+    release = threading.Event()
+    job = manager.submit([("wait", lambda context: release.wait(5))], {})
+    with pytest.raises(QueueFullError):
+        manager.submit([("wait", lambda context: None)], {})
+    release.set()
+    wait_done(job)
+    manager.submit([("wait", lambda context: None)], {})
+
+
+def test_prune_forgets_only_expired_finished_jobs():
+    manager = JobManager(max_workers=1, retention_seconds=60)
+    finished = manager.submit([("noop", lambda context: None)], {})
+    wait_done(finished)
+    release = threading.Event()
+    running = manager.submit([("wait", lambda context: release.wait(5))], {})
+
+    finished.finished_at -= 120
+    manager.submit([("noop", lambda context: None)], {})  # submit prunes
+    assert manager.get(finished.id) is None
+    assert manager.get(running.id) is running
+    release.set()
+    wait_done(running)
+
+
+def test_prune_skips_jobs_without_finished_at():
+    # A job caught between its terminal status and finished_at must not break submit()
+    manager = JobManager(max_workers=1, retention_seconds=0)
+    finishing = Job(["noop"])
+    finishing.status = "completed"
+    manager._jobs[finishing.id] = finishing
+    job = manager.submit([("noop", lambda context: None)], {})
+    wait_done(job)
+    assert manager.get(finishing.id) is finishing
+
+
+def test_finished_jobs_always_have_finished_at():
+    manager = JobManager(max_workers=4, queue_limit=1000, retention_seconds=0)
+    jobs = [manager.submit([("noop", lambda context: None)], {}) for _ in range(100)]
+    for job in jobs:
+        wait_done(job)
+        assert job.finished_at is not None
@@ -0,0 +1,181 @@
+"""LLM gateway: failover, throttling, circuit breakers, deadlines and hedging"""
+
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+import metrics
+from batch import call_with_backoff
+from llm_gateway import CircuitBreaker, DeadlineExceededError, Deployment, LLMGateway, LLMUnavailableError
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def gateway(*names, **kwargs):
+    settings = {"deadline_seconds": 2, "max_attempts": 4, "hedge": False}
+    settings.update(kwargs)
+    return LLMGateway([Deployment(name, llm=None) for name in names], **settings)
+
+
+def test_failover_to_a_healthy_deployment():
+    llm = gateway("east", "west")
+    calls = []
+
+    def call(deployment):
+        calls.append(deployment.name)
+        if deployment.name == "east":
+            raise StatusError(500)
+        return deployment.name
+
+    for _ in range(5):
+        assert llm.invoke(call) == "west"
+    assert set(calls) <= {"east", "west"}
+
+
+def test_bad_request_is_not_retried_and_keeps_the_breaker_closed():
+    llm = gateway("east", "west")
+    calls = []
+
+    def call(deployment):
+        calls.append(deployment.name)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        llm.invoke(call)
+    assert len(calls) == 1
+    assert all(deployment.breaker.state == "closed" for deployment in llm.deployments)
+
+
+def test_throttled_deployment_is_routed_around_until_retry_after():
+    llm = gateway("east", "west")
+    east, west = llm.deployments
+
+    def call(deployment):
+        if deployment.name == "east":
+            raise StatusError(429, {"retry-after": "30"})
+        return deployment.name
+
+    assert llm.invoke(call) == "west"
+    if east.throttled_until:  # east was tried first
+        assert east.throttled_until - time.monotonic() > 25
+        assert not east.available(time.monotonic())
+    for _ in range(5):
+        assert llm.invoke(call) == "west"
+    assert east.breaker.state == "closed"
+
+
+def test_exhausted_gateway_is_not_retried_as_a_throttle(monkeypatch):
+    # Every deployment throttled beyond the deadline: one 503, not a 429 the batch backoff repeats
+    monkeypatch.setattr("batch.time.sleep", lambda seconds: None)
+    llm = gateway("east", deadline_seconds=0.5)
+    calls = []
+
+    def call(deployment):
+        calls.append(1)
+        raise StatusError(429, {"retry-after": "60"})
+
+    with pytest.raises(LLMUnavailableError) as unavailable:
+        call_with_backoff(lambda: llm.invoke(call), max_retries=4)
+    assert unavailable.value.status_code == 503
+    assert unavailable.value.throttled
+    assert len(calls) == 1
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_after_cooldown():
+    llm = gateway("east", max_attempts=10, deadline_seconds=0.3)
+    east = llm.deployments[0]
+    east.breaker = CircuitBreaker(failures=2, cooldown_seconds=0.5)
+    failing = True
+
+    def call(deployment):
+        if failing:
+            raise StatusError(503)
+        return "ok"
+
+    with pytest.raises(LLMUnavailableError):
+        llm.invoke(call)
+    assert east.breaker.state == "open"
+    assert not east.available(time.monotonic())
+
+    failing = False
+    time.sleep(0.5)
+    assert llm.invoke(call) == "ok"  # the half-open probe succeeds and closes the breaker
+    assert east.breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failures=1, cooldown_seconds=10)
+    assert breaker.record_failure(0.0)
+    assert not breaker.available(5.0)
+    breaker.on_attempt(10.0)
+    assert breaker.state == "half_open"
+    assert not breaker.available(10.0)  # one probe at a time
+    assert breaker.record_failure(10.5)
+    assert breaker.state == "open" and breaker.opened_at == 10.5
+
+
+def test_deadline_bounds_a_slow_call():
+    llm = gateway("east", deadline_seconds=0.2)
+    release = threading.Event()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError) as exceeded:
+        llm.invoke(lambda deployment: release.wait(5))
+    release.set()
+    assert time.monotonic() - started < 1
+    assert exceeded.value.status_code == 504
+
+
+def test_slow_attempt_is_hedged_on_another_deployment():
+    llm = gateway("east", "west", hedge=True, hedge_min_seconds=0.05)
+    llm.deployments[0].weight = 1e6  # east takes the first attempt
+    for deployment in llm.deployments:
+        deployment.latencies.extend([0.01] * 20)
+    release = threading.Event()
+    hedges = metrics.LLM_HEDGES.value(deployment="west")
+
+    def call(deployment):
+        if deployment.name == "east":
+            release.wait(5)
+        return deployment.name
+
+    for _ in range(4):
+        started = time.monotonic()
+        assert llm.invoke(call) == "west"
+        assert time.monotonic() - started < 1
+    release.set()
+    assert metrics.LLM_HEDGES.value(deployment="west") == hedges + 4
+
+
+def test_attempts_run_in_the_callers_request_trace():
+    llm = gateway("east")
+    trace = metrics.start_trace(path="/api/upload-rfp")
+    try:
+        llm.invoke(lambda deployment: metrics.annotate(deployment=deployment.name))
+    finally:
+        metrics.finish_trace()
+    assert trace["deployment"] == "east"
+
+
+def test_async_failover_and_deadline():
+    llm = gateway("east", "west", deadline_seconds=0.2)
+
+    async def call(deployment):
+        if deployment.name == "east":
+            raise StatusError(502)
+        return deployment.name
+
+    async def slow(deployment):
+        await asyncio.sleep(5)
+
+    assert asyncio.run(llm.ainvoke(call)) == "west"
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(llm.ainvoke(slow))
+    assert all(deployment.in_flight == 0 for deployment in llm.deployments)
@@ -0,0 +1,127 @@
+"""Long-document mode: when the map-reduce digest replaces the whole RFP, and how the map calls run"""
+
+import threading
+
+import pytest
+
+import app
+import metrics
+from llm_gateway import LLMUnavailableError
+from long_document import analyze_long_document, chunk_text
+from llm_utils import count_tokens
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """Record map-reduce runs instead of calling the LLM"""
+    calls = []
+
+    def analyze_long_document(rfp_text, *args, **kwargs):
+        calls.append(rfp_text)
+        return "digest", {"mode": "map_reduce"}
+
+    monkeypatch.setattr(app, "analyze_long_document", analyze_long_document)
+    monkeypatch.setattr(app, "LONG_DOCUMENT_MODE", "auto")
+    return calls
+
+
+def rfp_of_tokens(tokens):
+    """An RFP of roughly (at most) tokens tokens"""
+    sentence = "Scope of work: regulatory compliance review. "
+    return sentence * (tokens // count_tokens(sentence) - 1)
+
+
+def test_rfp_within_budget_is_sent_whole(analyzed, monkeypatch):
+    monkeypatch.setattr(app, "LONG_DOCUMENT_TOKEN_BUDGET", 5000)
+    text = rfp_of_tokens(4000)
+    assert len(text) > app.RFP_TEXT_LIMIT  # the budget, not the old character cap, decides
+    assert app.prepare_rfp_section(text) == (text, None)
+    assert analyzed == []
+
+
+def test_rfp_over_budget_is_condensed(analyzed, monkeypatch):
+    monkeypatch.setattr(app, "LONG_DOCUMENT_TOKEN_BUDGET", 1000)
+    text = rfp_of_tokens(4000)
+    assert app.prepare_rfp_section(text) == ("digest", {"mode": "map_reduce"})
+    assert analyzed == [text]
+
+
+def test_threshold_is_inclusive(monkeypatch):
+    text = rfp_of_tokens(2000)
+    monkeypatch.setattr(app, "LONG_DOCUMENT_TOKEN_BUDGET", count_tokens(text))
+    assert app.fits_prompt(text)
+    monkeypatch.setattr(app, "LONG_DOCUMENT_TOKEN_BUDGET", count_tokens(text) - 1)
+    assert not app.fits_prompt(text)
+
+
+def test_always_mode_condenses_short_rfps(analyzed, monkeypatch):
+    monkeypatch.setattr(app, "LONG_DOCUMENT_MODE", "always")
+    assert app.prepare_rfp_section("A short RFP.")[0] == "digest"
+
+
+def test_off_mode_truncates_without_map_calls(analyzed, monkeypatch):
+    monkeypatch.setattr(app, "LONG_DOCUMENT_MODE", "off")
+    text = rfp_of_tokens(4000)
+    assert app.prepare_rfp_section(text) == (text[:app.RFP_TEXT_LIMIT], None)
+    assert analyzed == []
+
+
+def test_chunks_respect_token_limit():
+    text = "\n".join(f"SECTION {i}\n" + "The firm shall review each filing. " * 80 for i in range(1, 20))
+    chunks = chunk_text(text, max_tokens=500)
+    assert len(chunks) > 1
+    assert all(chunk["tokens"] <= 500 for chunk in chunks)
+
+
+class FakeMapChain:
+    """Map chain stand-in: fixed findings and usage per call, optionally failing"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+        if self.error is not None:
+            raise self.error
+        metrics.annotate(map_thread=threading.current_thread().name)
+        findings = {"summary": "Regulatory filings", "requirements": ["weekly reports"], "budget_signals": [],
+                    "risks": [], "deadlines": [], "practice_areas": ["regulatory"]}
+        return findings, {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120, "cached_prompt_tokens": 0}
+
+
+def long_rfp(tag):
+    return "\n".join(f"SECTION {i}\n{tag}: the firm shall review filing {i}. " + "Details follow. " * 60
+                     for i in range(1, 9))
+
+
+def test_map_calls_are_recorded_on_the_request_trace():
+    chain = FakeMapChain()
+    trace = metrics.start_trace(path="/api/upload-rfp")
+    try:
+        digest, stats = analyze_long_document(long_rfp("trace"), chain, "gpt-4o", 0.2, max_tokens=300)
+    finally:
+        metrics.finish_trace()
+    assert chain.calls == stats["chunks"] > 1
+    assert trace["map_thread"].startswith("rfp-map")
+    assert trace["tokens"]["prompt_tokens"] == 100 * chain.calls
+    assert "llm_map" in trace["stages_ms"]
+    assert stats["tokens"]["map"]["completion_tokens"] == 20 * chain.calls
+    assert "Regulatory filings" in digest
+
+
+def test_map_failure_is_not_retried_on_top_of_the_gateway():
+    chain = FakeMapChain(LLMUnavailableError("No LLM deployment available before the deadline", throttled=True))
+    with pytest.raises(LLMUnavailableError):
+        analyze_long_document(long_rfp("failing"), chain, "gpt-4o", 0.2, max_tokens=300)
+    assert chain.calls == len(chunk_text(long_rfp("failing"), 300))
+
+
+def test_cached_chunks_skip_map_calls():
+    analyze_long_document(long_rfp("cached"), FakeMapChain(), "gpt-4o", 0.2, max_tokens=300)
+    chain = FakeMapChain()
+    _, stats = analyze_long_document(long_rfp("cached"), chain, "gpt-4o", 0.2, max_tokens=300)
+    assert chain.calls == 0
+    assert stats["cached_chunks"] == stats["chunks"]
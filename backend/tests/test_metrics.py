@@ -0,0 +1,73 @@
+"""Structured logging: per-request trace lines (streamed responses included) and application events"""
+
+import io
+import json
+
+import pytest
+
+import app
+import metrics
+
+
+class Lines:
+    """Stand-in logger that keeps the JSON lines it is given"""
+
+    def __init__(self):
+        self.records = []
+
+    def info(self, message):
+        self.records.append(json.loads(message))
+
+    def log(self, level, message):
+        self.records.append(json.loads(message))
+
+
+@pytest.fixture
+def request_log(monkeypatch):
+    lines = Lines()
+    monkeypatch.setattr(metrics, "request_logger", lines)
+    return lines.records
+
+
+@pytest.fixture
+def event_log(monkeypatch):
+    lines = Lines()
+    monkeypatch.setattr(metrics, "event_logger", lines)
+    return lines.records
+
+
+def test_streamed_response_is_logged_after_its_body(request_log):
+    client = app.app.test_client()
+    response = client.post("/api/upload-rfp/stream",
+                           data={"file": (io.BytesIO(b"RFP for regulatory compliance review"), "rfp.txt")})
+    assert request_log == []  # the body has not run yet
+    assert "event: decision" in response.get_data(as_text=True)
+    response.close()
+
+    [record] = request_log
+    assert record["endpoint"] == "upload_rfp_stream"
+    assert record["status"] == 200
+    # Stages that ran while streaming are in the line
+    assert {"extract", "similar_projects"} <= set(record["stages_ms"])
+
+
+def test_plain_response_is_logged_at_once(request_log):
+    app.app.test_client().get("/api/health")
+    assert [record["endpoint"] for record in request_log] == ["health_check"]
+
+
+def test_log_event_is_tagged_with_the_request(event_log):
+    metrics.start_trace(method="POST", path="/api/upload-rfp")
+    try:
+        metrics.log_event("ai_decision_error", level="error", error="timed out")
+    finally:
+        metrics.finish_trace()
+    assert event_log == [{"event": "ai_decision_error", "level": "error", "method": "POST",
+                          "path": "/api/upload-rfp", "error": "timed out"}]
+
+
+def test_normalize_decision_logs_invalid_recommendation_without_content(event_log):
+    decision = {"recommendation": "MAYBE", "confidence_score": 0.5, "executive_summary": "confidential",
+                "key_factors": [], "risk_assessment": "", "financial_analysis": "", "next_steps": []}
+    assert app.normalize_decision(decision)["recommendation"] == "DECLINE"
+    assert event_log == [{"event": "invalid_recommendation", "level": "warning", "recommendation": "MAYBE"}]
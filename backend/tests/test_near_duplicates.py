@@ -0,0 +1,86 @@
+"""Near-duplicate RFPs: MinHash/LSH matching, persistence across restarts and the diff of what changed"""
+
+import random
+
+import pytest
+
+import near_duplicates
+from near_duplicates import NearDuplicateIndex, diff_summary, minhash, shingle_hashes
+
+WORDS = ["contractor", "shall", "provide", "legal", "review", "regulatory", "filings", "agency", "counsel",
+         "weekly", "reports", "liability", "budget", "schedule", "deliverables", "amendment", "termination"]
+
+
+def rfp(seed, sections=("SCOPE OF WORK", "EVALUATION CRITERIA", "CONTRACT TERMS")):
+    rng = random.Random(seed)
+    return "\n".join(f"SECTION {number}. {title}\n" + "\n".join(" ".join(rng.choice(WORDS) for _ in range(12))
+                                                              for _ in range(20))
+                     for number, title in enumerate(sections, start=1))
+
+
+def jaccard(a, b):
+    a, b = set(shingle_hashes(a).tolist()), set(shingle_hashes(b).tolist())
+    return len(a & b) / len(a | b)
+
+
+def test_signature_agreement_estimates_jaccard():
+    original = rfp(1)
+    edited = original.replace("SECTION 3. CONTRACT TERMS", "SECTION 3. CONTRACT TERMS (AMENDED)", 1) + "\nAddendum 2."
+    estimate = (minhash(original) == minhash(edited)).mean()
+    assert estimate == pytest.approx(jaccard(original, edited), abs=0.1)
+    assert minhash("") is None
+
+
+def test_unrelated_rfp_is_not_matched():
+    index = NearDuplicateIndex(persist=False)
+    index.add(rfp(1), {"recommendation": "PURSUE"})
+    assert index.lookup(rfp(2)) is None
+    assert index.stats()["lookups"] == 1
+    assert index.stats()["matches"] == 0
+
+
+def test_threshold_decides_reuse():
+    original = rfp(1)
+    reissued = original + "\n" + "\n".join(rfp(3).splitlines()[1:11])
+    similarity = (minhash(original) == minhash(reissued)).mean()
+    loose = NearDuplicateIndex(persist=False, threshold=similarity - 0.05)
+    strict = NearDuplicateIndex(persist=False, threshold=min(similarity + 0.05, 1.0))
+    for index in (loose, strict):
+        index.add(original, {"recommendation": "PURSUE"})
+    assert loose.lookup(reissued)["near_duplicate"]["similarity"] == pytest.approx(similarity, abs=1e-4)
+    assert strict.lookup(reissued) is None
+
+
+@pytest.mark.parametrize("pending_max", [near_duplicates.PENDING_MAX, 1])
+def test_index_survives_restart(tmp_path, monkeypatch, pending_max):
+    monkeypatch.setattr(near_duplicates, "PENDING_MAX", pending_max)  # 1: matches come from the sorted table
+    index = NearDuplicateIndex(str(tmp_path), persist=True)
+    for seed in range(1, 5):
+        index.add(rfp(seed), {"recommendation": f"decision {seed}"}, context="prompt-v1")
+
+    reopened = NearDuplicateIndex(str(tmp_path), persist=True)
+    assert len(reopened) == 4
+    match = reopened.lookup(rfp(3) + "\nAddendum 1.", context="prompt-v1")
+    assert match["recommendation"] == "decision 3"
+    assert reopened.lookup(rfp(3), context="prompt-v2") is None
+
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path), persist=True)
+    index.add(rfp(1), {"recommendation": "PURSUE"})
+    index.add(rfp(2), {"recommendation": "PASS"})
+    signatures = tmp_path / "signatures.bin"
+    signatures.write_bytes(signatures.read_bytes()[:-10])
+    reopened = NearDuplicateIndex(str(tmp_path), persist=True)
+    assert len(reopened) == 1
+    assert reopened.lookup(rfp(1))["recommendation"] == "PURSUE"
+
+
+def test_diff_summary_reports_section_changes():
+    old = "SECTION 1. SCOPE\nReview filings weekly.\nSECTION 2. BUDGET\nNot to exceed $50,000.\nSECTION 3. INSURANCE\nGeneral liability."
+    new = "SECTION 1. SCOPE\nReview filings weekly.\nSECTION 2. BUDGET\nNot to exceed $75,000.\nSECTION 4. SECURITY\nBackground checks."
+    diff = diff_summary(old, new)
+    assert diff["changed_sections"] == [{"heading": "SECTION 2. BUDGET", "changed_lines": 2,
+                                         "changes": ["-Not to exceed $50,000.", "+Not to exceed $75,000."]}]
+    assert diff["added_sections"] == ["SECTION 4. SECURITY"]
+    assert diff["removed_sections"] == ["SECTION 3. INSURANCE"]
@@ -0,0 +1,86 @@
+"""Page-parallel PDF extraction: same text as a serial read, bounded work on early stop, shared memory released"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pytest
+
+import pdf_extraction
+from pdf_extraction import extract_pdf_text, iter_pdf_pages
+from synthetic import synthetic_pdf_bytes
+
+PAGES = 24
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return synthetic_pdf_bytes(PAGES, lines_per_page=8)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Record the shared-memory blocks created and the page ranges submitted to pools"""
+    record = {"blocks": [], "submitted": 0}
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if kwargs.get("create"):
+                record["blocks"].append(self.name)
+
+    class RecordingExecutor(ProcessPoolExecutor):
+        def submit(self, *args, **kwargs):
+            record["submitted"] += 1
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_extraction.shared_memory, "SharedMemory", RecordingSharedMemory)
+    monkeypatch.setattr(pdf_extraction, "ProcessPoolExecutor", RecordingExecutor)
+    monkeypatch.setattr(pdf_extraction, "PDF_PAGES_PER_TASK", 2)
+    return record
+
+
+def assert_released(names):
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_parallel_text_matches_serial(pdf, recorded, tmp_path):
+    serial = extract_pdf_text(pdf, max_workers=1)
+    assert serial.count("SCOPE OF WORK") == PAGES // 5 + 1
+    assert recorded["submitted"] == 0
+    assert extract_pdf_text(pdf, max_workers=2) == serial
+    assert recorded["submitted"] == PAGES // 2
+    path = tmp_path / "rfp.pdf"
+    path.write_bytes(pdf)
+    assert extract_pdf_text(str(path), max_workers=2) == serial
+    assert len(recorded["blocks"]) == 1  # files are opened by path, not copied
+    assert_released(recorded["blocks"])
+
+
+def test_ordered_pages_resume_from_start_page(pdf):
+    pages = [index for index, _ in iter_pdf_pages(pdf, ordered=True, max_workers=2, start_page=5)]
+    assert pages == list(range(5, PAGES))
+
+
+def test_early_stop_skips_unqueued_ranges(pdf, recorded):
+    pages = iter_pdf_pages(pdf, ordered=True, max_workers=2)
+    assert next(pages)[0] == 0
+    pages.close()
+    # Two workers keep four ranges queued, plus one refill per finished range
+    assert recorded["submitted"] < PAGES // 2
+    assert_released(recorded["blocks"])
+
+
+def test_configured_worker_count_uses_the_shared_pool(pdf, recorded, monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(pdf_extraction, "_executor", None)
+    try:
+        extract_pdf_text(pdf, max_workers=2)
+        shared = pdf_extraction._executor
+        assert shared is not None
+        extract_pdf_text(pdf)
+        assert pdf_extraction._executor is shared
+    finally:
+        if pdf_extraction._executor is not None:
+            pdf_extraction._executor.shutdown()
@@ -0,0 +1,60 @@
+"""Pre-screen: confident out-of-scope RFPs are declined locally, everything else goes to the LLM"""
+
+import app
+from prescreen import PRESCREEN_MIN_CHARS, PreScreener, PreScreenModel, SEED_EXAMPLES, iter_labeled_file, load_prescreener
+
+PAVING_RFP = ("Request for proposal for road paving and asphalt resurfacing of county roads. The contractor shall "
+              "mill and overlay asphalt pavement, replace curbs, apply pavement markings and provide traffic "
+              "control. Bids are invited for the supply of asphalt, concrete and road construction equipment. ") * 3
+LEGAL_RFP = ("Request for proposal for outside legal counsel. The city seeks a law firm to represent it in "
+             "employment litigation, advise on labor law compliance and provide regulatory advice and contract "
+             "review. Attorneys shall defend the city in lawsuits and arbitration proceedings. ") * 3
+
+
+def seed_screener(threshold=0.75):
+    # The seed set is small, so the seed model is less confident than a trained one
+    return PreScreener(PreScreenModel.train(SEED_EXAMPLES), threshold)
+
+
+def test_out_of_scope_rfp_is_declined_without_the_llm():
+    screener = seed_screener()
+    decision = screener.screen(PAVING_RFP)
+    assert decision["recommendation"] == "DECLINE"
+    assert decision["prescreen"]["out_of_scope_probability"] >= 0.75
+    assert decision["key_factors"][1].startswith("Out-of-scope indicators: ")
+    app.AIDecisionResponse(**{key: value for key, value in decision.items() if key != "prescreen"})
+    assert screener.screen(LEGAL_RFP) is None
+    assert screener.stats()["short_circuited"] == 1
+    assert screener.stats()["screened"] == 2
+
+
+def test_short_text_always_goes_to_the_llm():
+    screener = seed_screener(threshold=0.5)
+    assert screener.screen(PAVING_RFP[:PRESCREEN_MIN_CHARS]) is not None
+    assert screener.screen(PAVING_RFP[:PRESCREEN_MIN_CHARS - 1]) is None
+
+
+def test_saved_model_scores_the_same(tmp_path):
+    model = PreScreenModel.train(SEED_EXAMPLES)
+    path = str(tmp_path / "prescreen_model.npz")
+    model.save(path)
+    screener = load_prescreener(path)
+    assert screener.source == "prescreen_model.npz"
+    assert screener.model.trained_on == len(SEED_EXAMPLES)
+    assert screener.model.out_of_scope_probability(PAVING_RFP) == model.out_of_scope_probability(PAVING_RFP)
+
+
+def test_unreadable_model_falls_back_to_seed(tmp_path):
+    path = tmp_path / "prescreen_model.npz"
+    path.write_bytes(b"not a model")
+    assert load_prescreener(str(path)).source == "seed"
+
+
+def test_labeled_files(tmp_path):
+    jsonl = tmp_path / "labeled.jsonl"
+    jsonl.write_text('{"text": "legal counsel", "in_scope": true}\n{"text": "paving", "label": "out_of_scope"}\n')
+    csv_file = tmp_path / "labeled.csv"
+    csv_file.write_text("text,in_scope\nlegal counsel,yes\npaving,0\n")
+    expected = [("legal counsel", True), ("paving", False)]
+    assert list(iter_labeled_file(str(jsonl))) == expected
+    assert list(iter_labeled_file(str(csv_file))) == expected
@@ -0,0 +1,139 @@
+"""
+In-memory upload handling.
+Reads uploads into memory while hashing them, detects the file type from magic bytes (rejecting
+files whose name claims another type), decodes text in UTF-8 or a legacy single-byte encoding, and
+optionally persists them to the upload folder under a retention and size policy.
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from flask import Request
+
+# Configuration
+UPLOAD_PERSIST = os.getenv("UPLOAD_PERSIST", "false").lower() in ("1", "true", "yes")
+UPLOAD_RETENTION_SECONDS = int(os.getenv("UPLOAD_RETENTION_SECONDS", str(7 * 24 * 3600)))
+UPLOAD_FOLDER_MAX_BYTES = int(os.getenv("UPLOAD_FOLDER_MAX_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_PRUNE_INTERVAL_SECONDS = 60
+
+READ_CHUNK_SIZE = 1024 * 1024
+SNIFF_BYTES = 8192
+# Bytes that occur in text: printable ASCII, common whitespace and the high half (any 8-bit encoding)
+TEXT_BYTES = bytes(range(0x20, 0x7F)) + b"\t\n\r\f\b\x1b" + bytes(range(0x80, 0x100))
+MAX_CONTROL_RATIO = 0.01  # share of other control bytes tolerated in legacy-encoded text
+
+
+class InvalidUploadError(ValueError):
+    """Raised when upload content does not match an allowed file type"""
+
+
+class InMemoryRequest(Request):
+    """Flask request that buffers file parts in memory instead of spooling large ones to temp files"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+
+def read_upload(stream):
+    """
+    Read an upload stream into memory, hashing it as bytes arrive.
+
+    Returns:
+        tuple: (memoryview or bytes of the content, SHA-256 hex digest)
+    """
+    if isinstance(stream, io.BytesIO):
+        # Already buffered by InMemoryRequest - hash the buffer in place, no copy
+        data = stream.getbuffer()
+        return data, hashlib.sha256(data).hexdigest()
+
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        buffer.extend(chunk)
+    return memoryview(buffer), digest.hexdigest()
+
+
+def sniff_file_type(data):
+    """Detect 'pdf' or 'txt' from content, or return None for anything else"""
+    head = bytes(data[:SNIFF_BYTES])
+    # The PDF header may be preceded by junk bytes; readers accept it within the first 1KB
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if b"\x00" in head:
+        return None
+    try:
+        head.decode("utf-8")
+        return "txt"
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the sniff boundary is still valid text
+        if e.start >= len(head) - 3:
+            return "txt"
+    # Not UTF-8: text in a single-byte encoding (Windows-1252, Latin-1) has almost no control bytes
+    if len(head.translate(None, TEXT_BYTES)) <= len(head) * MAX_CONTROL_RATIO:
+        return "txt"
+    return None
+
+
+def check_file_type(filename, file_type):
+    """Raise InvalidUploadError when the sniffed type disagrees with the file's extension (e.g. text named .pdf)"""
+    extension = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    if extension != file_type:
+        raise InvalidUploadError(f"{filename} is named .{extension} but its content is {file_type.upper()}")
+
+
+def decode_text(data):
+    """Text of a TXT upload: UTF-8 (with or without BOM), else Windows-1252, else Latin-1, which decodes any bytes"""
+    data = bytes(data)
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+    return data.decode("latin-1")
+
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def prune_upload_folder(folder, retention_seconds=UPLOAD_RETENTION_SECONDS, max_bytes=UPLOAD_FOLDER_MAX_BYTES,
+                        force=False):
+    """Delete uploads older than the retention window, then the oldest ones until the folder fits max_bytes"""
+    global _last_prune
+    with _prune_lock:
+        now = time.time()
+        if not force and now - _last_prune < UPLOAD_PRUNE_INTERVAL_SECONDS:
+            return 0
+        _last_prune = now
+
+        entries = []
+        for entry in os.scandir(folder):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if now - mtime <= retention_seconds and total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+                total -= size
+            except OSError:
+                pass
+        return removed
+
+
+def persist_upload(folder, filename, data):
+    """Write upload content to folder/filename and apply the retention policy"""
+    file_path = os.path.join(folder, filename)
+    with open(file_path, "wb") as file:
+        file.write(data)
+    prune_upload_folder(folder)
+    return file_path
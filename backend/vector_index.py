@@ -0,0 +1,247 @@
+"""
+In-process similarity index over past projects.
+Stores L2-normalized embeddings in a NumPy matrix (memory-mapped when loaded from disk),
+answers batched cosine top-k queries with optional metadata filters, and supports
+incremental add/remove. The embedding function is pluggable; hashing_embedder works offline.
+"""
+
+import json
+import os
+import re
+import zlib
+from datetime import date
+import numpy as np
+
+# Configuration
+EMBEDDING_DIM = int(os.getenv("VECTOR_INDEX_DIM", "256"))
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Compact the matrix once this fraction of rows are removed
+COMPACT_THRESHOLD = 0.25
+
+
+def hashing_embedder(texts, dim=EMBEDDING_DIM):
+    """
+    Deterministic local embedding: signed feature hashing of unigrams and bigrams.
+
+    Args:
+        texts (list): Strings to embed
+        dim (int): Embedding dimension
+
+    Returns:
+        np.ndarray: float32 matrix of shape (len(texts), dim), rows L2-normalized
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            bucket = zlib.crc32(feature.encode("utf-8"))
+            vectors[row, bucket % dim] += 1.0 if bucket & 0x80000000 else -1.0
+    return normalize(vectors)
+
+
+def normalize(vectors):
+    """L2-normalize rows, leaving all-zero rows untouched"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def project_text(project):
+    """Text used to embed a project record"""
+    return " ".join([
+        project.get("title", ""),
+        project.get("description", ""),
+        " ".join(project.get("technology_stack", [])),
+    ])
+
+
+def _date_ordinal(value):
+    """Parse an ISO date string into a day ordinal, or -1 when missing/invalid"""
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return -1
+
+
+class VectorIndex:
+    """Embedding matrix plus columnar metadata for filtered cosine top-k search"""
+
+    def __init__(self, embed_fn=hashing_embedder, dim=EMBEDDING_DIM, query_fn=None):
+        self.embed_fn = embed_fn
+        self.query_fn = query_fn or embed_fn  # embeds search texts; may skip caching that embed_fn does
+        self.dim = dim
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._costs = np.zeros(0, dtype=np.float64)
+        self._dates = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._writable = True
+        self.ids = []
+        self.records = []
+        self._rows = {}  # project id -> row
+        self._practice_rows = {}  # lowercased practice area -> set of rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _reserve(self, extra):
+        """Grow the backing arrays geometrically, copying a memory-mapped matrix into RAM first"""
+        needed = self._size + extra
+        capacity = len(self._vectors)
+        if self._writable and needed <= capacity:
+            return
+        if needed > capacity:
+            capacity = max(needed, capacity * 3 // 2, 1024)
+        for name in ("_vectors", "_costs", "_dates", "_alive"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+        self._writable = True
+
+    def add(self, projects, vectors=None):
+        """
+        Add or replace projects.
+
+        Args:
+            projects (list): Project dicts with at least an "id"
+            vectors (np.ndarray): Precomputed embeddings; computed with embed_fn when omitted
+        """
+        if not projects:
+            return
+        replaced = [project["id"] for project in projects if project["id"] in self._rows]
+        if replaced:
+            self.remove(replaced)
+
+        if vectors is None:
+            vectors = self.embed_fn([project_text(project) for project in projects])
+        vectors = normalize(vectors)
+
+        self._reserve(len(projects))
+        start, stop = self._size, self._size + len(projects)
+        self._vectors[start:stop] = vectors
+        self._costs[start:stop] = [project.get("cost", 0) or 0 for project in projects]
+        self._dates[start:stop] = [_date_ordinal(project.get("completion_date")) for project in projects]
+        self._alive[start:stop] = True
+
+        for row, project in enumerate(projects, start=start):
+            self.ids.append(project["id"])
+            self.records.append(project)
+            self._rows[project["id"]] = row
+            for area in self._practice_areas(project):
+                self._practice_rows.setdefault(area, set()).add(row)
+        self._size = stop
+
+    def remove(self, project_ids):
+        """Remove projects by id; unknown ids are ignored"""
+        rows = [self._rows.pop(project_id) for project_id in project_ids if project_id in self._rows]
+        if not rows:
+            return
+        self._alive[rows] = False
+        for row in rows:
+            for area in self._practice_areas(self.records[row]):
+                self._practice_rows.get(area, set()).discard(row)
+        if self._size and (self._size - len(self._rows)) / self._size > COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        """Drop removed rows and renumber the remaining ones"""
+        keep = np.flatnonzero(self._alive[:self._size])
+        records = [self.records[row] for row in keep]
+        vectors = self._vectors[keep]
+        self.__init__(self.embed_fn, self.dim, self.query_fn)
+        self.add(records, vectors=vectors)
+
+    @staticmethod
+    def _practice_areas(project):
+        areas = list(project.get("technology_stack", []))
+        if project.get("practice_area"):
+            areas.append(project["practice_area"])
+        return {area.lower() for area in areas}
+
+    def _filter_mask(self, practice_area=None, min_cost=None, max_cost=None,
+                     completed_after=None, completed_before=None):
+        """Boolean mask over rows that are alive and match every given filter"""
+        mask = self._alive[:self._size].copy()
+        if practice_area is not None:
+            area_mask = np.zeros(self._size, dtype=bool)
+            area_mask[list(self._practice_rows.get(practice_area.lower(), ()))] = True
+            mask &= area_mask
+        if min_cost is not None:
+            mask &= self._costs[:self._size] >= min_cost
+        if max_cost is not None:
+            mask &= self._costs[:self._size] <= max_cost
+        if completed_after is not None:
+            mask &= self._dates[:self._size] >= _date_ordinal(completed_after)
+        if completed_before is not None:
+            mask &= self._dates[:self._size] <= _date_ordinal(completed_before)
+        return mask
+
+    def search_vectors(self, query_vectors, k=5, **filters):
+        """
+        Batched cosine top-k over raw query vectors.
+
+        Returns:
+            list: One list of (project_id, score) pairs per query, best first
+        """
+        queries = normalize(np.atleast_2d(query_vectors))
+        if self._size == 0:
+            return [[] for _ in queries]
+
+        scores = queries @ self._vectors[:self._size].T
+        mask = self._filter_mask(**filters)
+        scores[:, ~mask] = -np.inf
+
+        k = min(k, int(mask.sum()))
+        if k == 0:
+            return [[] for _ in queries]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_row, rows in enumerate(top):
+            rows = rows[np.argsort(-scores[query_row, rows])]
+            results.append([(self.ids[row], float(scores[query_row, row])) for row in rows])
+        return results
+
+    def search(self, texts, k=5, **filters):
+        """Batched top-k for query texts; returns project records with a similarity_score"""
+        results = self.search_vectors(self.query_fn(texts), k=k, **filters)
+        return [
+            [dict(self.records[self._rows[project_id]], similarity_score=round(score, 4))
+             for project_id, score in hits]
+            for hits in results
+        ]
+
+    def save(self, path):
+        """Write the matrix as .npy and ids/records as JSON under directory path"""
+        if len(self._rows) < self._size:
+            self.compact()
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self._vectors[:self._size])
+        with open(os.path.join(path, "records.json"), "w", encoding="utf-8") as file:
+            json.dump({"dim": self.dim, "records": self.records}, file)
+
+    @classmethod
+    def load(cls, path, embed_fn=hashing_embedder, mmap=True, query_fn=None):
+        """Load an index written by save(); the matrix is memory-mapped read-only when mmap is set"""
+        with open(os.path.join(path, "records.json"), "r", encoding="utf-8") as file:
+            saved = json.load(file)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+
+        index = cls(embed_fn, saved["dim"], query_fn)
+        index._vectors = vectors
+        index._size = len(vectors)
+        index._writable = not mmap
+        records = saved["records"]
+        index._costs = np.array([record.get("cost", 0) or 0 for record in records], dtype=np.float64)
+        index._dates = np.array([_date_ordinal(record.get("completion_date")) for record in records], dtype=np.int64)
+        index._alive = np.ones(len(records), dtype=bool)
+        for row, record in enumerate(records):
+            index.ids.append(record["id"])
+            index.records.append(record)
+            index._rows[record["id"]] = row
+            for area in cls._practice_areas(record):
+                index._practice_rows.setdefault(area, set()).add(row)
+        return index
@@ -1,72 +1,359 @@
-#Write me a python file that will read my code files I specify and write to a local text file all the code with the filename identified
+"""
+Export source files into one text file (each under a "<File: path>" marker) for pasting into an LLM.
+Files are read concurrently and streamed to the export, so contents are never all held in memory.
+A manifest next to the export records each file's mtime, size, SHA-256, token count and byte range
+in the export: files whose mtime and size are unchanged are copied from the previous export without
+being opened, files whose content hash is unchanged keep their token count, and when nothing changed
+the export is left as it is (one stat per file, no reads or writes).
 
-import os
-import glob
+Usage (from the repository root):
+    python scripts/get-codebase.py --output codebase.txt
+    python scripts/get-codebase.py --root . --pattern "backend/**/*.py" --exclude "**/benchmarks/**" --tokens --max-tokens 120000
+"""
 
-# Specify the directory containing the code files
-directory = 'D:/projects/rfp_accelerator_v2/'
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# Define file patterns to include
-file_patterns = [
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATTERNS = [
     # Backend Python files
-    'backend/*.py',
-    
+    "backend/*.py",
+
     # Frontend configuration files
-    'frontend-vite/package.json',
-    'frontend-vite/vite.config.ts',
-    'frontend-vite/tsconfig.json',
-    'frontend-vite/tsconfig.app.json',
-    'frontend-vite/tsconfig.node.json',
-    'frontend-vite/eslint.config.js',
-    'frontend-vite/index.html',
-    
+    "frontend-vite/package.json",
+    "frontend-vite/vite.config.ts",
+    "frontend-vite/tsconfig.json",
+    "frontend-vite/tsconfig.app.json",
+    "frontend-vite/tsconfig.node.json",
+    "frontend-vite/eslint.config.js",
+    "frontend-vite/index.html",
+
     # Frontend source files
-    'frontend-vite/src/*.tsx',
-    'frontend-vite/src/*.ts',
-    'frontend-vite/src/*.css',
-    'frontend-vite/src/components/*.tsx',
-    'frontend-vite/src/components/*.css',
+    "frontend-vite/src/*.tsx",
+    "frontend-vite/src/*.ts",
+    "frontend-vite/src/*.css",
+    "frontend-vite/src/components/*.tsx",
+    "frontend-vite/src/components/*.css",
 ]
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # reads are I/O-bound
+MANIFEST_VERSION = 1
+SEPARATOR = "-" * 80
+COPY_CHUNK_BYTES = 1024 * 1024
+CHARS_PER_TOKEN = 4  # estimate when tiktoken is unavailable
+
+
+def collect_files(root, patterns, excludes=()):
+    """
+    Files under root matching any pattern (recursive "**" globs), minus excludes.
+
+    Returns:
+        list: Sorted, de-duplicated relative paths with "/" separators
+    """
+    found = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern, root_dir=root, recursive=True):
+            path = path.replace(os.sep, "/")
+            if not any(fnmatch.fnmatch(path, exclude) for exclude in excludes) and os.path.isfile(os.path.join(root, path)):
+                found.add(path)
+    return sorted(found)
+
+
+def token_counter(encoding_name):
+    """Function counting the tokens of a string: tiktoken when available, else a length estimate"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        print(f"Warning: tiktoken unavailable, estimating token counts: {e}", file=sys.stderr)
+        return lambda text: (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def load_manifest(path, settings):
+    """
+    Previous run's manifest.
+
+    Returns:
+        tuple: (exported file entries, export size and mtime, entries of files left out by the token
+            budget); empty when the manifest is missing, unreadable or written with other settings
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}, None, {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("settings") != settings:
+        return {}, None, {}
+    return manifest.get("files", {}), manifest.get("output"), manifest.get("omitted", {})
+
+
+def is_fresh(entry, stat):
+    """True when a manifest entry was recorded for a file with this mtime and size"""
+    return entry is not None and stat is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+
+def write_json_atomic(path, value):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(value, file, indent=1)
+    os.replace(temporary, path)
+
+
+def section_marker(relative_path, tokens):
+    return f"<File: {relative_path}>" if tokens is None else f"<File: {relative_path} ({tokens} tokens)>"
+
+
+def render_section(relative_path, text, tokens=None):
+    """Export section for one file: marker, contents, separator"""
+    return f"{section_marker(relative_path, tokens)}\n{text}\n{SEPARATOR}\n\n".encode("utf-8")
+
+
+def read_source(path, count_tokens=None, known=None):
+    """
+    Read and fingerprint one file (runs on a worker thread).
+
+    Args:
+        count_tokens: Token counter, or None when not counting
+        known (dict): The file's previous manifest entry; its token count is reused when the hash matches
 
-# Specify the output file path
-output_file = 'D:/temp/tmp_codebase/codebase.txt'
-
-# Create output directory if it doesn't exist
-os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-# Collect all files
-all_files = []
-for pattern in file_patterns:
-    full_pattern = os.path.join(directory, pattern)
-    matched_files = glob.glob(full_pattern)
-    all_files.extend(matched_files)
-
-# Remove duplicates and sort
-all_files = sorted(list(set(all_files)))
-
-# Open the output file in write mode
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write(f"Codebase Export - {len(all_files)} files\n")
-    f.write('='*80 + '\n\n')
-    
-    # Iterate over all collected files
-    for filepath in all_files:
+    Returns:
+        dict: sha256, text (universal newlines, like text-mode reads) and tokens; text is None and
+            error set when the file is not readable UTF-8
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    except (OSError, UnicodeDecodeError) as e:
+        return {"sha256": None, "text": None, "tokens": None, "error": str(e)}
+    sha256 = hashlib.sha256(data).hexdigest()
+    if count_tokens is None:
+        tokens = None
+    elif known is not None and known["sha256"] == sha256:
+        tokens = known["tokens"]
+    else:
+        tokens = count_tokens(text)
+    return {"sha256": sha256, "text": text, "tokens": tokens, "error": None}
+
+
+def ordered_map(executor, fn, items, window):
+    """executor.map with at most window results pending, so a slow consumer bounds memory"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def copy_range(source, destination, offset, length):
+    """Copy length bytes at offset of source (an open binary file) to destination"""
+    source.seek(offset)
+    while length > 0:
+        chunk = source.read(min(COPY_CHUNK_BYTES, length))
+        if not chunk:
+            raise OSError("Previous export is shorter than its manifest says")
+        destination.write(chunk)
+        length -= len(chunk)
+
+
+class CodebaseExporter:
+    """Incremental export of a file list into one text file, driven by the previous run's manifest"""
+
+    def __init__(self, root, output, manifest_path=None, tokens=False, encoding="cl100k_base",
+                 max_tokens=None, workers=DEFAULT_WORKERS):
+        self.root = root
+        self.output = output
+        self.manifest_path = manifest_path or f"{output}.manifest.json"
+        self.tokens = tokens or max_tokens is not None
+        self.max_tokens = max_tokens
+        self.workers = max(1, workers)
+        self.settings = {"tokens": self.tokens, "encoding": encoding if self.tokens else None}
+        self.encoding = encoding
+        self._counter = None  # loaded on first use: an up-to-date export never needs the tokenizer
+        self._counter_lock = threading.Lock()
+        self._previous = {}
+        self._previous_omitted = {}
+        self.omitted = {}  # manifest entries (no byte range) of files the token budget left out
+        self.stats = {"files": 0, "copied": 0, "read": 0, "unchanged_content": 0, "errors": 0,
+                      "omitted": 0, "tokens": 0 if self.tokens else None, "bytes": 0}
+
+    def _count_tokens(self, text):
+        with self._counter_lock:
+            if self._counter is None:
+                self._counter = token_counter(self.encoding)
+        return self._counter(text)
+
+    def _read(self, relative_path):
+        known = self._previous.get(relative_path) or self._previous_omitted.get(relative_path)
+        return read_source(os.path.join(self.root, relative_path), self._count_tokens if self.tokens else None, known)
+
+    def _plan(self, files, previous):
+        """(relative path, stat, previous entry when its section can be copied: mtime and size match) for every file"""
+        plan = []
+        for relative_path in files:
+            try:
+                stat = os.stat(os.path.join(self.root, relative_path))
+            except OSError:
+                stat = None
+            entry = previous.get(relative_path)
+            plan.append((relative_path, stat, entry if is_fresh(entry, stat) else None))
+        return plan
+
+    def _budget(self, plan):
+        """
+        Keep files in order while they fit in max_tokens. Token counts of changed files are needed
+        before the header is written, so those are read here (and again while exporting if kept);
+        counts of files left out are kept in the manifest so they are not re-read next time.
+        """
+        measurements = {}
+        for relative_path, stat, entry in plan:
+            known = entry or self._previous_omitted.get(relative_path)
+            if is_fresh(known, stat):
+                measurements[relative_path] = {key: known[key] for key in ("mtime_ns", "size", "sha256", "tokens")}
+        unknown = [(relative_path, stat) for relative_path, stat, _ in plan if relative_path not in measurements]
+        with ThreadPoolExecutor(self.workers) as executor:
+            sources = ordered_map(executor, self._read, [relative_path for relative_path, _ in unknown], self.workers * 2)
+            for (relative_path, stat), source in zip(unknown, sources):
+                measurements[relative_path] = {"mtime_ns": stat and stat.st_mtime_ns, "size": stat and stat.st_size,
+                                               "sha256": source["sha256"], "tokens": source["tokens"] or 0}
+        kept, total = [], 0
+        for relative_path, stat, entry in plan:
+            tokens = measurements[relative_path]["tokens"]
+            if total + tokens > self.max_tokens:
+                self.omitted[relative_path] = measurements[relative_path]
+                continue
+            total += tokens
+            kept.append((relative_path, stat, entry))
+        self.stats["omitted"] = len(self.omitted)
+        return kept
+
+    def _output_intact(self, previous_output):
+        """True when the previous export is still exactly as the manifest recorded it"""
         try:
-            # Get relative path for cleaner output
-            relative_path = os.path.relpath(filepath, directory)
-            
-            # Open the file in read mode
-            with open(filepath, 'r', encoding='utf-8') as code_file:
-                # Write the filename to the output file
-                f.write(f"<File: {relative_path}>\n")
-                # Write the code from the file to the output file
-                f.write(code_file.read())
-                # Add a separator between files
-                f.write('\n' + '-'*80 + '\n\n')
-        except Exception as e:
-            f.write(f"<File: {relative_path}>\n")
-            f.write(f"Error reading file: {str(e)}\n")
-            f.write('-'*80 + '\n\n')
-
-print(f"Codebase exported to: {output_file}")
-print(f"Total files processed: {len(all_files)}")
\ No newline at end of file
+            stat = os.stat(self.output)
+        except OSError:
+            return False
+        return previous_output == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _header(self, count):
+        return f"Codebase Export - {count} files\n{'=' * 80}\n\n".encode("utf-8")
+
+    def export(self, files):
+        """Write the export for files (relative paths, in order) and its manifest; returns stats"""
+        self._previous, previous_output, self._previous_omitted = load_manifest(self.manifest_path, self.settings)
+        # Sections are copied by byte range, so only from an export nobody has touched since
+        copyable = self._previous if self._output_intact(previous_output) else {}
+        plan = self._plan(files, copyable)
+        if self.max_tokens is not None:
+            plan = self._budget(plan)
+        self.stats["files"] = len(plan)
+
+        # Same files in the same order, none touched: the export is already current
+        if copyable and all(entry is not None for _, _, entry in plan) and \
+                [relative_path for relative_path, _, _ in plan] == list(copyable):
+            self.stats.update(copied=len(plan), tokens=sum(entry["tokens"] for _, _, entry in plan) if self.tokens else None,
+                              bytes=previous_output["size"], up_to_date=True)
+            if self.omitted != self._previous_omitted:
+                self._write_manifest(previous_output, copyable)
+            return self.stats
+
+        entries = {}
+        temporary = f"{self.output}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        changed = [relative_path for relative_path, _, entry in plan if entry is None]
+        with open(temporary, "wb") as destination, \
+                (open(self.output, "rb") if copyable else open(os.devnull, "rb")) as source, \
+                ThreadPoolExecutor(self.workers) as executor:
+            destination.write(self._header(len(plan)))
+            reads = ordered_map(executor, self._read, changed, self.workers * 2)
+            for relative_path, stat, entry in plan:
+                offset = destination.tell()
+                if entry is not None:
+                    copy_range(source, destination, entry["offset"], entry["length"])
+                    entries[relative_path] = dict(entry, offset=offset)
+                    self.stats["copied"] += 1
+                else:
+                    entries[relative_path] = self._write_read(destination, relative_path, stat, next(reads), offset)
+                if self.tokens and entries[relative_path]:
+                    self.stats["tokens"] += entries[relative_path]["tokens"] or 0
+            self.stats["bytes"] = destination.tell()
+        os.replace(temporary, self.output)
+
+        stat = os.stat(self.output)
+        # Files that vanished while exporting are left out so the next run looks at them again
+        self._write_manifest({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+                             {relative_path: entry for relative_path, entry in entries.items() if entry})
+        return self.stats
+
+    def _write_manifest(self, output, files):
+        write_json_atomic(self.manifest_path, {
+            "version": MANIFEST_VERSION,
+            "root": os.path.abspath(self.root),
+            "settings": self.settings,
+            "output": output,
+            "files": files,
+            "omitted": self.omitted,
+        })
+
+    def _write_read(self, destination, relative_path, stat, source, offset):
+        """Write a freshly read file's section; returns its manifest entry (None when the file vanished)"""
+        self.stats["read"] += 1
+        if source["error"] is not None or stat is None:
+            # Unreadable files stay in the manifest like any other and are read again once they change
+            self.stats["errors"] += 1
+            section = render_section(relative_path, f"Error reading file: {source['error']}")
+            destination.write(section)
+            return stat and {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": None,
+                             "tokens": 0 if self.tokens else None, "offset": offset, "length": len(section)}
+        earlier = self._previous.get(relative_path)
+        if earlier is not None and earlier["sha256"] == source["sha256"]:
+            self.stats["unchanged_content"] += 1  # only touched (e.g. a fresh checkout)
+        section = render_section(relative_path, source["text"], source["tokens"])
+        destination.write(section)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": source["sha256"],
+                "tokens": source["tokens"], "offset": offset, "length": len(section)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Directory the patterns are relative to (default: the repository)")
+    parser.add_argument("--pattern", action="append", dest="patterns",
+                        help="Glob relative to --root, \"**\" matches directories recursively; repeatable (default: backend and frontend sources)")
+    parser.add_argument("--exclude", action="append", default=[], help="fnmatch pattern of relative paths to skip; repeatable")
+    parser.add_argument("--output", default="codebase.txt")
+    parser.add_argument("--manifest", help="Manifest path (default: OUTPUT.manifest.json)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent file reads")
+    parser.add_argument("--tokens", action="store_true", help="Count tokens per file and show them in the file markers")
+    parser.add_argument("--encoding", default="cl100k_base", help="tiktoken encoding for --tokens")
+    parser.add_argument("--max-tokens", type=int, help="Token budget: files (in path order) that would go past it are left out; implies --tokens")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-read every file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    files = collect_files(args.root, args.patterns or DEFAULT_PATTERNS, args.exclude)
+    exporter = CodebaseExporter(args.root, args.output, args.manifest, args.tokens, args.encoding, args.max_tokens, args.workers)
+    if args.full and os.path.exists(exporter.manifest_path):
+        os.remove(exporter.manifest_path)
+    stats = exporter.export(files)
+
+    print(f"Codebase exported to: {args.output}" + (" (up to date)" if stats.get("up_to_date") else ""))
+    print(f"Total files processed: {stats['files']} ({stats['copied']} copied from the previous export, "
+          f"{stats['read']} read, {stats['unchanged_content']} of those unchanged, {stats['errors']} errors)")
+    if stats["tokens"] is not None:
+        print(f"Tokens: {stats['tokens']}" + (f" of {args.max_tokens} ({stats['omitted']} files omitted)" if args.max_tokens else ""))
+    print(f"Size: {stats['bytes'] / (1024 * 1024):.1f} MB in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()